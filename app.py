@@ -13,17 +13,22 @@ import memory_vector
 import router
 import research_agent
 import report_writer
+import batch_runner
+import runtime
+import tracing
 
 def run_smoke_test():
     """Run the initial smoke test."""
     print("--- Initializing Smoke Test ---")
+    pool = runtime.get_pool()
+
     # 1. Init DB
-    memory_truth.init_db()
+    pool.call_once(memory_truth.init_db)
     print("SQLite DB initialized.")
 
     # 2. Init Vector Memory
     print("Initializing VectorMemory...")
-    vm = memory_vector.VectorMemory()
+    vm = pool.get(memory_vector.VectorMemory)
     print("VectorMemory initialized.")
 
     # 3. Procedural Memory: Load and Upsert Skills
@@ -31,11 +36,14 @@ def run_smoke_test():
     skills = memory_builders.load_skills("skills/skills.yaml")
     print(f"Loaded {len(skills)} skills.")
     
-    for skill in skills:
-        canonical = memory_builders.skill_canonical(skill)
+    # Bulk upsert: one embeddings request and one Chroma upsert for all skills
+    vm.upsert_skills(
+        [skill['id'] for skill in skills],
+        [memory_builders.skill_canonical(skill) for skill in skills],
         # Use skill['name'] as part of metadata for display/filtering
-        meta = {"name": skill.get("name", "Unknown")}
-        vm.upsert_skill(skill['id'], canonical, meta)
+        [{"name": skill.get("name", "Unknown")} for skill in skills]
+    )
+    for skill in skills:
         print(f"Upserted skill: {skill['id']}")
 
     # 4. Episodic Memory: Add Episode and Upsert
@@ -98,6 +106,55 @@ def run_smoke_test():
     print_category("Semantic", results['semantic'])
     print_category("Episodic", results['episodic'])
 
+def print_research_summary(trace: dict):
+    """Print the CLI summary of a research trace."""
+    print("\n\n=== RESEARCH SUMMARY ===")
+    print(f"Topic: {trace['topic']}")
+    print(f"Session ID: {trace.get('session_id', 'N/A')}")
+    print(f"Memory Reuse: {'YES' if trace.get('reused_memory') else 'NO'}")
+    print(f"Web Search Skipped: {'YES' if trace.get('web_calls_skipped') else 'NO'}")
+    print(f"Sub-question Statuses:")
+    for s in trace.get('subquestion_statuses', []):
+        print(f"  - {s.get('question')}: {s.get('status')} ({s.get('rationale')})")
+    print(f"Skill: {trace['selected_skill']}")
+    print(f"Sub-questions: {len(trace['subquestions'])}")
+    for q in trace['subquestions']:
+        print(f"  - {q}")
+    print(f"Sources Used: {len(trace['sources_used'])}")
+    for s in trace['sources_used']:
+        print(f"  - {s}")
+    print(f"Episodes Created: {len(trace['episode_ids'])} (IDs: {trace['episode_ids']})")
+    print(f"Facts Created: {len(trace['fact_ids'])} (IDs: {trace['fact_ids']})")
+    print_timings(trace.get('timings'))
+    print_usage(trace.get('usage'))
+
+def print_timings(timings: dict):
+    """Print the per-stage span tree and the slowest span kinds of a traced run."""
+    if not timings:
+        return
+    print("\n=== TIMINGS ===")
+    print(f"Total: {timings['duration_ms'] / 1000:.2f}s")
+    # Stage level: the orchestrator's direct children
+    for child in timings.get('children', []):
+        print(f"  {child['name']:<45} {child['duration_ms']:>10.1f} ms")
+    print(f"{'Span':<30} {'Count':>6} {'Total ms':>12} {'Max ms':>10}")
+    for row in tracing.summarize(timings):
+        print(f"{row['name']:<30} {row['count']:>6} {row['total_ms']:>12.1f} {row['max_ms']:>10.1f}")
+
+def print_usage(summary: dict):
+    """Print token and cost totals of a run, overall and per stage."""
+    if not summary:
+        return
+    total = summary['total']
+    print("\n=== USAGE ===")
+    print(f"LLM calls: {total['llm_calls']} (+{total['cached_llm_calls']} cached), "
+          f"prompt tokens: {total['prompt_tokens']}, completion tokens: {total['completion_tokens']}")
+    print(f"Embedding calls: {total['embedding_calls']}, embedding tokens: {total['embedding_tokens']}")
+    print(f"Estimated cost: ${total['cost_usd']:.4f}")
+    for stage, counters in summary.get('by_stage', {}).items():
+        tokens = counters['prompt_tokens'] + counters['completion_tokens'] + counters['embedding_tokens']
+        print(f"  {stage:<45} {tokens:>10} tok  ${counters['cost_usd']:.4f}")
+
 def main():
     if len(sys.argv) > 1:
         command = sys.argv[1]
@@ -112,29 +169,63 @@ def main():
             try:
                 trace = research_agent.run_research(topic, max_sources=5)
                 
-                print("\n\n=== RESEARCH SUMMARY ===")
-                print(f"Topic: {trace['topic']}")
-                print(f"Session ID: {trace.get('session_id', 'N/A')}")
-                print(f"Memory Reuse: {'YES' if trace.get('reused_memory') else 'NO'}")
-                print(f"Web Search Skipped: {'YES' if trace.get('web_calls_skipped') else 'NO'}")
-                print(f"Sub-question Statuses:")
-                for s in trace.get('subquestion_statuses', []):
-                    print(f"  - {s.get('question')}: {s.get('status')} ({s.get('rationale')})")
-                print(f"Skill: {trace['selected_skill']}")
-                print(f"Sub-questions: {len(trace['subquestions'])}")
-                for q in trace['subquestions']:
-                    print(f"  - {q}")
-                print(f"Sources Used: {len(trace['sources_used'])}")
-                for s in trace['sources_used']:
-                    print(f"  - {s}")
-                print(f"Episodes Created: {len(trace['episode_ids'])} (IDs: {trace['episode_ids']})")
-                print(f"Facts Created: {len(trace['fact_ids'])} (IDs: {trace['fact_ids']})")
+                print_research_summary(trace)
                 
             except Exception as e:
                 print(f"Research failed: {e}")
                 import traceback
                 traceback.print_exc()
                 
+        elif command == "resume":
+            if len(sys.argv) < 3:
+                print("Usage: python app.py resume SESSION_ID")
+                sys.exit(1)
+
+            try:
+                trace = research_agent.resume(sys.argv[2])
+                print_research_summary(trace)
+            except Exception as e:
+                print(f"Resume failed: {e}")
+                import traceback
+                traceback.print_exc()
+
+        elif command == "research-batch":
+            if len(sys.argv) < 3:
+                print("Usage: python app.py research-batch TOPICS.jsonl [--out TRACES.jsonl] [--workers N]")
+                sys.exit(1)
+
+            input_path = sys.argv[2]
+            output_path = os.path.splitext(input_path)[0] + ".traces.jsonl"
+            workers = batch_runner.DEFAULT_WORKERS
+            try:
+                if "--out" in sys.argv:
+                    output_path = sys.argv[sys.argv.index("--out") + 1]
+                if "--workers" in sys.argv:
+                    workers = int(sys.argv[sys.argv.index("--workers") + 1])
+            except (IndexError, ValueError):
+                print("Error: --out requires a path and --workers requires a number.")
+                sys.exit(1)
+
+            try:
+                jobs = batch_runner.load_jobs(input_path)
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+
+            print(f"Running {len(jobs)} topics on {workers} workers -> {output_path}")
+            stats = batch_runner.run_batch(
+                jobs, output_path, workers=workers,
+                on_result=lambda r: print(f"[BATCH] {r['status'].upper()} {r['topic']} ({r['elapsed_s']:.1f}s)")
+            )
+
+            print("\n\n=== BATCH SUMMARY ===")
+            print(f"Topics: {stats['total']} ({stats['succeeded']} ok, {stats['failed']} failed)")
+            print(f"Elapsed: {stats['elapsed_s']:.1f}s | Throughput: {stats['topics_per_min']} topics/min")
+            print(f"Latency: p50 {stats['latency_p50_s']:.1f}s | p95 {stats['latency_p95_s']:.1f}s | max {stats['latency_max_s']:.1f}s")
+            for r in stats['per_topic']:
+                print(f"  - [{r['status']}] {r['elapsed_s']:7.1f}s  {r['topic']}")
+            print(f"Traces written to: {output_path}")
+
         elif command == "report":
             if len(sys.argv) < 3:
                 print("Usage: python app.py report 'TOPIC' [--session SESSION_ID]")
@@ -172,9 +263,14 @@ def main():
             print("Available commands:")
             print("  python app.py (runs smoke test)")
             print("  python app.py research 'TOPIC'")
+            print("  python app.py resume SESSION_ID")
+            print("  python app.py research-batch TOPICS.jsonl [--out TRACES.jsonl] [--workers N]")
             print("  python app.py report 'TOPIC' [--session SESSION_ID]")
     else:
         run_smoke_test()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        runtime.shutdown()
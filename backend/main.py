@@ -18,11 +18,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import research_agent
 import report_writer
+import runtime
 
 load_dotenv()
 
 app = FastAPI()
 
+@app.on_event("shutdown")
+def shutdown_runtime():
+    """Release the shared Chroma/OpenAI/HTTP resources when the server stops."""
+    runtime.shutdown()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000", "http://localhost:5174"],
@@ -63,7 +69,7 @@ async def event_generator(topic: str, mode: str = "research") -> AsyncGenerator[
                 q.put({"type": "report_start", "topic": topic})
                 
                 # Direct Report Generation (Bypassing run_research to avoid new session)
-                research_agent.memory_truth.init_db()
+                runtime.get_pool().call_once(research_agent.memory_truth.init_db)
                 session_id = research_agent.memory_truth.get_latest_session_id(topic)
                 
                 # Construct minimal trace for frontend compatibility
@@ -0,0 +1,104 @@
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+import research_agent
+
+DEFAULT_WORKERS = 4
+
+def load_jobs(path: str) -> list[dict]:
+    """
+    Read research jobs from a JSONL file.
+
+    Each line is either a JSON string (the topic) or an object with "topic"
+    and optionally "max_sources" and "policy" (an execution policy override).
+    Blank lines are skipped.
+    """
+    jobs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+            if isinstance(entry, str):
+                entry = {"topic": entry}
+            if not isinstance(entry, dict) or not str(entry.get("topic") or "").strip():
+                raise ValueError(f"{path}:{line_no}: expected a topic string or an object with a 'topic'")
+            policy = entry.get("policy")
+            if policy is not None and not isinstance(policy, dict):
+                raise ValueError(f"{path}:{line_no}: 'policy' must be an object")
+            try:
+                max_sources = int(entry.get("max_sources", 5))
+            except (TypeError, ValueError):
+                raise ValueError(f"{path}:{line_no}: 'max_sources' must be an integer")
+            jobs.append({
+                "line": line_no,
+                "topic": str(entry["topic"]).strip(),
+                "max_sources": max_sources,
+                "policy": policy
+            })
+    return jobs
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def run_batch(jobs: list[dict], output_path: str, workers: int = DEFAULT_WORKERS,
+              run: Callable = None, on_result: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Run research jobs on a bounded worker pool and write one result per line to output_path.
+
+    Every job shares the process-wide runtime (SQLite, Chroma, OpenAI client),
+    so startup is paid once. Results are written as jobs finish; a failing
+    topic is recorded with its error and does not stop the batch.
+
+    Returns throughput and per-topic latency statistics.
+    """
+    run = run or research_agent.run_research
+    results = []
+
+    def run_job(job):
+        start = time.perf_counter()
+        try:
+            trace = run(job["topic"], max_sources=job["max_sources"], execution_policy_override=job["policy"])
+            return {**job, "status": "ok", "elapsed_s": round(time.perf_counter() - start, 3), "trace": trace}
+        except Exception as e:
+            return {**job, "status": "error", "elapsed_s": round(time.perf_counter() - start, 3), "error": f"{type(e).__name__}: {e}"}
+
+    batch_start = time.perf_counter()
+    with open(output_path, 'w', encoding='utf-8') as out, \
+         ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+        futures = [pool.submit(run_job, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            # Only this thread writes, so lines never interleave
+            out.write(json.dumps(result, default=str) + "\n")
+            out.flush()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    elapsed = time.perf_counter() - batch_start
+
+    latencies = [r["elapsed_s"] for r in results]
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_s": round(elapsed, 3),
+        "topics_per_min": round(len(results) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "latency_p50_s": _percentile(latencies, 50) if latencies else 0.0,
+        "latency_p95_s": _percentile(latencies, 95) if latencies else 0.0,
+        "latency_max_s": max(latencies) if latencies else 0.0,
+        "per_topic": sorted(
+            ({"line": r["line"], "topic": r["topic"], "status": r["status"], "elapsed_s": r["elapsed_s"]} for r in results),
+            key=lambda r: r["line"]
+        )
+    }
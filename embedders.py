@@ -0,0 +1,87 @@
+import os
+import re
+import math
+import zlib
+import numpy as np
+import usage
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+LOCAL_EMBEDDING_DIM = 384
+
+def embedder_name_from_env() -> str:
+    """Embedder selected by RESEARCH_AGENT_EMBEDDER ('openai' or 'local'), defaulting to OpenAI."""
+    return os.environ.get("RESEARCH_AGENT_EMBEDDER", "openai").strip().lower()
+
+class OpenAIEmbedder:
+    """Embeddings via the OpenAI embeddings API (one request per call)."""
+
+    cacheable = True
+
+    def __init__(self, client, model: str = OPENAI_EMBEDDING_MODEL):
+        self.client = client
+        self.model = model
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        response = self.client.embeddings.create(
+            input=texts,
+            model=self.model
+        )
+        usage.record_embeddings(self.model, response)
+        # The API returns one item per input, in input order
+        return [item.embedding for item in response.data]
+
+class HashingEmbedder:
+    """
+    Offline embedder: hashed word and character n-gram features projected
+    into a fixed dimension (signed hashing trick, sublinear TF, L2 norm).
+
+    Deterministic across processes and needs no network or model files, so
+    it suits air-gapped CI, load tests and bulk re-indexing. Quality is
+    lexical rather than semantic.
+    """
+
+    # Cheaper to recompute than to look up on disk
+    cacheable = False
+
+    _token_re = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, dim: int = LOCAL_EMBEDDING_DIM, ngram_range: tuple = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model = f"local-hash-{dim}"
+
+    def _features(self, text: str) -> dict:
+        counts = {}
+        tokens = self._token_re.findall(text.lower())
+        lo, hi = self.ngram_range
+        for token in tokens:
+            counts["w:" + token] = counts.get("w:" + token, 0) + 1
+            padded = f" {token} "
+            for n in range(lo, hi + 1):
+                for i in range(len(padded) - n + 1):
+                    gram = padded[i:i + n]
+                    counts[gram] = counts.get(gram, 0) + 1
+        return counts
+
+    def embed_one(self, text: str) -> list[float]:
+        counts = self._features(text)
+        if not counts:
+            return [0.0] * self.dim
+
+        indices = np.empty(len(counts), dtype=np.int64)
+        weights = np.empty(len(counts), dtype=np.float64)
+        for j, (feature, count) in enumerate(counts.items()):
+            h = zlib.crc32(feature.encode("utf-8"))
+            indices[j] = h % self.dim
+            # Top bit picks the sign so collisions tend to cancel rather than pile up
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            weights[j] = sign * (1.0 + math.log(count))
+
+        vec = np.bincount(indices, weights=weights, minlength=self.dim)
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec = vec / norm
+        return vec.tolist()
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_one(t) for t in texts]
@@ -0,0 +1,149 @@
+import sqlite3
+import os
+import hashlib
+import threading
+import time
+from array import array
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, 'data', 'embedding_cache.db')
+
+# Roughly 6KB per 1536-dim float32 vector, so ~300MB at the default bound.
+DEFAULT_MAX_ENTRIES = 50000
+
+# Keys per SELECT ... IN (...) when looking up a batch
+LOOKUP_CHUNK = 500
+
+def cache_enabled() -> bool:
+    """Embedding cache is on unless RESEARCH_AGENT_EMBEDDING_CACHE is set to 0/false/off."""
+    flag = os.environ.get("RESEARCH_AGENT_EMBEDDING_CACHE", "1").strip().lower()
+    return flag not in ("0", "false", "off", "no")
+
+def cache_key(model: str, text: str) -> str:
+    """Content address for an embedding: sha256 over (model, text)."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache backed by SQLite.
+
+    Entries are keyed by (model, sha256(text)) and evicted least-recently-used
+    once the table grows past max_entries. Batch lookups and stores commit
+    once per call; the database runs in WAL mode with synchronous=NORMAL, so
+    a lost recency update on power failure costs nothing but LRU precision.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path or CACHE_PATH
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)')
+        self._conn.commit()
+        self._size = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+
+    def get(self, model: str, text: str):
+        """Return the cached embedding or None, updating recency on a hit."""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: list[str]) -> list:
+        """
+        Cached embeddings for many texts (None for misses), in input order.
+        Recency of every hit is updated with one statement and one commit.
+        """
+        keys = [cache_key(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), LOOKUP_CHUNK):
+                chunk = unique[i:i + LOOKUP_CHUNK]
+                placeholders = ', '.join('?' for _ in chunk)
+                found.update(self._conn.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})', chunk
+                ).fetchall())
+            if found:
+                now = time.time()
+                self._conn.executemany('UPDATE embeddings SET last_used = ? WHERE key = ?', [(now, key) for key in found])
+                self._conn.commit()
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        results = []
+        for key in keys:
+            if key not in found:
+                results.append(None)
+                continue
+            vec = array('f')
+            vec.frombytes(found[key])
+            results.append(vec.tolist())
+        return results
+
+    def put(self, model: str, text: str, embedding: list[float]):
+        """Store an embedding and evict the least recently used entries if over the bound."""
+        self.put_many(model, [text], [embedding])
+
+    def put_many(self, model: str, texts: list[str], embeddings: list[list[float]]):
+        """Store many embeddings in one transaction, then evict least recently used entries if over the bound."""
+        if not texts:
+            return
+        now = time.time()
+        rows = [
+            (cache_key(model, text), model, len(embedding), array('f', embedding).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO embeddings (key, model, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            # Counted inside the write transaction: other processes share this file
+            size = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+            if size > self.max_entries:
+                cursor = self._conn.execute('''
+                    DELETE FROM embeddings WHERE key IN (
+                        SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?
+                    )
+                ''', (size - self.max_entries,))
+                size -= cursor.rowcount
+            self._conn.commit()
+            self._size = size
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current number of entries."""
+        with self._lock:
+            self._size = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": self._size,
+            "max_entries": self.max_entries
+        }
+
+    def clear(self):
+        """Drop every cached embedding."""
+        with self._lock:
+            self._conn.execute('DELETE FROM embeddings')
+            self._conn.commit()
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
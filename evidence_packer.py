@@ -0,0 +1,149 @@
+import os
+import math
+from datetime import datetime
+from typing import Callable, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to the ~4 characters per token estimate
+    tiktoken = None
+
+# Prompt budgets in tokens, per call site (override with RESEARCH_AGENT_TOKEN_BUDGETS="report=8000,memory_eval=2000")
+DEFAULT_BUDGETS = {
+    "memory_eval": 3000,
+    "compress_summary": 1500,
+    "ingest_page": 2000,
+    "report": 6000,
+}
+
+# How much freshness counts against retrieval rank when ordering evidence
+FRESHNESS_WEIGHT = 0.3
+FRESHNESS_HALF_LIFE_DAYS = 90
+
+# A truncated item shorter than this is not worth including
+MIN_PARTIAL_TOKENS = 32
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding
+    if tiktoken is None:
+        return None
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model("gpt-4o")
+        except Exception:
+            try:
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                print(f"Warning: tiktoken unavailable, estimating tokens from length: {e}")
+                _encoding = False
+    return _encoding or None
+
+def count_tokens(text: str) -> int:
+    """Token count for gpt-4o (tiktoken when installed, else len/4)."""
+    if not text:
+        return 0
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text))
+    return math.ceil(len(text) / 4)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most max_tokens tokens."""
+    if not text or max_tokens <= 0:
+        return ""
+    enc = _get_encoding()
+    if enc is not None:
+        tokens = enc.encode(text)
+        return text if len(tokens) <= max_tokens else enc.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+def budget_for(call_site: str) -> int:
+    """Token budget for a call site, from RESEARCH_AGENT_TOKEN_BUDGETS or DEFAULT_BUDGETS."""
+    overrides = {}
+    for entry in os.environ.get("RESEARCH_AGENT_TOKEN_BUDGETS", "").split(","):
+        name, _, value = entry.partition("=")
+        try:
+            overrides[name.strip()] = int(value)
+        except ValueError:
+            continue
+    return overrides.get(call_site, DEFAULT_BUDGETS.get(call_site, 2000))
+
+def _parse_date(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        pass
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+        try:
+            return datetime.strptime(str(value), fmt)
+        except ValueError:
+            pass
+    return None
+
+def rank_evidence(items: List[dict], now: datetime = None, half_life_days: float = FRESHNESS_HALF_LIFE_DAYS) -> List[dict]:
+    """
+    Order evidence by relevance and freshness.
+
+    Relevance comes from the incoming order (retrieval rank, best first).
+    Freshness halves every half_life_days of created_at age; undated items
+    count as half fresh. Ties keep the incoming order.
+    """
+    now = now or datetime.now()
+    n = len(items)
+    scored = []
+    for rank, item in enumerate(items):
+        relevance = 1.0 - rank / n
+        created = _parse_date(item.get('created_at'))
+        if created is None:
+            freshness = 0.5
+        else:
+            age_days = max((now - created.replace(tzinfo=None)).total_seconds() / 86400, 0.0)
+            freshness = 0.5 ** (age_days / half_life_days)
+        score = (1 - FRESHNESS_WEIGHT) * relevance + FRESHNESS_WEIGHT * freshness
+        scored.append((-score, rank, item))
+    scored.sort(key=lambda entry: (entry[0], entry[1]))
+    return [item for _, _, item in scored]
+
+class PackedEvidence:
+    """Result of pack(): the items that fit, their rendered text and the tokens used."""
+
+    def __init__(self):
+        self.items = []
+        self.texts = []
+        self.tokens = 0
+        self.dropped = 0
+
+    def text(self, sep: str = "") -> str:
+        return sep.join(self.texts)
+
+def pack(items: List[dict], budget: int, render: Callable[[dict], str], max_item_tokens: int = None, rank: bool = True) -> PackedEvidence:
+    """
+    Fill a token budget with the best evidence.
+
+    Items are ranked (see rank_evidence), rendered, capped at max_item_tokens
+    each and added until the budget is spent. An item that does not fit is
+    truncated if at least MIN_PARTIAL_TOKENS remain, otherwise skipped so
+    smaller items further down can still use the space.
+    """
+    packed = PackedEvidence()
+    ordered = rank_evidence(items) if rank else list(items)
+    for item in ordered:
+        text = render(item)
+        if max_item_tokens:
+            text = truncate_to_tokens(text, max_item_tokens)
+        tokens = count_tokens(text)
+        remaining = budget - packed.tokens
+        if tokens > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                packed.dropped += 1
+                continue
+            text = truncate_to_tokens(text, remaining)
+            tokens = count_tokens(text)
+        packed.items.append(item)
+        packed.texts.append(text)
+        packed.tokens += tokens
+    return packed
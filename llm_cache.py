@@ -0,0 +1,222 @@
+import sqlite3
+import os
+import json
+import hashlib
+import threading
+import time
+import runtime
+import tracing
+import usage
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, 'data', 'llm_cache.db')
+
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+# Every chat completion goes through one of these call sites
+CALL_SITES = (
+    "memory_eval",
+    "subquestions",
+    "summarize_source",
+    "extract_facts",
+    "ingest_fused",
+    "compress_summary",
+    "report",
+)
+
+def enabled_sites() -> set:
+    """
+    Call sites with caching turned on, from RESEARCH_AGENT_LLM_CACHE.
+
+    The cache is off by default. Set the variable to 1/true/on/all for every
+    call site, or to a comma-separated list of call sites (e.g. "extract_facts,report").
+    """
+    flag = os.environ.get("RESEARCH_AGENT_LLM_CACHE", "").strip().lower()
+    if flag in ("", "0", "false", "off", "no"):
+        return set()
+    if flag in ("1", "true", "on", "yes", "all"):
+        return set(CALL_SITES)
+    return {site.strip() for site in flag.split(",") if site.strip()}
+
+def cache_enabled(call_site: str) -> bool:
+    return call_site in enabled_sites()
+
+def cache_ttl() -> float:
+    """Entry lifetime in seconds (RESEARCH_AGENT_LLM_CACHE_TTL, default 7 days)."""
+    try:
+        return float(os.environ.get("RESEARCH_AGENT_LLM_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    except ValueError:
+        return DEFAULT_TTL_SECONDS
+
+def cache_key(params: dict) -> str:
+    """Content address for a request: sha256 over model, messages and every other parameter."""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class _Message:
+    def __init__(self, content):
+        self.role = "assistant"
+        self.content = content
+
+class _Choice:
+    def __init__(self, content, finish_reason):
+        self.index = 0
+        self.message = _Message(content)
+        self.finish_reason = finish_reason
+
+class CachedCompletion:
+    """Minimal stand-in for a ChatCompletion served from the cache (choices[0].message.content)."""
+
+    cached = True
+
+    def __init__(self, model, content, finish_reason="stop"):
+        self.model = model
+        self.choices = [_Choice(content, finish_reason)]
+        self.usage = None
+
+class LLMCache:
+    """
+    Persistent chat completion cache backed by SQLite.
+
+    Entries are keyed by sha256(model, messages, parameters), expire after
+    ttl seconds and are evicted least-recently-used once the table grows
+    past max_entries. Hits and misses are counted per call site.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = None):
+        self.path = path or CACHE_PATH
+        self.max_entries = max_entries
+        self.ttl = cache_ttl() if ttl is None else ttl
+        self.site_stats = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                call_site TEXT NOT NULL,
+                model TEXT,
+                content TEXT NOT NULL,
+                finish_reason TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions(last_used)')
+        self._conn.commit()
+        self._size = self._conn.execute('SELECT COUNT(*) FROM completions').fetchone()[0]
+
+    def _count(self, call_site: str, outcome: str):
+        counters = self.site_stats.setdefault(call_site, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, call_site: str, params: dict):
+        """Return the cached CachedCompletion or None. Expired entries are dropped and count as misses."""
+        key = cache_key(params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content, finish_reason, created_at FROM completions WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and now - row[2] > self.ttl:
+                self._conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+                self._conn.commit()
+                self._size -= 1
+                row = None
+            if row is None:
+                self._count(call_site, "misses")
+                return None
+            self._conn.execute('UPDATE completions SET last_used = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self._count(call_site, "hits")
+        return CachedCompletion(params.get("model"), row[0], row[1])
+
+    def put(self, call_site: str, params: dict, content: str, finish_reason: str = "stop"):
+        """Store a completion and evict expired, then least recently used, entries if over the bound."""
+        key = cache_key(params)
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO completions (key, call_site, model, content, finish_reason, created_at, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, call_site, params.get("model"), content, finish_reason, now, now)
+            )
+            self._size += cursor.rowcount
+            if self._size > self.max_entries:
+                cursor = self._conn.execute('DELETE FROM completions WHERE created_at < ?', (now - self.ttl,))
+                self._size -= cursor.rowcount
+            if self._size > self.max_entries:
+                overflow = self._size - self.max_entries
+                self._conn.execute('''
+                    DELETE FROM completions WHERE key IN (
+                        SELECT key FROM completions ORDER BY last_used ASC LIMIT ?
+                    )
+                ''', (overflow,))
+                self._size -= overflow
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process (overall and per call site) plus the current number of entries."""
+        with self._lock:
+            sites = {site: dict(counters) for site, counters in self.site_stats.items()}
+        hits = sum(c["hits"] for c in sites.values())
+        misses = sum(c["misses"] for c in sites.values())
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "call_sites": sites
+        }
+
+    def clear(self):
+        """Drop every cached completion."""
+        with self._lock:
+            self._conn.execute('DELETE FROM completions')
+            self._conn.commit()
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def get_cache() -> LLMCache:
+    """The process-wide cache, created on first use."""
+    return runtime.get_pool().get(LLMCache)
+
+def cached_chat(openai_client, call_site: str, cache: LLMCache = None, **params):
+    """
+    chat.completions.create() with a cache in front of it for enabled call sites.
+
+    Returns the API response on a miss and a CachedCompletion on a hit. Only
+    non-empty text completions that finished normally are stored.
+    """
+    with tracing.span("llm", call_site=call_site, model=params.get("model")) as s:
+        if cache is None:
+            if not cache_enabled(call_site):
+                resp = openai_client.chat.completions.create(**params)
+                usage.record_chat(params.get("model"), resp)
+                return resp
+            cache = get_cache()
+
+        hit = cache.get(call_site, params)
+        s.set(cached=hit is not None)
+        if hit is not None:
+            usage.record_cached_chat()
+            return hit
+
+        resp = openai_client.chat.completions.create(**params)
+        usage.record_chat(params.get("model"), resp)
+        try:
+            choice = resp.choices[0]
+            content = choice.message.content
+            finish_reason = getattr(choice, "finish_reason", "stop")
+            if isinstance(content, str) and content and finish_reason in ("stop", None):
+                cache.put(call_site, params, content, finish_reason or "stop")
+        except Exception as e:
+            print(f"Warning: failed to cache {call_site} completion: {e}")
+        return resp
@@ -1,22 +1,124 @@
 import sqlite3
 import os
+import re
+import hashlib
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, 'data', 'memory.db')
 
+# Applied to every pooled connection. WAL lets readers run alongside a writer;
+# synchronous=NORMAL is durable across app crashes in WAL mode.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",     # ~16MB page cache
+    "PRAGMA mmap_size = 268435456",   # 256MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 10000",
+)
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection subclass so pooled connections can be tracked weakly."""
+    path = None
+    closed = False
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+_local = threading.local()
+_all_connections = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+def _thread_state() -> dict:
+    """Per-thread {db_path: [connection, transaction_depth]}."""
+    state = getattr(_local, 'state', None)
+    if state is None:
+        state = _local.state = {}
+    return state
+
 def connect():
-    """Connect to the SQLite database."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Return this thread's pooled connection to the SQLite database.
 
-def init_db():
-    """Initialize the database tables."""
+    Connections are opened once per thread and DB_PATH, in autocommit mode
+    with WAL and tuned pragmas. Do not close them; group writes with
+    transaction() and call close_connections() on shutdown or before
+    deleting the database file.
+    """
+    state = _thread_state()
+    entry = state.get(DB_PATH)
+    if entry is not None and entry[0].closed:
+        entry = None
+    if entry is None:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False, factory=_PooledConnection)
+        conn.path = DB_PATH
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        entry = state[DB_PATH] = [conn, 0]
+        with _registry_lock:
+            _all_connections.add(conn)
+    return entry[0]
+
+@contextmanager
+def transaction():
+    """
+    Group writes into one transaction on this thread's connection.
+    Nested use joins the outermost transaction, which commits on exit
+    (or rolls back if an exception escapes).
+    """
     conn = connect()
-    cursor = conn.cursor()
-    
+    entry = _thread_state()[DB_PATH]
+    outermost = entry[1] == 0
+    if outermost:
+        conn.execute('BEGIN IMMEDIATE')
+    entry[1] += 1
+    try:
+        yield conn
+    except BaseException:
+        entry[1] -= 1
+        if outermost:
+            conn.execute('ROLLBACK')
+        raise
+    entry[1] -= 1
+    if outermost:
+        conn.execute('COMMIT')
+
+def close_connections(path: str = None):
+    """
+    Close pooled connections on every thread, optionally only those for one
+    database path. They reopen lazily on next use.
+    """
+    with _registry_lock:
+        conns = [c for c in _all_connections if path is None or c.path == path]
+        for conn in conns:
+            _all_connections.discard(conn)
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    state = _thread_state()
+    for db_path in [p for p in state if path is None or p == path]:
+        del state[db_path]
+
+def _has_column(cursor, table, column):
+    return any(row[1] == column for row in cursor.execute(f'PRAGMA table_info({table})'))
+
+def _add_column_if_missing(cursor, table, column, decl):
+    if not _has_column(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+        print(f"Schema Update: Added {column} to {table} table.")
+
+def _migrate_base_schema(cursor):
+    """Base tables: episodes, facts, subquestion_coverage (incl. session_id / normalized_subquestion)."""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS episodes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,19 +147,9 @@ def init_db():
         )
     ''')
     
-    
-    # 2026-01-02: Check for missing columns (session_id) and migrate if needed
-    try:
-        cursor.execute("ALTER TABLE episodes ADD COLUMN session_id TEXT")
-        print("Schema Update: Added session_id to episodes table.")
-    except sqlite3.OperationalError:
-        pass # Column likely already exists
-        
-    try:
-        cursor.execute("ALTER TABLE facts ADD COLUMN session_id TEXT")
-        print("Schema Update: Added session_id to facts table.")
-    except sqlite3.OperationalError:
-        pass
+    # 2026-01-02: Session scoping
+    _add_column_if_missing(cursor, 'episodes', 'session_id', 'TEXT')
+    _add_column_if_missing(cursor, 'facts', 'session_id', 'TEXT')
         
     # 2026-01-03: Subquestion Coverage
     cursor.execute('''
@@ -70,30 +162,265 @@ def init_db():
             fact_ids TEXT DEFAULT '[]' -- JSON list
         )
     ''')
-    
-    try:
-        cursor.execute("ALTER TABLE subquestion_coverage ADD COLUMN normalized_subquestion TEXT")
-        print("Schema Update: Added normalized_subquestion to subquestion_coverage table.")
-    except sqlite3.OperationalError:
-        pass
+    _add_column_if_missing(cursor, 'subquestion_coverage', 'normalized_subquestion', 'TEXT')
+
+def _migrate_full_text(cursor):
+    """Full-text (BM25) indexes over episodes and facts."""
+    _init_fts(cursor)
+
+def _migrate_lookup_indexes(cursor):
+    """Expression indexes for the case-insensitive topic / session / coverage lookups."""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_episodes_topic ON episodes(lower(topic))')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_episodes_topic_session ON episodes(lower(topic), session_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_facts_topic ON facts(lower(topic))')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_facts_topic_session ON facts(lower(topic), session_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_coverage_topic_subquestion ON subquestion_coverage(lower(topic), lower(subquestion))')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_coverage_topic_normalized ON subquestion_coverage(lower(topic), normalized_subquestion)')
+
+def _migrate_coverage_evidence(cursor):
+    """Coverage <-> episode / fact junction tables, backfilled from the JSON id columns."""
+    for table, column in (('coverage_episodes', 'episode_id'), ('coverage_facts', 'fact_id')):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                coverage_id INTEGER NOT NULL REFERENCES subquestion_coverage (id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                {column} INTEGER NOT NULL,
+                PRIMARY KEY (coverage_id, position)
+            ) WITHOUT ROWID
+        ''')
+        # Reverse lookup: which coverage records depend on this episode / fact
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})')
+
+    cursor.execute('''
+        INSERT OR IGNORE INTO coverage_episodes (coverage_id, position, episode_id)
+        SELECT c.id, j.key, j.value FROM subquestion_coverage c, json_each(c.episode_ids) j
+        WHERE json_valid(c.episode_ids) AND j.type = 'integer'
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO coverage_facts (coverage_id, position, fact_id)
+        SELECT c.id, j.key, j.value FROM subquestion_coverage c, json_each(c.fact_ids) j
+        WHERE json_valid(c.fact_ids) AND j.type = 'integer'
+    ''')
+
+def _migrate_coverage_tokens(cursor):
+    """Token inverted index over normalized subquestions for fuzzy coverage matching."""
+    _add_column_if_missing(cursor, 'subquestion_coverage', 'token_count', 'INTEGER')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS coverage_tokens (
+            topic_key TEXT NOT NULL,
+            token TEXT NOT NULL,
+            coverage_id INTEGER NOT NULL REFERENCES subquestion_coverage (id) ON DELETE CASCADE,
+            PRIMARY KEY (topic_key, token, coverage_id)
+        ) WITHOUT ROWID
+    ''')
+    # Rows without a normalized form stay token_count NULL and are indexed on first match
+    rows = cursor.execute(
+        'SELECT id, topic, normalized_subquestion FROM subquestion_coverage WHERE normalized_subquestion IS NOT NULL'
+    ).fetchall()
+    for cov_id, topic, normalized in rows:
+        _index_coverage_tokens(cursor, cov_id, topic, normalized)
+
+# Query parameters that only track the click, never change the page
+_TRACKING_PARAMS = ('fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src')
 
-    conn.commit()
-    conn.close()
+def canonical_url(url: str) -> str:
+    """
+    Key for the source index: lowercase scheme and host, no default port,
+    fragment or tracking parameters, and no trailing slash on the path.
+    """
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and not (scheme == 'http' and parts.port == 80) and not (scheme == 'https' and parts.port == 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in _TRACKING_PARAMS
+    ])
+    path = parts.path.rstrip('/') if parts.path not in ('', '/') else ''
+    return urlunsplit((scheme, host, path, query, ''))
+
+def content_hash(text: str) -> str:
+    """sha256 of fetched page text, to tell an unchanged page from an updated one."""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+def _migrate_source_index(cursor):
+    """Canonical URL -> latest episode index, backfilled from episodes that have a URL."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sources (
+            canonical_url TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            episode_id INTEGER NOT NULL,
+            content_hash TEXT,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_facts_source_episode ON facts(source_episode_id)')
+    # Oldest first, so the latest episode per canonical URL wins
+    rows = cursor.execute(
+        "SELECT id, url, created_at FROM episodes WHERE url IS NOT NULL AND url != '' ORDER BY id"
+    ).fetchall()
+    for ep_id, url, created_at in rows:
+        cursor.execute('''
+            INSERT INTO sources (canonical_url, url, episode_id, fetched_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (canonical_url) DO UPDATE SET url = excluded.url, episode_id = excluded.episode_id, fetched_at = excluded.fetched_at
+        ''', (canonical_url(url), url, ep_id, created_at))
+
+def _migrate_run_checkpoints(cursor):
+    """Per-session stage checkpoints so an interrupted research run can be resumed."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS run_checkpoints (
+            session_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            data TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (session_id, stage)
+        ) WITHOUT ROWID
+    ''')
+
+def _migrate_session_usage(cursor):
+    """Token / cost totals per research session (accumulated across resumes and reports)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS session_usage (
+            session_id TEXT PRIMARY KEY,
+            topic TEXT,
+            runs INTEGER NOT NULL DEFAULT 0,
+            llm_calls INTEGER NOT NULL DEFAULT 0,
+            cached_llm_calls INTEGER NOT NULL DEFAULT 0,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            embedding_calls INTEGER NOT NULL DEFAULT 0,
+            embedding_tokens INTEGER NOT NULL DEFAULT 0,
+            cost_usd REAL NOT NULL DEFAULT 0,
+            by_stage TEXT NOT NULL DEFAULT '{}',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _migrate_coverage_vectors(cursor):
+    """Which vector collection each coverage row is embedded in; NULL until it is."""
+    _add_column_if_missing(cursor, 'subquestion_coverage', 'embedded_in', 'TEXT')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_coverage_topic_embedded ON subquestion_coverage(lower(topic), embedded_in)')
+
+# Ordered schema migrations. PRAGMA user_version records how many have been applied.
+# Append new migrations; never reorder or edit shipped ones.
+MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_full_text,
+    _migrate_lookup_indexes,
+    _migrate_coverage_evidence,
+    _migrate_coverage_tokens,
+    _migrate_source_index,
+    _migrate_run_checkpoints,
+    _migrate_session_usage,
+    _migrate_coverage_vectors,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def init_db():
+    """
+    Initialize / migrate the database schema.
+    No-op (a single PRAGMA read) when the schema is already current.
+    """
+    conn = connect()
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    # DDL and the version bump commit atomically, one migration at a time
+    for target, migration in enumerate(MIGRATIONS, start=1):
+        if target <= version:
+            continue
+        with transaction() as conn:
+            cursor = conn.cursor()
+            # Another process may have migrated while we waited for the lock
+            if cursor.execute('PRAGMA user_version').fetchone()[0] >= target:
+                continue
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {target}')
+        print(f"Schema Update: Migrated database to version {target} ({migration.__name__}).")
+
+# FTS5 index name -> (content table, indexed columns)
+FTS_TABLES = {
+    'episodes_fts': ('episodes', ['topic', 'title', 'notes', 'tags']),
+    'facts_fts': ('facts', ['topic', 'subject', 'predicate', 'object']),
+}
+
+def _init_fts(cursor):
+    """Create external-content FTS5 tables kept in sync with their tables by triggers."""
+    for fts, (table, columns) in FTS_TABLES.items():
+        exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)).fetchone()
+        cols = ', '.join(columns)
+        new_cols = ', '.join(f'new.{c}' for c in columns)
+        old_cols = ', '.join(f'old.{c}' for c in columns)
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+            USING fts5({cols}, content='{table}', content_rowid='id', tokenize='porter unicode61')
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        """)
+        if not exists:
+            # Index rows written before the FTS table existed
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            print(f"Schema Update: Built full-text index {fts}.")
 
 # ... (omitted existing functions) ...
 
+def _link_coverage_evidence(conn, coverage_id, episode_ids, fact_ids):
+    """Write a coverage record's evidence into the junction tables (in list order)."""
+    conn.executemany(
+        'INSERT INTO coverage_episodes (coverage_id, position, episode_id) VALUES (?, ?, ?)',
+        [(coverage_id, pos, int(ep_id)) for pos, ep_id in enumerate(episode_ids or [])]
+    )
+    conn.executemany(
+        'INSERT INTO coverage_facts (coverage_id, position, fact_id) VALUES (?, ?, ?)',
+        [(coverage_id, pos, int(fact_id)) for pos, fact_id in enumerate(fact_ids or [])]
+    )
+
+def coverage_tokens(normalized_subquestion: str) -> list[str]:
+    """Distinct tokens of a normalized subquestion (the unit of fuzzy matching)."""
+    return sorted(set((normalized_subquestion or '').split()))
+
+def _index_coverage_tokens(conn, coverage_id, topic, normalized_subquestion):
+    """Record a coverage row's tokens in the inverted index and its token_count."""
+    tokens = coverage_tokens(normalized_subquestion)
+    conn.executemany(
+        'INSERT OR IGNORE INTO coverage_tokens (topic_key, token, coverage_id) VALUES (lower(?), ?, ?)',
+        [(topic, token, coverage_id) for token in tokens]
+    )
+    conn.execute(
+        'UPDATE subquestion_coverage SET normalized_subquestion = ?, token_count = ? WHERE id = ?',
+        (normalized_subquestion, len(tokens), coverage_id)
+    )
+
 def add_coverage(topic, subquestion, episode_ids, fact_ids, normalized_subquestion=None):
     """Add a coverage record for a satisfied subquestion."""
     import json
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO subquestion_coverage (topic, subquestion, episode_ids, fact_ids, normalized_subquestion)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (topic, subquestion, json.dumps(episode_ids), json.dumps(fact_ids), normalized_subquestion))
-    cov_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute('''
+            INSERT INTO subquestion_coverage (topic, subquestion, episode_ids, fact_ids, normalized_subquestion)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (topic, subquestion, json.dumps(episode_ids), json.dumps(fact_ids), normalized_subquestion))
+        cov_id = cursor.lastrowid
+        _link_coverage_evidence(conn, cov_id, episode_ids, fact_ids)
+        if normalized_subquestion is not None:
+            _index_coverage_tokens(conn, cov_id, topic, normalized_subquestion)
     return cov_id
 
 def get_coverage(topic, subquestion):
@@ -106,7 +433,6 @@ def get_coverage(topic, subquestion):
         ORDER BY id DESC LIMIT 1
     ''', (topic, subquestion))
     row = cursor.fetchone()
-    conn.close()
     return dict(row) if row else None
 
 def get_coverage_by_topic(topic):
@@ -119,20 +445,16 @@ def get_coverage_by_topic(topic):
         ORDER BY id DESC
     ''', (topic,))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def add_episode(topic, notes, url=None, title=None, outcome='unknown', tags='', session_id=None):
     """Add a new episode to the database."""
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO episodes (topic, notes, url, title, outcome, tags, session_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (topic, notes, url, title, outcome, tags, session_id))
-    episode_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute('''
+            INSERT INTO episodes (topic, notes, url, title, outcome, tags, session_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (topic, notes, url, title, outcome, tags, session_id))
+        episode_id = cursor.lastrowid
     return episode_id
 
 def get_episode(episode_id):
@@ -141,7 +463,6 @@ def get_episode(episode_id):
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM episodes WHERE id = ?', (episode_id,))
     row = cursor.fetchone()
-    conn.close()
     return dict(row) if row else None
 
 def list_recent_episodes(limit=20):
@@ -150,20 +471,16 @@ def list_recent_episodes(limit=20):
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM episodes ORDER BY created_at DESC LIMIT ?', (limit,))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def add_fact(topic, subject, predicate, object_, confidence=0.7, source_episode_id=None, source_url=None, session_id=None):
     """Add a new fact to the database."""
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO facts (topic, subject, predicate, object, confidence, source_episode_id, source_url, session_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (topic, subject, predicate, object_, confidence, source_episode_id, source_url, session_id))
-    fact_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute('''
+            INSERT INTO facts (topic, subject, predicate, object, confidence, source_episode_id, source_url, session_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (topic, subject, predicate, object_, confidence, source_episode_id, source_url, session_id))
+        fact_id = cursor.lastrowid
     return fact_id
 
 def get_fact(fact_id):
@@ -172,8 +489,6 @@ def get_fact(fact_id):
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM facts WHERE id = ?', (fact_id,))
     row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else None
     return dict(row) if row else None
 
 def get_episodes_by_ids(ids: list[int]) -> list[dict]:
@@ -188,7 +503,6 @@ def get_episodes_by_ids(ids: list[int]) -> list[dict]:
     placeholders = ','.join('?' for _ in ids)
     cursor.execute(f'SELECT * FROM episodes WHERE id IN ({placeholders})', ids)
     rows = cursor.fetchall()
-    conn.close()
     
     # Create a lookup map
     lookup = {row['id']: dict(row) for row in rows}
@@ -196,6 +510,15 @@ def get_episodes_by_ids(ids: list[int]) -> list[dict]:
     # Reassemble in requested order, skipping missing
     return [lookup[i] for i in ids if i in lookup]
 
+def get_coverage_by_ids(ids: list[int]) -> list[dict]:
+    """Retrieve coverage records by a list of IDs, maintaining order."""
+    if not ids:
+        return []
+    placeholders = ','.join('?' for _ in ids)
+    rows = connect().execute(f'SELECT * FROM subquestion_coverage WHERE id IN ({placeholders})', ids).fetchall()
+    lookup = {row['id']: dict(row) for row in rows}
+    return [lookup[i] for i in ids if i in lookup]
+
 def get_facts_by_ids(ids: list[int]) -> list[dict]:
     """Retrieve facts by a list of IDs, maintaining order."""
     if not ids:
@@ -207,7 +530,6 @@ def get_facts_by_ids(ids: list[int]) -> list[dict]:
     placeholders = ','.join('?' for _ in ids)
     cursor.execute(f'SELECT * FROM facts WHERE id IN ({placeholders})', ids)
     rows = cursor.fetchall()
-    conn.close()
     
     lookup = {row['id']: dict(row) for row in rows}
     
@@ -219,7 +541,6 @@ def get_episodes_by_topic(topic: str) -> list[dict]:
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM episodes WHERE lower(topic) = lower(?) ORDER BY id DESC', (topic,))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def get_latest_session_id(topic: str) -> str:
@@ -228,7 +549,6 @@ def get_latest_session_id(topic: str) -> str:
     cursor = conn.cursor()
     cursor.execute('SELECT session_id FROM episodes WHERE lower(topic) = lower(?) AND session_id IS NOT NULL ORDER BY id DESC LIMIT 1', (topic,))
     row = cursor.fetchone()
-    conn.close()
     return row['session_id'] if row else None
 
 def get_episodes_by_topic_and_session(topic: str, session_id: str) -> list[dict]:
@@ -237,7 +557,6 @@ def get_episodes_by_topic_and_session(topic: str, session_id: str) -> list[dict]
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM episodes WHERE lower(topic) = lower(?) AND session_id = ? ORDER BY id DESC', (topic, session_id))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def get_facts_by_topic_and_session(topic: str, session_id: str) -> list[dict]:
@@ -246,10 +565,371 @@ def get_facts_by_topic_and_session(topic: str, session_id: str) -> list[dict]:
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM facts WHERE lower(topic) = lower(?) AND session_id = ? ORDER BY id DESC', (topic, session_id))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 
+# Stay under SQLite's default host-parameter limit on older builds
+_MAX_SQL_VARIABLES = 999
+
+_EPISODE_DEFAULTS = {'url': None, 'title': None, 'outcome': 'unknown', 'tags': '', 'session_id': None}
+_FACT_DEFAULTS = {'confidence': 0.7, 'source_episode_id': None, 'source_url': None, 'session_id': None}
+_COVERAGE_DEFAULTS = {'normalized_subquestion': None}
+
+def _insert_many(table, required, defaults, rows):
+    """
+    Multi-row INSERT ... RETURNING * inside one transaction.
+    Returns the inserted rows (ids and column defaults included) in insertion order.
+    """
+    if not rows:
+        return []
+    columns = list(required) + list(defaults)
+    per_statement = max(1, _MAX_SQL_VARIABLES // len(columns))
+    row_sql = '(' + ', '.join('?' * len(columns)) + ')'
+
+    inserted = []
+    with transaction() as conn:
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+            params = []
+            for row in chunk:
+                missing = [c for c in required if row.get(c) is None]
+                if missing:
+                    raise ValueError(f"{table} row is missing {', '.join(missing)}")
+                params.extend(row[c] if c in required else row.get(c, defaults[c]) for c in columns)
+            cursor = conn.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))} RETURNING *",
+                params
+            )
+            inserted.extend(dict(r) for r in cursor.fetchall())
+    # RETURNING order is unspecified; ids are assigned in VALUES order
+    return sorted(inserted, key=lambda r: r['id'])
+
+def add_episodes_bulk(rows: list[dict]) -> list[dict]:
+    """
+    Insert many episodes in one transaction.
+    Each row takes add_episode's keyword names; returns the full inserted rows.
+    """
+    return _insert_many('episodes', ('topic', 'notes'), _EPISODE_DEFAULTS, rows)
+
+def add_facts_bulk(rows: list[dict]) -> list[dict]:
+    """
+    Insert many facts in one transaction.
+    Each row takes add_fact's keyword names (with 'object' for object_);
+    returns the full inserted rows.
+    """
+    rows = [{**r, 'object': r.get('object', r.get('object_'))} for r in rows]
+    return _insert_many('facts', ('topic', 'subject', 'predicate', 'object'), _FACT_DEFAULTS, rows)
+
+def add_coverage_bulk(rows: list[dict]) -> list[dict]:
+    """
+    Insert many coverage records in one transaction.
+    Each row takes add_coverage's keyword names; returns the full inserted rows.
+    """
+    import json
+    encoded = [{**r, 'episode_ids': json.dumps(r.get('episode_ids') or []), 'fact_ids': json.dumps(r.get('fact_ids') or [])} for r in rows]
+    with transaction() as conn:
+        inserted = _insert_many('subquestion_coverage', ('topic', 'subquestion', 'episode_ids', 'fact_ids'), _COVERAGE_DEFAULTS, encoded)
+        for cov, row in zip(inserted, rows):
+            _link_coverage_evidence(conn, cov['id'], row.get('episode_ids'), row.get('fact_ids'))
+            if row.get('normalized_subquestion') is not None:
+                _index_coverage_tokens(conn, cov['id'], cov['topic'], row['normalized_subquestion'])
+                cov['token_count'] = len(coverage_tokens(row['normalized_subquestion']))
+    return inserted
+
+# Columns hydrated by get_coverage_with_evidence (kept in step with the migrations)
+_COVERAGE_COLUMNS = ('id', 'created_at', 'topic', 'subquestion', 'episode_ids', 'fact_ids', 'normalized_subquestion', 'token_count', 'embedded_in')
+_EPISODE_COLUMNS = ('id', 'created_at', 'topic', 'url', 'title', 'notes', 'outcome', 'tags', 'session_id')
+_FACT_COLUMNS = ('id', 'created_at', 'topic', 'subject', 'predicate', 'object', 'confidence', 'source_episode_id', 'source_url', 'session_id')
+
+def _json_object_sql(alias, columns):
+    return 'json_object(' + ', '.join(f"'{c}', {alias}.{c}" for c in columns) + ')'
+
+def get_coverage_with_evidence(topic: str, subquestions: list[str]) -> dict:
+    """
+    Latest coverage record for each subquestion (case-insensitive exact match),
+    hydrated with its episodes and facts in one query.
+
+    Returns {subquestion: {**coverage, 'episodes': [...], 'facts': [...]}} for the
+    subquestions that have coverage; evidence keeps the order it was recorded in.
+    """
+    import json
+    if not subquestions:
+        return {}
+    # SQLite lowers both sides (ASCII only), so the match is the same as get_coverage()
+    wanted = list(dict.fromkeys(subquestions))
+
+    placeholders = ', '.join('(?)' for _ in wanted)
+    sql = f'''
+        WITH wanted(q) AS (VALUES {placeholders}),
+        latest AS (
+            SELECT MAX(c.id) AS id, lower(c.subquestion) AS match_key FROM subquestion_coverage c
+            JOIN wanted w ON lower(c.subquestion) = lower(w.q)
+            WHERE lower(c.topic) = lower(?)
+            GROUP BY lower(c.subquestion)
+        )
+        SELECT c.id AS coverage_id, 0 AS kind, 0 AS position, w.q AS wanted_q, {_json_object_sql('c', _COVERAGE_COLUMNS)} AS payload
+        FROM subquestion_coverage c JOIN latest l ON c.id = l.id JOIN wanted w ON lower(w.q) = l.match_key
+        UNION ALL
+        SELECT ce.coverage_id, 1, ce.position, NULL, {_json_object_sql('e', _EPISODE_COLUMNS)}
+        FROM coverage_episodes ce JOIN latest l ON ce.coverage_id = l.id JOIN episodes e ON e.id = ce.episode_id
+        UNION ALL
+        SELECT cf.coverage_id, 2, cf.position, NULL, {_json_object_sql('f', _FACT_COLUMNS)}
+        FROM coverage_facts cf JOIN latest l ON cf.coverage_id = l.id JOIN facts f ON f.id = cf.fact_id
+        ORDER BY coverage_id, kind, position
+    '''
+    rows = connect().execute(sql, (*wanted, topic)).fetchall()
+
+    by_id = {}
+    results = {}
+    for row in rows:
+        if row['kind'] == 0:
+            # One row per requested spelling; they share the hydrated record
+            if row['coverage_id'] not in by_id:
+                by_id[row['coverage_id']] = {**json.loads(row['payload']), 'episodes': [], 'facts': []}
+            results[row['wanted_q']] = by_id[row['coverage_id']]
+        else:
+            by_id[row['coverage_id']]['episodes' if row['kind'] == 1 else 'facts'].append(json.loads(row['payload']))
+
+    return results
+
+def get_coverage_batch(topic: str, subquestions: list[str]) -> dict:
+    """
+    Latest coverage record for each subquestion (case-insensitive exact match),
+    in one query. Returns {subquestion: coverage} for the ones that have coverage.
+    """
+    if not subquestions:
+        return {}
+    # SQLite lowers both sides (ASCII only), so the match is the same as get_coverage()
+    wanted = list(dict.fromkeys(subquestions))
+    placeholders = ', '.join('(?)' for _ in wanted)
+    rows = connect().execute(f'''
+        WITH wanted(q) AS (VALUES {placeholders}),
+        latest AS (
+            SELECT MAX(c.id) AS id, lower(c.subquestion) AS match_key FROM subquestion_coverage c
+            JOIN wanted w ON lower(c.subquestion) = lower(w.q)
+            WHERE lower(c.topic) = lower(?)
+            GROUP BY lower(c.subquestion)
+        )
+        SELECT w.q AS wanted_q, c.* FROM subquestion_coverage c
+        JOIN latest l ON c.id = l.id JOIN wanted w ON lower(w.q) = l.match_key
+    ''', (*wanted, topic)).fetchall()
+    results = {}
+    for row in rows:
+        coverage = dict(row)
+        results[coverage.pop('wanted_q')] = coverage
+    return results
+
+def get_coverage_token_matches(topic: str, tokens: list[str]) -> list[dict]:
+    """
+    Candidate generation for fuzzy coverage matching: every coverage row of the
+    topic sharing at least one token, with those tokens in 'matched_tokens'
+    (newest first). One inverted-index lookup for any number of tokens.
+    """
+    tokens = sorted(set(tokens))
+    if not tokens:
+        return []
+    placeholders = ', '.join('?' for _ in tokens)
+    rows = connect().execute(f'''
+        SELECT c.*, m.matched_tokens FROM subquestion_coverage c
+        JOIN (
+            SELECT coverage_id, group_concat(token, ' ') AS matched_tokens FROM coverage_tokens
+            WHERE topic_key = lower(?) AND token IN ({placeholders})
+            GROUP BY coverage_id
+        ) m ON m.coverage_id = c.id
+        ORDER BY c.id DESC
+    ''', (topic, *tokens)).fetchall()
+    results = []
+    for row in rows:
+        cov = dict(row)
+        cov['matched_tokens'] = cov['matched_tokens'].split()
+        results.append(cov)
+    return results
+
+def get_unindexed_coverage(topic: str) -> list[dict]:
+    """Coverage rows of a topic not yet in the token index (legacy rows)."""
+    rows = connect().execute(
+        'SELECT * FROM subquestion_coverage WHERE lower(topic) = lower(?) AND token_count IS NULL',
+        (topic,)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+def index_coverage(normalized_by_id: dict):
+    """Backfill {coverage_id: normalized_subquestion} into the token index in one transaction."""
+    if not normalized_by_id:
+        return
+    with transaction() as conn:
+        for cov_id, normalized in normalized_by_id.items():
+            topic = conn.execute('SELECT topic FROM subquestion_coverage WHERE id = ?', (cov_id,)).fetchone()
+            if topic is not None:
+                _index_coverage_tokens(conn, cov_id, topic[0], normalized)
+
+def get_unembedded_coverage(topic: str, collection: str) -> list[dict]:
+    """
+    Coverage rows of a topic not embedded in this vector collection yet
+    (legacy rows, failed upserts or a different embedder's collection).
+    Each branch is an index range, so already-embedded rows are never read.
+    """
+    branch = 'SELECT * FROM subquestion_coverage WHERE lower(topic) = lower(?) AND embedded_in'
+    rows = connect().execute(
+        f'{branch} IS NULL UNION ALL {branch} < ? UNION ALL {branch} > ?',
+        (topic, topic, collection, topic, collection)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+def mark_coverage_embedded(coverage_ids: list[int], collection: str):
+    """Record that these coverage rows are embedded in a vector collection."""
+    if not coverage_ids:
+        return
+    with transaction() as conn:
+        conn.executemany(
+            'UPDATE subquestion_coverage SET embedded_in = ? WHERE id = ?',
+            [(collection, cov_id) for cov_id in coverage_ids]
+        )
+
+def get_coverage_by_episode(episode_id: int) -> list[dict]:
+    """Coverage records that cite an episode as evidence (newest first)."""
+    rows = connect().execute('''
+        SELECT c.* FROM subquestion_coverage c
+        WHERE c.id IN (SELECT coverage_id FROM coverage_episodes WHERE episode_id = ?)
+        ORDER BY c.id DESC
+    ''', (episode_id,)).fetchall()
+    return [dict(row) for row in rows]
+
+def get_coverage_by_fact(fact_id: int) -> list[dict]:
+    """Coverage records that cite a fact as evidence (newest first)."""
+    rows = connect().execute('''
+        SELECT c.* FROM subquestion_coverage c
+        WHERE c.id IN (SELECT coverage_id FROM coverage_facts WHERE fact_id = ?)
+        ORDER BY c.id DESC
+    ''', (fact_id,)).fetchall()
+    return [dict(row) for row in rows]
+
+def record_source(url: str, episode_id: int, content_hash: str = None, fetched_at: str = None):
+    """
+    Point a URL's source index entry at its latest episode.
+    fetched_at defaults to now; pass the original fetch time when an episode is reused without fetching.
+    """
+    connect().execute('''
+        INSERT INTO sources (canonical_url, url, episode_id, content_hash, fetched_at)
+        VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ON CONFLICT (canonical_url) DO UPDATE SET
+            url = excluded.url,
+            episode_id = excluded.episode_id,
+            content_hash = COALESCE(excluded.content_hash, sources.content_hash),
+            fetched_at = excluded.fetched_at
+    ''', (canonical_url(url), url, episode_id, content_hash, fetched_at))
+
+def get_sources(urls: list[str]) -> dict:
+    """Source index entries for a batch of URLs: {url: {canonical_url, url, episode_id, content_hash, fetched_at}}."""
+    keys = {url: canonical_url(url) for url in urls if url}
+    if not keys:
+        return {}
+    unique = list(set(keys.values()))
+    rows = {}
+    for start in range(0, len(unique), _MAX_SQL_VARIABLES):
+        chunk = unique[start:start + _MAX_SQL_VARIABLES]
+        placeholders = ','.join('?' for _ in chunk)
+        for row in connect().execute(f'SELECT * FROM sources WHERE canonical_url IN ({placeholders})', chunk):
+            rows[row['canonical_url']] = dict(row)
+    return {url: rows[key] for url, key in keys.items() if key in rows}
+
+def get_facts_by_episode(episode_id: int) -> list[dict]:
+    """Facts extracted from an episode, in insertion order."""
+    rows = connect().execute('SELECT * FROM facts WHERE source_episode_id = ? ORDER BY id', (episode_id,)).fetchall()
+    return [dict(row) for row in rows]
+
+def save_checkpoint(session_id: str, stage: str, data):
+    """Store (or replace) a stage's JSON checkpoint for a research session."""
+    import json
+    connect().execute('''
+        INSERT INTO run_checkpoints (session_id, stage, data) VALUES (?, ?, ?)
+        ON CONFLICT (session_id, stage) DO UPDATE SET data = excluded.data, updated_at = CURRENT_TIMESTAMP
+    ''', (session_id, stage, json.dumps(data, default=str)))
+
+def get_checkpoints(session_id: str) -> dict:
+    """All checkpoints of a research session: {stage: data}."""
+    import json
+    rows = connect().execute('SELECT stage, data FROM run_checkpoints WHERE session_id = ?', (session_id,)).fetchall()
+    return {row['stage']: json.loads(row['data']) for row in rows}
+
+_USAGE_COUNTERS = ('llm_calls', 'cached_llm_calls', 'prompt_tokens', 'completion_tokens', 'embedding_calls', 'embedding_tokens', 'cost_usd')
+
+def add_session_usage(session_id: str, topic: str, total: dict, by_stage: dict = None):
+    """
+    Add one run's usage ({counter: value} totals and per-stage totals) to the session's row.
+    Resumed runs and reports on the same session accumulate into it.
+    """
+    import json
+    with transaction() as conn:
+        row = conn.execute('SELECT by_stage FROM session_usage WHERE session_id = ?', (session_id,)).fetchone()
+        stages = json.loads(row['by_stage']) if row else {}
+        for stage, counters in (by_stage or {}).items():
+            merged = stages.setdefault(stage, {})
+            for key in _USAGE_COUNTERS:
+                merged[key] = merged.get(key, 0) + counters.get(key, 0)
+
+        values = [total.get(key, 0) for key in _USAGE_COUNTERS]
+        columns = ', '.join(_USAGE_COUNTERS)
+        placeholders = ', '.join('?' for _ in _USAGE_COUNTERS)
+        increments = ', '.join(f'{key} = {key} + excluded.{key}' for key in _USAGE_COUNTERS)
+        conn.execute(f'''
+            INSERT INTO session_usage (session_id, topic, runs, {columns}, by_stage)
+            VALUES (?, ?, 1, {placeholders}, ?)
+            ON CONFLICT (session_id) DO UPDATE SET
+                topic = COALESCE(excluded.topic, session_usage.topic),
+                runs = runs + 1,
+                {increments},
+                by_stage = excluded.by_stage,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (session_id, topic, *values, json.dumps(stages)))
+
+def get_session_usage(session_id: str) -> dict:
+    """A session's accumulated usage row (by_stage decoded), or None."""
+    import json
+    row = connect().execute('SELECT * FROM session_usage WHERE session_id = ?', (session_id,)).fetchone()
+    if not row:
+        return None
+    data = dict(row)
+    data['by_stage'] = json.loads(data['by_stage'])
+    return data
+
+
+def _fts_match_expr(text: str) -> str:
+    """Turn free text into a safe FTS5 OR-query of quoted terms (BM25 does the weighting)."""
+    terms = []
+    for token in re.findall(r"\w+", text.lower()):
+        if token not in terms:
+            terms.append(token)
+    return " OR ".join(f'"{t}"' for t in terms)
+
+def _search_fts(fts, table, query, limit, topic, session_id):
+    match = _fts_match_expr(query or "")
+    if not match:
+        return []
+    sql = f'SELECT t.id FROM {fts} JOIN {table} t ON t.id = {fts}.rowid WHERE {fts} MATCH ?'
+    params = [match]
+    if topic:
+        sql += ' AND lower(t.topic) = lower(?)'
+        params.append(topic)
+    if session_id:
+        sql += ' AND t.session_id = ?'
+        params.append(session_id)
+    sql += f' ORDER BY bm25({fts}) LIMIT ?'
+    params.append(limit)
+
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    return [row['id'] for row in rows]
+
+def search_episodes_fts(query: str, limit: int = 10, topic: str = None, session_id: str = None) -> list[int]:
+    """Lexical (BM25) search over episodes. Returns episode IDs, best match first."""
+    return _search_fts('episodes_fts', 'episodes', query, limit, topic, session_id)
+
+def search_facts_fts(query: str, limit: int = 10, topic: str = None, session_id: str = None) -> list[int]:
+    """Lexical (BM25) search over facts. Returns fact IDs, best match first."""
+    return _search_fts('facts_fts', 'facts', query, limit, topic, session_id)
 
 
 if __name__ == '__main__':
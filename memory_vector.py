@@ -2,15 +2,90 @@ import chromadb
 from chromadb.config import Settings
 from openai import OpenAI
 import os
+import re
+import embedding_cache
+import tracing
+import embedders
 
-EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_MODEL = embedders.OPENAI_EMBEDDING_MODEL
+
+# Embeddings API limits: 2048 inputs per request and a total token cap per request.
+# Characters are used as a cheap, conservative proxy for tokens (~4 chars/token).
+EMBEDDING_BATCH_MAX_INPUTS = 2048
+EMBEDDING_BATCH_MAX_CHARS = 600_000
+
+def _embedding_batches(texts: list[str]):
+    """Split texts into batches that respect the embeddings API input limits."""
+    batch = []
+    batch_chars = 0
+    for text in texts:
+        if batch and (len(batch) >= EMBEDDING_BATCH_MAX_INPUTS or batch_chars + len(text) > EMBEDDING_BATCH_MAX_CHARS):
+            yield batch
+            batch = []
+            batch_chars = 0
+        batch.append(text)
+        batch_chars += len(text)
+    if batch:
+        yield batch
+
+def collection_name(base: str, embedder) -> str:
+    """
+    Collection name for an embedder. The default OpenAI model keeps the
+    original names; any other embedder gets its own suffixed collections so
+    vectors of different dimensions/spaces never mix.
+    """
+    if getattr(embedder, "model", None) == EMBEDDING_MODEL:
+        return base
+    suffix = re.sub(r"[^a-zA-Z0-9_-]", "-", embedder.model)
+    return f"{base}__{suffix}"
+
+# Collection metadata flag set once every stored vector carries a topic_key
+TOPIC_KEY_BACKFILLED = "topic_key_backfilled"
+
+def _with_topic_key(metas: list[dict]) -> list[dict]:
+    """Add the lowercased topic_key that build_where() filters on."""
+    return [
+        {**meta, "topic_key": meta["topic"].lower()} if isinstance(meta.get("topic"), str) and "topic_key" not in meta else meta
+        for meta in metas
+    ]
+
+def build_where(topic: str = None, session_id: str = None):
+    """
+    Build a Chroma metadata filter from the topic/session_id stored on upsert.
+    Returns None when no filter applies. Topics match case-insensitively
+    (via topic_key), like the SQLite lookups.
+    """
+    clauses = []
+    if topic:
+        clauses.append({"topic_key": topic.lower()})
+    if session_id:
+        clauses.append({"session_id": session_id})
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
 
 class VectorMemory:
-    def __init__(self):
-        # Initialize OpenAI client
-        self.client = OpenAI()
+    def __init__(self, use_embedding_cache: bool = None, embedder=None):
+        # Select embedder: explicit instance, name ('openai'/'local') or RESEARCH_AGENT_EMBEDDER
+        if embedder is None or isinstance(embedder, str):
+            name = embedder or embedders.embedder_name_from_env()
+            if name == "local":
+                embedder = embedders.HashingEmbedder()
+            elif name == "openai":
+                embedder = embedders.OpenAIEmbedder(OpenAI(), model=EMBEDDING_MODEL)
+            else:
+                raise ValueError(f"Unknown embedder '{name}'. Expected 'openai' or 'local'.")
+        self.embedder = embedder
+        # OpenAI client (None for offline embedders)
+        self.client = getattr(embedder, "client", None)
+
+        # Embedding cache (opt out per instance or via RESEARCH_AGENT_EMBEDDING_CACHE=0)
+        if use_embedding_cache is None:
+            use_embedding_cache = embedding_cache.cache_enabled() and getattr(embedder, "cacheable", True)
+        self.embedding_cache = embedding_cache.EmbeddingCache() if use_embedding_cache else None
         
-        # Initialize Chroma Persistent Client
         # Initialize Chroma Persistent Client
         base_dir = os.path.dirname(os.path.abspath(__file__))
         chroma_path = os.path.join(base_dir, 'data', 'chroma')
@@ -20,69 +95,147 @@ class VectorMemory:
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Create/Get Collections
-        self.episodic = self.chroma_client.get_or_create_collection(name="episodic_memory")
-        self.semantic = self.chroma_client.get_or_create_collection(name="semantic_memory")
-        self.procedural = self.chroma_client.get_or_create_collection(name="procedural_memory")
+        # Create/Get Collections (separate per embedder)
+        self.episodic = self.chroma_client.get_or_create_collection(name=collection_name("episodic_memory", embedder))
+        self.semantic = self.chroma_client.get_or_create_collection(name=collection_name("semantic_memory", embedder))
+        self.procedural = self.chroma_client.get_or_create_collection(name=collection_name("procedural_memory", embedder))
+        # Coverage subquestions, compared by cosine similarity
+        self.coverage = self.chroma_client.get_or_create_collection(
+            name=collection_name("coverage_memory", embedder),
+            metadata={"hnsw:space": "cosine"}
+        )
+        for collection in (self.episodic, self.semantic):
+            try:
+                self._backfill_topic_keys(collection)
+            except Exception as e:
+                print(f"Warning: topic_key backfill failed for {collection.name}: {e}")
+
+    def _backfill_topic_keys(self, collection, page_size: int = 1000):
+        """One-time pass adding topic_key to vectors stored before it existed; flags the collection when done."""
+        metadata = collection.metadata or {}
+        if metadata.get(TOPIC_KEY_BACKFILLED):
+            return
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            stale = [(doc_id, meta) for doc_id, meta in zip(page["ids"], page["metadatas"]) if meta and "topic_key" not in meta]
+            if stale:
+                # update() merges into the existing metadata
+                collection.update(
+                    ids=[doc_id for doc_id, _ in stale],
+                    metadatas=_with_topic_key([meta for _, meta in stale])
+                )
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+        collection.modify(metadata={**metadata, TOPIC_KEY_BACKFILLED: True})
 
     def embed(self, text: str) -> list[float]:
-        """Generate embedding for text using OpenAI."""
-        response = self.client.embeddings.create(
-            input=text,
-            model=EMBEDDING_MODEL
-        )
-        return response.data[0].embedding
+        """Generate embedding for text, served from the cache when possible."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for many texts with one embedder call per batch.
+        Cached texts are skipped and duplicate texts are only embedded once.
+        """
+        model = self.embedder.model
+        # One cache lookup (and one recency commit) for the whole call
+        embeddings = self.embedding_cache.get_many(model, texts) if self.embedding_cache else [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            if embeddings[i] is None:
+                pending.setdefault(text, []).append(i)
+
+        for batch in _embedding_batches(list(pending)):
+            with tracing.span("embeddings", texts=len(batch)):
+                batch_embeddings = self.embedder.embed_many(batch)
+            for text, embedding in zip(batch, batch_embeddings):
+                for i in pending[text]:
+                    embeddings[i] = embedding
+            if self.embedding_cache:
+                self.embedding_cache.put_many(model, batch, batch_embeddings)
+
+        return embeddings
+
+    def _upsert_many(self, collection, prefix: str, ids: list, canonical_texts: list[str], metas: list[dict]):
+        if not ids:
+            return
+        embeddings = self.embed_many(canonical_texts)
+        with tracing.span("chroma.upsert", collection=prefix, count=len(ids)):
+            collection.upsert(
+                ids=[f"{prefix}:{i}" for i in ids],
+                embeddings=embeddings,
+                documents=list(canonical_texts),
+                metadatas=_with_topic_key(metas)
+            )
 
     def upsert_episode(self, episode_id: int, canonical_text: str, meta: dict):
         """Upsert an episode into the episodic memory collection."""
-        embedding = self.embed(canonical_text)
-        self.episodic.upsert(
-            ids=[f"episode:{episode_id}"],
-            embeddings=[embedding],
-            documents=[canonical_text],
-            metadatas=[meta]
-        )
+        self.upsert_episodes([episode_id], [canonical_text], [meta])
 
     def upsert_fact(self, fact_id: int, canonical_text: str, meta: dict):
         """Upsert a fact into the semantic memory collection."""
-        embedding = self.embed(canonical_text)
-        self.semantic.upsert(
-            ids=[f"fact:{fact_id}"],
-            embeddings=[embedding],
-            documents=[canonical_text],
-            metadatas=[meta]
-        )
+        self.upsert_facts([fact_id], [canonical_text], [meta])
 
     def upsert_skill(self, skill_id: str, canonical_text: str, meta: dict):
         """Upsert a skill into the procedural memory collection."""
-        embedding = self.embed(canonical_text)
-        self.procedural.upsert(
-            ids=[f"skill:{skill_id}"],
-            embeddings=[embedding],
-            documents=[canonical_text],
-            metadatas=[meta]
-        )
+        self.upsert_skills([skill_id], [canonical_text], [meta])
 
-    def query_episodic(self, query: str, k=10):
-        """Query episodic memory."""
-        embedding = self.embed(query)
-        return self.episodic.query(
-            query_embeddings=[embedding],
-            n_results=k
-        )
+    def upsert_episodes(self, episode_ids: list[int], canonical_texts: list[str], metas: list[dict]):
+        """Bulk upsert episodes: one embeddings request per batch and one Chroma upsert."""
+        self._upsert_many(self.episodic, "episode", episode_ids, canonical_texts, metas)
 
-    def query_semantic(self, query: str, k=10):
-        """Query semantic memory."""
-        embedding = self.embed(query)
-        return self.semantic.query(
-            query_embeddings=[embedding],
-            n_results=k
-        )
+    def upsert_facts(self, fact_ids: list[int], canonical_texts: list[str], metas: list[dict]):
+        """Bulk upsert facts: one embeddings request per batch and one Chroma upsert."""
+        self._upsert_many(self.semantic, "fact", fact_ids, canonical_texts, metas)
 
-    def query_procedural(self, query: str, k=3):
-        """Query procedural memory."""
-        embedding = self.embed(query)
-        return self.procedural.query(
-            query_embeddings=[embedding],
-            n_results=k
-        )
+    def upsert_skills(self, skill_ids: list[str], canonical_texts: list[str], metas: list[dict]):
+        """Bulk upsert skills: one embeddings request per batch and one Chroma upsert."""
+        self._upsert_many(self.procedural, "skill", skill_ids, canonical_texts, metas)
+
+    def upsert_coverage(self, coverage_ids: list[int], subquestions: list[str], metas: list[dict]):
+        """Bulk upsert coverage records, embedding the subquestion text."""
+        self._upsert_many(self.coverage, "coverage", coverage_ids, subquestions, metas)
+
+    def query_coverage(self, queries: list[str], topic: str = None, k: int = 1) -> list[list[tuple]]:
+        """
+        Nearest stored coverage subquestions for each query (one batched query).
+        Returns, per query, a list of (coverage_id, cosine_similarity), best first.
+        """
+        if not queries or self.coverage.count() == 0:
+            return [[] for _ in queries]
+        params = {
+            "query_embeddings": self.embed_many(queries),
+            "n_results": k,
+            "include": ["distances"]
+        }
+        if topic:
+            params["where"] = {"topic_key": topic.lower()}
+        with tracing.span("chroma.query", collection="coverage", k=k, queries=len(queries)):
+            results = self.coverage.query(**params)
+        return [
+            [(int(cid.split(":")[1]), 1.0 - dist) for cid, dist in zip(ids, dists)]
+            for ids, dists in zip(results["ids"], results["distances"])
+        ]
+
+    def _query(self, collection, query: str, k: int, query_embedding: list[float] = None, where: dict = None):
+        if query_embedding is None:
+            query_embedding = self.embed(query)
+        params = {"query_embeddings": [query_embedding], "n_results": k}
+        if where:
+            params["where"] = where
+        with tracing.span("chroma.query", collection=getattr(collection, "name", None), k=k):
+            return collection.query(**params)
+
+    def query_episodic(self, query: str, k=10, query_embedding: list[float] = None, where: dict = None):
+        """Query episodic memory. Pass query_embedding to skip re-embedding the query, where to filter on metadata."""
+        return self._query(self.episodic, query, k, query_embedding, where)
+
+    def query_semantic(self, query: str, k=10, query_embedding: list[float] = None, where: dict = None):
+        """Query semantic memory. Pass query_embedding to skip re-embedding the query, where to filter on metadata."""
+        return self._query(self.semantic, query, k, query_embedding, where)
+
+    def query_procedural(self, query: str, k=3, query_embedding: list[float] = None, where: dict = None):
+        """Query procedural memory. Pass query_embedding to skip re-embedding the query, where to filter on metadata."""
+        return self._query(self.procedural, query, k, query_embedding, where)
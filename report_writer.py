@@ -4,6 +4,11 @@ from openai import OpenAI
 import memory_vector
 import memory_truth
 import router
+import llm_cache
+import evidence_packer
+import runtime
+import tracing
+import usage
 
 def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, session_id: str = None, on_status: callable = None) -> str:
     """
@@ -18,7 +23,20 @@ def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, sess
     Returns:
         str: The generated report text.
     """
-    
+    with tracing.span("generate_report", topic=topic) as root:
+        report = _generate_report(topic, max_episodes, max_facts, session_id, on_status)
+
+    # Standalone reports add their tokens to the session's usage (inside a larger run the caller records them)
+    session_id = root.attrs.get("session_id")
+    if session_id and root.parent is None:
+        try:
+            total = usage.totals(root.to_dict())
+            memory_truth.add_session_usage(session_id, topic, total, {"generate_report": total})
+        except Exception as e:
+            print(f"Warning: failed to record report usage: {e}")
+    return report
+
+def _generate_report(topic: str, max_episodes: int, max_facts: int, session_id: str, on_status: callable) -> str:
     def _log_status(msg: str):
         print(msg)
         if on_status:
@@ -26,22 +44,29 @@ def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, sess
 
     # 1. Initialize
     _log_status("[STATUS] Initializing report writer resources...")
-    memory_truth.init_db()
-    vm = memory_vector.VectorMemory()
-    openai_client = OpenAI()
+    pool = runtime.get_pool()
+    pool.call_once(memory_truth.init_db)
+    vm = pool.get(memory_vector.VectorMemory)
+    openai_client = pool.get(OpenAI)
     
-    # 2. Retrieve Context
-    _log_status(f"[STATUS] Retrieving memory context for research topic: {topic}")
-    context = router.retrieve_router(vm, topic, k_epi=max_episodes, k_sem=max_facts)
-    
-    # 3. Strict Context Assembly (Source of Truth: SQLite)
-    # Determine Session ID
+    # 2. Determine Session ID
     if not session_id:
         session_id = memory_truth.get_latest_session_id(topic)
         print(f"No session specified. Using latest session: {session_id}")
     
     if not session_id:
         return "No session found for this topic."
+    tracing.current().set(session_id=session_id)
+
+    # 3. Retrieve Context (filtered to this session inside Chroma; a session covers one topic)
+    _log_status(f"[STATUS] Retrieving memory context for research topic: {topic}")
+    context = router.retrieve_router(
+        vm, topic, k_epi=max_episodes, k_sem=max_facts,
+        where=memory_vector.build_where(session_id=session_id),
+        hybrid=True
+    )
+    
+    # Strict Context Assembly (Source of Truth: SQLite)
 
     # Fetch ALL episodes for this topic AND session from Truth Store
     _log_status("[STATUS] Analyzing and ranking episodic memories...")
@@ -85,7 +110,7 @@ def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, sess
     
     episodes = final_episodes
 
-    # Load Semantic Facts (Standard Chroma Load, filtered by topic)
+    # Load Semantic Facts (Chroma results are already topic/session filtered)
     fact_doc_ids = context.get('semantic', {}).get('ids', [])
     fact_ints = []
     for doc_id in fact_doc_ids:
@@ -93,13 +118,8 @@ def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, sess
             fact_ints.append(int(doc_id.split(':')[1]))
         except (IndexError, ValueError):
             continue
-    facts = memory_truth.get_facts_by_ids(fact_ints)
-    facts = [f for f in facts if f['topic'].lower() == topic.lower()]
-    # Also filter facts by session validity? 
-    # Since semantic search crosses boundaries, we must ensure facts belong to our session.
-    # We can fetch ALL session facts and intersect, or just trust the DB helper if we load from scratch?
-    # The current code loads via Chroma IDs -> then checks DB.
-    # Better approach for strictness: Use get_facts_by_topic_and_session and intersect with Chroma results.
+    # For strictness, still intersect with the session's facts in SQLite
+    # (SQLite is the source of truth; vector metadata can drift).
     
     session_facts = memory_truth.get_facts_by_topic_and_session(topic, session_id)
     session_fact_map = {f['id']: f for f in session_facts}
@@ -125,6 +145,22 @@ def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, sess
     
     facts = final_facts
 
+    # Fit the evidence into the report token budget (episodes first, facts get the rest)
+    def render_episode(e):
+        url = e.get('url', 'No URL')
+        title = e.get('title', 'Untitled')
+        
+        # Format notes
+        raw_notes = e.get('notes', '')
+        note_bullets = [n.strip() for n in raw_notes.replace('\n', ' ').split('. ') if n.strip()]
+        formatted_notes = "\n".join(f"    * {n}" for n in note_bullets)
+        
+        return f"- Title: {title}\n  URL: {url}\n  Evidence Notes:\n{formatted_notes}"
+
+    budget = evidence_packer.budget_for("report")
+    episode_pack = evidence_packer.pack(episodes, budget * 2 // 3, render_episode, max_item_tokens=800)
+    episodes = episode_pack.items
+
     # 5. Validation Check
     # We must have topic-scoped allowed_urls to proceed
     allowed_urls = []
@@ -147,26 +183,18 @@ def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, sess
     skill_context = f"Selected Approach/Skill: {selected_skill}"
     
     # Format Facts
-    facts_text = "Key Semantic Facts:\n"
-    for f in facts:
+    def render_fact(f):
         # Note: We do NOT whitelist fact source URLs unless they are also in the evidence episodes.
         # This prevents citing sources we don't have full context for.
         source_url = f.get('source_url')
         source_info = f"(Source: {source_url})" if source_url and source_url in allowed_urls else ""
-        facts_text += f"- {f['subject']} {f['predicate']} {f['object']} [Confidence: {f['confidence']}] {source_info}\n"
+        return f"- {f['subject']} {f['predicate']} {f['object']} [Confidence: {f['confidence']}] {source_info}"
+
+    fact_pack = evidence_packer.pack(facts, budget - episode_pack.tokens, render_fact)
+    facts_text = "Key Semantic Facts:\n" + "".join(f"{t}\n" for t in fact_pack.texts)
 
     # Format Evidence
-    evidence_text = "Episodic Evidence (Source Notes):\n"
-    for e in episodes:
-        url = e.get('url', 'No URL')
-        title = e.get('title', 'Untitled')
-        
-        # Format notes
-        raw_notes = e.get('notes', '')
-        note_bullets = [n.strip() for n in raw_notes.replace('\n', ' ').split('. ') if n.strip()]
-        formatted_notes = "\n".join(f"    * {n}" for n in note_bullets)
-        
-        evidence_text += f"- Title: {title}\n  URL: {url}\n  Evidence Notes:\n{formatted_notes}\n\n"
+    evidence_text = "Episodic Evidence (Source Notes):\n" + "".join(f"{t}\n\n" for t in episode_pack.texts)
     
     allowed_refs_text = "Allowed References:\n" + "\n".join(f"- {u}" for u in allowed_urls)
 
@@ -198,7 +226,8 @@ def generate_report(topic: str, max_episodes: int = 5, max_facts: int = 15, sess
     # 6. Generate with LLM
     _log_status("[STATUS] Generating report via LLM (this may take 5-10 seconds)...")
     try:
-        response = openai_client.chat.completions.create(
+        response = llm_cache.cached_chat(
+            openai_client, "report",
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
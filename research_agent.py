@@ -3,13 +3,20 @@ from datetime import datetime, timedelta
 import json
 import uuid
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from openai import OpenAI
 import memory_truth
 import memory_builders
 import memory_vector
 import router
+import llm_cache
+import evidence_packer
 import web_search
 import web_fetch
+import runtime
+import stage_graph
+import tracing
+import usage
 from typing import Optional, Callable
 
 # --- PUBLIC HELPER FUNCTIONS (UNCHANGED) ---
@@ -49,45 +56,54 @@ def evaluate_subquestions_against_memory(openai_client, topic, subquestions, epi
             fact_ints.append(int(num_str.split(":")[1]))
         except: continue
             
-    # Fetch from SQLite
-    # Limit context size
-    episodes = memory_truth.get_episodes_by_ids(ep_ints[:10]) 
-    facts = memory_truth.get_facts_by_ids(fact_ints[:25])
+    # Fetch from SQLite (a wider candidate pool; the token budget decides what goes in)
+    episodes = memory_truth.get_episodes_by_ids(ep_ints[:30])
+    facts = memory_truth.get_facts_by_ids(fact_ints[:100])
     
     # 2. Format Evidence
+    def render_episode(e):
+        # Deterministic Staleness Check
+        created_at_str = e.get('created_at')
+        is_stale = False
+        if created_at_str:
+            try:
+                # Attempt ISO parse first
+                dt = datetime.fromisoformat(str(created_at_str))
+                if datetime.now() - dt > timedelta(days=180):
+                    is_stale = True
+            except ValueError:
+                # Try other formats
+                for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+                    try:
+                        dt = datetime.strptime(str(created_at_str), fmt)
+                        if datetime.now() - dt > timedelta(days=180):
+                            is_stale = True
+                        break # Success
+                    except:
+                        pass
+        
+        return (
+            f"- ID: {e['id']} | Date: {created_at_str or 'Unknown'} | Stale: {str(is_stale).lower()} | URL: {e.get('url')}\n"
+            f"  Title: {e.get('title')}\n"
+            f"  Notes: {e['notes']}"
+        )
+
+    # Episodes get two thirds of the budget, facts the rest (plus whatever episodes leave over)
+    budget = evidence_packer.budget_for("memory_eval")
+    episode_pack = evidence_packer.pack(episodes or [], budget * 2 // 3, render_episode, max_item_tokens=120)
+    fact_pack = evidence_packer.pack(
+        facts or [], budget - episode_pack.tokens,
+        lambda f: f"- Fact: {f['subject']} {f['predicate']} {f['object']} (Conf: {f['confidence']})"
+    )
+    episodes, facts = episode_pack.items, fact_pack.items
+
     evidence_text = "--- EVIDENCE FROM MEMORY ---\n"
     
     if episodes:
-        evidence_text += "\n[EPISODIC MEMORIES]\n"
-        for e in episodes:
-            # Deterministic Staleness Check
-            created_at_str = e.get('created_at')
-            is_stale = False
-            if created_at_str:
-                try:
-                    # Attempt ISO parse first
-                    dt = datetime.fromisoformat(str(created_at_str))
-                    if datetime.now() - dt > timedelta(days=180):
-                        is_stale = True
-                except ValueError:
-                    # Try other formats
-                    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
-                        try:
-                            dt = datetime.strptime(str(created_at_str), fmt)
-                            if datetime.now() - dt > timedelta(days=180):
-                                is_stale = True
-                            break # Success
-                        except:
-                            pass
-            
-            evidence_text += f"- ID: {e['id']} | Date: {created_at_str or 'Unknown'} | Stale: {str(is_stale).lower()} | URL: {e.get('url')}\n"
-            evidence_text += f"  Title: {e.get('title')}\n"
-            evidence_text += f"  Notes: {e['notes'][:300]}...\n" # Truncate notes
+        evidence_text += "\n[EPISODIC MEMORIES]\n" + episode_pack.text("\n") + "\n"
             
     if facts:
-        evidence_text += "\n[SEMANTIC FACTS]\n"
-        for f in facts:
-            evidence_text += f"- Fact: {f['subject']} {f['predicate']} {f['object']} (Conf: {f['confidence']})\n"
+        evidence_text += "\n[SEMANTIC FACTS]\n" + fact_pack.text("\n") + "\n"
             
     if not episodes and not facts:
         evidence_text += "(No relevant memory found)"
@@ -116,7 +132,8 @@ def evaluate_subquestions_against_memory(openai_client, topic, subquestions, epi
     )
     
     try:
-        resp = openai_client.chat.completions.create(
+        resp = llm_cache.cached_chat(
+            openai_client, "memory_eval",
             model="gpt-4o",
             messages=[{"role": "user", "content": eval_prompt}],
             response_format={"type": "json_object"}
@@ -158,122 +175,231 @@ def calculate_jaccard_similarity(s1: str, s2: str) -> float:
     union = len(set1.union(set2))
     return intersection / union
 
-def compress_summaries(openai_client, topic, subquestion_statuses, on_event: Optional[Callable[[str], None]] = None):
+def match_coverage(topic: str, subquestions: list[str], threshold: float) -> dict:
+    """
+    Match subquestions to stored coverage.
+
+    Exact (case-insensitive) matches come from one batched lookup. The rest are
+    fuzzy-matched by Jaccard similarity of normalized questions, scoring only
+    candidates that share a token (one inverted-index lookup for all questions).
+
+    Returns:
+        dict: {subquestion: (coverage_row, score)} for matches with score >= threshold.
+    """
+    matches = {}
+    if not subquestions:
+        return matches
+
+    # 1. Exact Match
+    exact = memory_truth.get_coverage_batch(topic, subquestions)
+    remaining = []
+    for q in subquestions:
+        if q in exact:
+            matches[q] = (exact[q], 1.0)
+        else:
+            remaining.append(q)
+    if not remaining:
+        return matches
+
+    # Legacy rows without a normalized form are indexed on first use
+    legacy = memory_truth.get_unindexed_coverage(topic)
+    if legacy:
+        memory_truth.index_coverage({row['id']: normalize_question(row['subquestion']) for row in legacy})
+
+    # 2. Fuzzy Match (candidates share at least one token)
+    query_tokens = {q: set(memory_truth.coverage_tokens(normalize_question(q))) for q in remaining}
+    all_tokens = set().union(*query_tokens.values())
+    candidates = memory_truth.get_coverage_token_matches(topic, list(all_tokens))
+
+    for q in remaining:
+        tokens = query_tokens[q]
+        best_score = 0.0
+        best_match = None
+        for row in candidates:
+            intersection = len(tokens.intersection(row['matched_tokens']))
+            if not intersection:
+                continue
+            # Same value as calculate_jaccard_similarity over the normalized strings
+            score = intersection / (len(tokens) + row['token_count'] - intersection)
+            if score > best_score:
+                best_score = score
+                best_match = row
+        if best_match is not None and best_score >= threshold:
+            matches[q] = (best_match, best_score)
+
+    return matches
+
+def _index_coverage_vectors(vm, coverage_rows):
+    """Embed coverage subquestions into the coverage collection for semantic matching, and mark them embedded."""
+    rows = [row for row in coverage_rows if row.get('id') is not None]
+    vm.upsert_coverage(
+        [row['id'] for row in rows],
+        [row['subquestion'] for row in rows],
+        [{"topic": row['topic'], "topic_key": row['topic'].lower()} for row in rows]
+    )
+    memory_truth.mark_coverage_embedded([row['id'] for row in rows], vm.coverage.name)
+
+def semantic_match_coverage(vm, topic: str, subquestions: list[str], threshold: float) -> dict:
+    """
+    Match subquestions to stored coverage by embedding similarity, catching
+    paraphrases that share few tokens. Coverage rows of the topic that are not
+    embedded yet (e.g. recorded before this stage existed) are embedded first;
+    rows already embedded are skipped by an indexed lookup, not rescanned.
+
+    Returns:
+        dict: {subquestion: (coverage_row, cosine_similarity)} for matches >= threshold.
+    """
+    if not subquestions:
+        return {}
+
+    pending = memory_truth.get_unembedded_coverage(topic, vm.coverage.name)
+    if pending:
+        _index_coverage_vectors(vm, pending)
+
+    nearest = vm.query_coverage(subquestions, topic=topic, k=1)
+    best = {q: hits[0] for q, hits in zip(subquestions, nearest) if hits and hits[0][1] >= threshold}
+    if not best:
+        return {}
+
+    rows = {row['id']: row for row in memory_truth.get_coverage_by_ids([cid for cid, _ in best.values()])}
+    return {q: (rows[cid], sim) for q, (cid, sim) in best.items() if cid in rows}
+
+def compress_summaries(openai_client, topic, subquestion_statuses, on_event: Optional[Callable[[str], None]] = None, max_workers: int = 4):
     """
     Generate compressed summaries using ONLY memory.
+    Up to max_workers summaries are generated concurrently.
     """
     results = {}
     _emit(on_event, "Compressing summaries for satisfied questions...")
 
-    # Cache topic coverage for fuzzy fallback
-    all_coverage = None 
+    satisfied = [s.get("question") for s in subquestion_statuses if s.get("status") == "satisfied"]
+    # Questions the decision gate matched to stored coverage name the record they matched
+    covered_by = {s.get("question"): s["covered_by"] for s in subquestion_statuses if s.get("status") == "satisfied" and s.get("covered_by")}
 
-    for status in subquestion_statuses:
-        if status.get("status") != "satisfied":
-            continue
-            
-        q = status.get("question")
-        
-        # 1. Retrieve Coverage
-        cov = memory_truth.get_coverage(topic, q)
-        
-        if not cov:
-            # Fallback: Fuzzy Match
-            if all_coverage is None:
-                 all_coverage = memory_truth.get_coverage_by_topic(topic)
-            
-            norm_q = normalize_question(q)
-            best_score = 0.0
-            best_match = None
-            for row in all_coverage:
-                 cand_norm = row.get('normalized_subquestion')
-                 # Handle legacy rows
-                 if not cand_norm:
-                     cand_norm = normalize_question(row['subquestion'])
-                     
-                 score = calculate_jaccard_similarity(norm_q, cand_norm)
-                 if score > best_score:
-                     best_score = score
-                     best_match = row
-            
-            if best_score >= 0.8:
-                cov = best_match
-        
+    # 1. Retrieve Coverage + Evidence (one joined query for all exact and gate-matched questions)
+    hydrated = {}
+    if satisfied:
+        lookups = {q: covered_by.get(q, q) for q in satisfied}
+        by_lookup = memory_truth.get_coverage_with_evidence(topic, list(dict.fromkeys(lookups.values())))
+        hydrated = {q: by_lookup[lookup] for q, lookup in lookups.items() if lookup in by_lookup}
+
+    # Fallback: Fuzzy Match against the topic's coverage for the rest
+    unmatched = [q for q in satisfied if q not in hydrated]
+    if unmatched:
+        fuzzy_matches = {q: cov['subquestion'] for q, (cov, score) in match_coverage(topic, unmatched, 0.8).items()}
+        if fuzzy_matches:
+            fuzzy_hydrated = memory_truth.get_coverage_with_evidence(topic, list(set(fuzzy_matches.values())))
+            for q, matched in fuzzy_matches.items():
+                if matched in fuzzy_hydrated:
+                    hydrated[q] = fuzzy_hydrated[matched]
+
+    prompts = {}
+    for q in satisfied:
+        cov = hydrated[q] if q in hydrated else None
         if not cov:
             _emit(on_event, f"Skipping summary for '{q}': No coverage record found.")
             continue
             
         # 2. Results
-        try:
-             ep_ids = json.loads(str(cov['episode_ids']))
-             fact_ids = json.loads(str(cov['fact_ids']))
-        except:
-             ep_ids = []
-             fact_ids = []
-             
-        # Fetch Data
-        episodes = memory_truth.get_episodes_by_ids(ep_ids)
-        facts = memory_truth.get_facts_by_ids(fact_ids)
+        episodes = cov.get('episodes', [])
+        facts = cov.get('facts', [])
         
-        # 3. Context
+        # 3. Context (packed into the summary token budget)
+        budget = evidence_packer.budget_for("compress_summary")
+        episode_pack = evidence_packer.pack(
+            episodes, budget * 2 // 3, lambda e: f"Source ({e.get('created_at')}): {e.get('notes')}", max_item_tokens=125
+        )
+        fact_pack = evidence_packer.pack(
+            facts, budget - episode_pack.tokens,
+            lambda f: f"Fact: {f['subject']} {f['predicate']} {f['object']} (Conf: {f['confidence']})"
+        )
         context = f"Topic: {topic}\nQuestion: {q}\n\n[EVIDENCE]\n"
-        for e in episodes:
-            context += f"Source ({e.get('created_at')}): {e.get('notes')[:500]}\n"
-        for f in facts:
-             context += f"Fact: {f['subject']} {f['predicate']} {f['object']} (Conf: {f['confidence']})\n"
+        for line in episode_pack.texts + fact_pack.texts:
+            context += line + "\n"
              
-        # 4. LLM Call
-        prompt = (
+        prompts[q] = (
             "Summarize the answer to the Question using ONLY the provided memory evidence. "
             "If information is missing, state that explicitly.\n"
             "Keep it factual and under 5 sentences.\n\n"
-            f"{context}"
+            f"{context}",
+            [e['id'] for e in episodes],
+            [f['id'] for f in facts]
         )
-        
-        try:
-            resp = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200
-            )
-            summary_text = resp.choices[0].message.content.strip()
-            
+
+    if not prompts:
+        return results
+
+    # 4. LLM Calls (bounded concurrency, each summary streamed as soon as it completes)
+    def summarize(prompt):
+        resp = llm_cache.cached_chat(
+            openai_client, "compress_summary",
+            model="gpt-4o",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=200
+        )
+        return resp.choices[0].message.content.strip()
+
+    completed = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts))), thread_name_prefix="summary") as pool:
+        futures = {pool.submit(tracing.bind(summarize), prompt): q for q, (prompt, _, _) in prompts.items()}
+        for future in as_completed(futures):
+            q = futures[future]
+            try:
+                completed[q] = future.result()
+            except Exception as e:
+                _emit(on_event, f"Summary failed for {q}: {e}")
+                continue
+            _emit(on_event, f"Summary ready for '{q}': {completed[q]}")
+
+    # Keep the subquestion order regardless of completion order
+    for q, (_, ep_ids, fact_ids) in prompts.items():
+        if q in completed:
             results[q] = {
-                "summary": summary_text,
+                "summary": completed[q],
                 "episode_ids": ep_ids,
                 "fact_ids": fact_ids
             }
-        except Exception as e:
-            _emit(on_event, f"Summary failed for {q}: {e}")
             
     return results
 
 # --- PRIVATE HELPER FUNCTIONS (EXTRACTED) ---
 
-def _init_runtime(max_sources, on_event: Optional[Callable[[str], None]] = None):
-    # 1. Initialize
-    memory_truth.init_db()
-    vm = memory_vector.VectorMemory()
-    openai_client = OpenAI()
+@tracing.traced()
+def _init_runtime(max_sources, on_event: Optional[Callable[[str], None]] = None, session_id: Optional[str] = None):
+    # 1. Initialize (shared per process: schema setup, Chroma and OpenAI clients)
+    pool = runtime.get_pool()
+    pool.call_once(memory_truth.init_db)
+    vm = pool.get(memory_vector.VectorMemory)
+    openai_client = pool.get(OpenAI)
 
-    # Generate Session ID
-    session_id = str(uuid.uuid4())
+    # Generate Session ID (a resumed run keeps its own)
+    session_id = session_id or str(uuid.uuid4())
     _emit(on_event, f"Research Session ID: {session_id}")
     return vm, openai_client, session_id
 
+@tracing.traced()
 def _retrieve_context(vm, topic, on_event: Optional[Callable[[str], None]] = None):
     # 2. Retrieve Context
     _emit(on_event, "Retrieving context from memory...")
-    context = router.retrieve_router(vm, topic)
+    # Scope episodes/facts to this topic so k slots are not spent on other topics
+    context = router.retrieve_router(vm, topic, where=memory_vector.build_where(topic=topic), hybrid=True)
     return context
 
+@tracing.traced()
 def _select_skill_and_policy(context, max_sources, execution_policy_override: Optional[dict] = None, on_event: Optional[Callable[[str], None]] = None):
     # 3. Planning & Policy
     active_policy = {
         "freshness_days": 180,
         "allow_web": True,
         "max_sources": max_sources,
-        "reuse_memory": True
+        "reuse_memory": True,
+        "semantic_match_threshold": 0.85,
+        "search_workers": 4,
+        "fetch_workers": 4,
+        "llm_workers": 4,
+        "summary_workers": 4,
+        "ingest_mode": "two_call",
+        "reuse_sources": True
     }
     selected_skill = None
 
@@ -309,6 +435,7 @@ def _select_skill_and_policy(context, max_sources, execution_policy_override: Op
     
     return selected_skill, active_policy, max_sources_after_policy
 
+@tracing.traced()
 def _generate_subquestions(openai_client, topic, on_event: Optional[Callable[[str], None]] = None):
     # Generate Sub-questions
     _emit(on_event, "Generating sub-questions...")
@@ -316,7 +443,8 @@ def _generate_subquestions(openai_client, topic, on_event: Optional[Callable[[st
     
     subquestions = []
     try:
-        response = openai_client.chat.completions.create(
+        response = llm_cache.cached_chat(
+            openai_client, "subquestions",
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
@@ -345,7 +473,8 @@ def _flatten_router_ids(context):
     flat_sem_ids = [item for sublist in sem_ids for item in sublist] if sem_ids and isinstance(sem_ids[0], list) else sem_ids
     return flat_ep_ids, flat_sem_ids
 
-def _decision_gate(openai_client, topic, subquestions, flat_ep_ids, flat_sem_ids, active_policy, on_event: Optional[Callable[[str], None]] = None):
+@tracing.traced()
+def _decision_gate(openai_client, topic, subquestions, flat_ep_ids, flat_sem_ids, active_policy, on_event: Optional[Callable[[str], None]] = None, vm=None):
     # --- DECISION GATE ---
     _emit(on_event, "Evaluating memory for answers (Deep Verification)...")
     
@@ -365,33 +494,27 @@ def _decision_gate(openai_client, topic, subquestions, flat_ep_ids, flat_sem_ids
     else:
         _emit(on_event, "Checking for existing coverage...")
         
-        # Cache all coverage for topic for fuzzy matching
-        topic_coverage = memory_truth.get_coverage_by_topic(topic)
+        # Exact + fuzzy matches for all subquestions in two batched lookups
+        coverage_matches = match_coverage(topic, subquestions, 0.5)
+        
+        # Semantic Match (paraphrases) before falling back to LLM evaluation
+        semantic_threshold = active_policy.get("semantic_match_threshold")
+        unmatched = [q for q in subquestions if q not in coverage_matches]
+        semantic_matches = {}
+        if vm is not None and semantic_threshold and unmatched:
+            try:
+                semantic_matches = semantic_match_coverage(vm, topic, unmatched, semantic_threshold)
+            except Exception as e:
+                _emit(on_event, f"Warning: semantic coverage matching failed: {e}")
         
         for q in subquestions:
-            # 1. Exact Match
-            cov = memory_truth.get_coverage(topic, q)
-            
-            # 2. Fuzzy Match
-            if not cov:
-                norm_q = normalize_question(q)
-                best_score = 0.0
-                best_match = None
-                
-                for row in topic_coverage:
-                    norm_row = row.get('normalized_subquestion')
-                    # If row matches legacy format w/o norm column, normalize on fly? 
-                    # Or just use row['subquestion']
-                    cand_norm = norm_row if norm_row else normalize_question(row['subquestion'])
-                    
-                    score = calculate_jaccard_similarity(norm_q, cand_norm)
-                    if score > best_score:
-                        best_score = score
-                        best_match = row
-                
-                if best_score >= 0.5:
-                    cov = best_match
-                    _emit(on_event, f"  - Fuzzy Match ({best_score:.2f}): '{q}' ~= '{cov['subquestion']}'")
+            if q in semantic_matches:
+                cov, score = semantic_matches[q]
+                _emit(on_event, f"  - Semantic Match ({score:.2f}): '{q}' ~= '{cov['subquestion']}'")
+            else:
+                cov, score = coverage_matches.get(q, (None, 0.0))
+                if cov and cov['subquestion'].lower() != q.lower():
+                    _emit(on_event, f"  - Fuzzy Match ({score:.2f}): '{q}' ~= '{cov['subquestion']}'")
             
             if cov:
                 # Freshness Check
@@ -433,7 +556,8 @@ def _decision_gate(openai_client, topic, subquestions, flat_ep_ids, flat_sem_ids
                 decision["subquestion_statuses"].append({
                     "question": q,
                     "status": "satisfied",
-                    "rationale": f"Previously covered on {cov['created_at']} (matched: {cov['subquestion']})"
+                    "rationale": f"Previously covered on {cov['created_at']} (matched: {cov['subquestion']})",
+                    "covered_by": cov['subquestion']
                 })
             else:
                 uncovered_subquestions.append(q)
@@ -468,8 +592,10 @@ def _decision_gate(openai_client, topic, subquestions, flat_ep_ids, flat_sem_ids
     _emit(on_event, f"Decision: Needs Web? {decision.get('needs_web')}")
     return decision
 
-def _persist_memory_coverage(topic, subquestion_statuses, flat_ep_ids, flat_sem_ids, on_event: Optional[Callable[[str], None]] = None):
+@tracing.traced()
+def _persist_memory_coverage(topic, subquestion_statuses, flat_ep_ids, flat_sem_ids, on_event: Optional[Callable[[str], None]] = None, vm=None, checkpoint: Optional[Callable[[], None]] = None):
     # PERSISTENCE: Save coverage for questions satisfied by memory
+    coverage_rows = []
     for status in subquestion_statuses:
         if status.get("status") == "satisfied" and "Previously covered" not in status.get("rationale", ""):
             _emit(on_event, f"Saving coverage for memory-satisfied question: {status.get('question')}")
@@ -485,148 +611,389 @@ def _persist_memory_coverage(topic, subquestion_statuses, flat_ep_ids, flat_sem_
                 try: sem_ints.append(int(num_str.split(":")[1]))
                 except: pass
 
-            memory_truth.add_coverage(
-                topic, 
-                status.get("question"), 
-                ep_ints[:10],
-                sem_ints[:25],
-                normalized_subquestion=normalize_question(status.get("question"))
-            )
+            coverage_rows.append({
+                "topic": topic,
+                "subquestion": status.get("question"),
+                "episode_ids": ep_ints[:10],
+                "fact_ids": sem_ints[:25],
+                "normalized_subquestion": normalize_question(status.get("question"))
+            })
 
-def _web_search_and_ingest(openai_client, vm, topic, session_id, web_needed_for, max_sources, on_event: Optional[Callable[[str], None]] = None):
-    # 4. Web Search (Conditional)
-    unique_urls = set()
-    episode_ids = []
-    fact_ids = []
-    
-    # Check API Key before searching
-    if not os.environ.get("SERPAPI_API_KEY"):
-         raise ValueError("SERPAPI_API_KEY is required for web search but is not set.")
-
-    # Only search for needed questions
-    search_queue = web_needed_for
-    _emit(on_event, f"Searching for {len(search_queue)} missing items...")
-
-    for q in search_queue:
-        if len(unique_urls) >= max_sources:
-            break
-        _emit(on_event, f"Searching: {q}")
-        try:
-            results = web_search.search_web(q, num_results=3)
-            for res in results:
-                if res.get('link'):
-                    unique_urls.add(res['link'])
-        except Exception as e:
-            print(f"Search failed for '{q}': {e}")
-            
-    sorted_urls = list(unique_urls)[:max_sources]
-    _emit(on_event, f"Found {len(sorted_urls)} sources.")
+    _save_coverage(vm, coverage_rows, on_event=on_event, checkpoint=checkpoint)
 
-    # 5. Fetch & Ingest Episodes
-    for url in sorted_urls:
-        _emit(on_event, f"Fetching: {url}")
-        page_data = web_fetch.fetch_page(url)
-        
-        if not page_data['text']:
-            _emit(on_event, f"Skipping {url}: No text content.")
-            continue
+def _save_coverage(vm, coverage_rows, on_event: Optional[Callable[[str], None]] = None, checkpoint: Optional[Callable[[], None]] = None):
+    """
+    Persist coverage rows to SQLite and embed them for semantic matching.
+    checkpoint runs in the same transaction as the insert, so a resumed run
+    never writes the same coverage twice.
+    """
+    with memory_truth.transaction():
+        inserted = memory_truth.add_coverage_bulk(coverage_rows) if coverage_rows else []
+        if checkpoint:
+            checkpoint()
+    if vm is None or not coverage_rows:
+        return
+    try:
+        _index_coverage_vectors(vm, inserted)
+    except Exception as e:
+        _emit(on_event, f"Warning: could not embed coverage: {e}")
 
-        # Extract Summary
-        try:
-            summary_prompt = f"Summarize the following text related to '{topic}'. Focus on key facts. Keep it under 200 words.\n\nText:\n{page_data['text'][:8000]}"
-            summary_resp = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": summary_prompt}]
-            )
-            summary = summary_resp.choices[0].message.content
-        except Exception as e:
-            _emit(on_event, f"Summarization failed for {url}: {e}")
-            summary = "Summary generation failed."
-
-        # Add Episode
-        ep_id = memory_truth.add_episode(
-            topic=topic,
-            title=page_data.get('title') or "Web Source",
-            url=url,
-            notes=summary,
-            outcome="processed",
-            tags="research, web_source",
-            session_id=session_id
+# Source ingestion modes: "two_call" (summary, then facts from the summary) or
+# "fused" (summary and facts in one structured response, two_call on failure)
+INGEST_MODES = ("two_call", "fused")
+
+def _page_text(page_data) -> str:
+    """Page text cut to the ingestion token budget."""
+    return evidence_packer.truncate_to_tokens(page_data['text'], evidence_packer.budget_for("ingest_page"))
+
+def _summarize_source_fused(openai_client, topic, page_data) -> Optional[dict]:
+    """One LLM call returning the summary and fact triples; None if the response is unusable."""
+    prompt = (
+        f"Read the following text related to '{topic}'.\n"
+        f"1. Summarize it, focusing on key facts, in under 200 words.\n"
+        f"2. Extract 5-12 key semantic facts as JSON triples.\n"
+        f"Return ONLY a JSON object with exactly these keys:\n"
+        f"{{\"summary\": \"...\", \"facts\": [{{\"subject\": \"...\", \"predicate\": \"...\", \"object\": \"...\", \"confidence\": 0.0-1.0}}]}}\n\n"
+        f"Text:\n{_page_text(page_data)}"
+    )
+    try:
+        resp = llm_cache.cached_chat(
+            openai_client, "ingest_fused",
+            model="gpt-4o",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"}
         )
-        episode_ids.append(ep_id)
-        
-        # Upsert Episode
-        ep = memory_truth.get_episode(ep_id)
-        canon = memory_builders.episode_canonical(ep)
-        vm.upsert_episode(ep_id, canon, {"topic": topic, "source": "web", "session_id": session_id})
-        _emit(on_event, f"Ingested episode {ep_id}")
-
-        # 6. Extract & Ingest Facts
-        _emit(on_event, f"Extracting facts from episode {ep_id}...")
-        fact_prompt = (
-            f"Extract 5-12 key semantic facts from the text below as JSON triples.\n"
-            f"Return ONLY a JSON object with a single key 'facts' containing a list of objects.\n"
-            f"Format: {{\"facts\": [{{\"subject\": \"...\", \"predicate\": \"...\", \"object\": \"...\", \"confidence\": 0.0-1.0}}]}}\n"
-            f"Text:\n{summary}"
+        data = json.loads(resp.choices[0].message.content)
+    except Exception:
+        return None
+
+    summary = data.get("summary") if isinstance(data, dict) else None
+    facts_data = data.get("facts") if isinstance(data, dict) else None
+    if not isinstance(summary, str) or not summary.strip() or not isinstance(facts_data, list):
+        return None
+    return {
+        "summary": summary,
+        "summary_error": None,
+        "facts": [f for f in facts_data if isinstance(f, dict)],
+        "facts_error": None,
+        "mode": "fused"
+    }
+
+@tracing.traced()
+def _summarize_source(openai_client, topic, url, page_data, mode: str = "two_call") -> dict:
+    """
+    LLM stage for one fetched page: summary, then fact extraction from that summary.
+    Runs on an LLM worker; failures are returned, not raised, so the writer can report them.
+    In "fused" mode both come from one call, falling back to two calls if that response can't be used.
+    """
+    if mode == "fused":
+        digest = _summarize_source_fused(openai_client, topic, page_data)
+        if digest is not None:
+            return digest
+
+    digest = {"summary": None, "summary_error": None, "facts": [], "facts_error": None, "mode": "two_call"}
+
+    # Extract Summary
+    try:
+        summary_prompt = f"Summarize the following text related to '{topic}'. Focus on key facts. Keep it under 200 words.\n\nText:\n{_page_text(page_data)}"
+        summary_resp = llm_cache.cached_chat(
+            openai_client, "summarize_source",
+            model="gpt-4o",
+            messages=[{"role": "user", "content": summary_prompt}]
         )
-        
+        digest["summary"] = summary_resp.choices[0].message.content
+    except Exception as e:
+        digest["summary_error"] = e
+        digest["summary"] = "Summary generation failed."
+
+    # Extract Facts
+    fact_prompt = (
+        f"Extract 5-12 key semantic facts from the text below as JSON triples.\n"
+        f"Return ONLY a JSON object with a single key 'facts' containing a list of objects.\n"
+        f"Format: {{\"facts\": [{{\"subject\": \"...\", \"predicate\": \"...\", \"object\": \"...\", \"confidence\": 0.0-1.0}}]}}\n"
+        f"Text:\n{digest['summary']}"
+    )
+    try:
+        fact_resp = llm_cache.cached_chat(
+            openai_client, "extract_facts",
+            model="gpt-4o",
+            messages=[{"role": "user", "content": fact_prompt}],
+            response_format={"type": "json_object"}
+        )
+        content = fact_resp.choices[0].message.content
+        data = json.loads(content)
+        facts_data = data.get('facts', [])
+        digest["facts"] = [f for f in facts_data if isinstance(f, dict)] if isinstance(facts_data, list) else []
+    except Exception as e:
+        digest["facts_error"] = e
+
+    return digest
+
+@tracing.traced()
+def _store_source(vm, topic, session_id, url, page_data, digest, on_event: Optional[Callable[[str], None]] = None, content_hash: str = None, fetched_at: str = None):
+    """
+    Writer stage for one source: episode + facts + source index entry in one
+    transaction, then the vector upserts.
+    """
+    fact_rows = []
+    for f in digest["facts"]:
+        if not isinstance(f, dict):
+            continue
+        # Normalize data to prevent NOT NULL constraints
+        subj = f.get('subject')
+        pred = f.get('predicate')
+        obj = f.get('object')
+        conf = f.get('confidence')
+
+        fact_rows.append({
+            "topic": topic,
+            "subject": subj if subj else 'unknown',
+            "predicate": pred if pred else 'related to',
+            "object": obj if obj else 'unknown',
+            "confidence": conf if conf is not None else 0.5,
+            "source_url": url,
+            "session_id": session_id
+        })
+
+    with memory_truth.transaction():
+        # Add Episode (the inserted row comes back, so no read-after-write)
+        ep = memory_truth.add_episodes_bulk([{
+            "topic": topic,
+            "title": page_data.get('title') or "Web Source",
+            "url": url,
+            "notes": digest["summary"],
+            "outcome": "processed",
+            "tags": "research, web_source",
+            "session_id": session_id
+        }])[0]
+        ep_id = ep["id"]
+        memory_truth.record_source(url, ep_id, content_hash, fetched_at)
+
+        # One multi-row INSERT per source; rows come back with ids and defaults
+        db_facts = []
+        if digest["facts_error"] is None:
+            db_facts = memory_truth.add_facts_bulk([{**row, "source_episode_id": ep_id} for row in fact_rows])
+
+    # Upsert Episode
+    canon = memory_builders.episode_canonical(ep)
+    vm.upsert_episode(ep_id, canon, {"topic": topic, "source": "web", "session_id": session_id})
+    _emit(on_event, f"Ingested episode {ep_id}")
+
+    if digest["facts_error"] is not None:
+        _emit(on_event, f"Fact extraction failed for episode {ep_id}: {digest['facts_error']}")
+        return ep_id, []
+
+    # Upsert Facts (one embeddings request + one Chroma upsert per source)
+    source_fact_ids = [db_fact["id"] for db_fact in db_facts]
+    try:
+        vm.upsert_facts(
+            source_fact_ids,
+            [memory_builders.fact_canonical(db_fact) for db_fact in db_facts],
+            [{"topic": topic, "type": "derived_fact", "session_id": session_id} for _ in source_fact_ids]
+        )
+        _emit(on_event, f"Extracted {len(fact_rows)} facts.")
+    except Exception as e:
+        _emit(on_event, f"Fact extraction failed for episode {ep_id}: {e}")
+    return ep_id, source_fact_ids
+
+def _source_age_days(fetched_at) -> Optional[int]:
+    """Days since a source was fetched (SQLite timestamps are UTC); None if unparseable."""
+    if not fetched_at:
+        return None
+    c_str = str(fetched_at)
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
         try:
-            fact_resp = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": fact_prompt}],
-                response_format={"type": "json_object"}
-            )
-            content = fact_resp.choices[0].message.content
-            data = json.loads(content)
-            facts_data = data.get('facts', [])
-            
-            if not isinstance(facts_data, list):
-                facts_data = []
-
-            for f in facts_data:
-                # Normalize data to prevent NOT NULL constraints
-                subj = f.get('subject')
-                pred = f.get('predicate')
-                obj = f.get('object')
-                conf = f.get('confidence')
-
-                fid = memory_truth.add_fact(
-                    topic=topic,
-                    subject=subj if subj else 'unknown',
-                    predicate=pred if pred else 'related to',
-                    object_=obj if obj else 'unknown',
-                    confidence=conf if conf is not None else 0.5,
-                    source_episode_id=ep_id,
-                    source_url=url,
-                    session_id=session_id
-                )
-                fact_ids.append(fid)
-                
-                # Upsert Fact
-                db_fact = memory_truth.get_fact(fid)
-                f_canon = memory_builders.fact_canonical(db_fact)
-                vm.upsert_fact(fid, f_canon, {"topic": topic, "type": "derived_fact", "session_id": session_id})
-            _emit(on_event, f"Extracted {len(facts_data)} facts.")
-            
+            return (datetime.utcnow() - datetime.strptime(c_str, fmt)).days
+        except ValueError:
+            pass
+    try:
+        return (datetime.utcnow() - datetime.fromisoformat(c_str).replace(tzinfo=None)).days
+    except ValueError:
+        return None
+
+def _reused_digest(episode_id):
+    """page_data + digest rebuilt from a stored episode and its facts, so it can be cloned without LLM calls."""
+    episodes = memory_truth.get_episodes_by_ids([episode_id])
+    if not episodes:
+        return None
+    ep = episodes[0]
+    facts = [
+        {"subject": f["subject"], "predicate": f["predicate"], "object": f["object"], "confidence": f["confidence"]}
+        for f in memory_truth.get_facts_by_episode(episode_id)
+    ]
+    page_data = {"title": ep.get("title"), "text": None}
+    digest = {"summary": ep["notes"], "summary_error": None, "facts": facts, "facts_error": None, "mode": "reused"}
+    return page_data, digest
+
+def _search_all(queries: list[str], search_workers: int = 4, num_results: int = 3) -> list[list[dict]]:
+    """Run the web searches concurrently (at most search_workers at a time); results keep query order."""
+    def search(q):
+        try:
+            with tracing.span("serpapi", query=q):
+                return web_search.search_web(q, num_results=num_results)
         except Exception as e:
-            _emit(on_event, f"Fact extraction failed for episode {ep_id}: {e}")
+            print(f"Search failed for '{q}': {e}")
+            return []
+
+    if not queries:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(search_workers, len(queries)))) as pool:
+        return list(pool.map(tracing.bind(search), queries))
+
+def allocate_sources(results_per_question: list[list[dict]], max_sources: int) -> list[str]:
+    """
+    Share the source budget fairly across subquestions: round-robin over the
+    questions' ranked results (every question's top hit, then every second hit,
+    ...), skipping duplicate URLs, until max_sources URLs are chosen.
+    """
+    chosen = {}
+    depth = max((len(r) for r in results_per_question), default=0)
+    for rank in range(depth):
+        for results in results_per_question:
+            if len(chosen) >= max_sources:
+                return list(chosen)
+            if rank < len(results) and results[rank].get('link'):
+                chosen.setdefault(results[rank]['link'], None)
+    return list(chosen)[:max_sources]
+
+@tracing.traced()
+def _web_search_and_ingest(openai_client, vm, topic, session_id, web_needed_for, max_sources, on_event: Optional[Callable[[str], None]] = None, fetch_workers: int = 4, llm_workers: int = 4, search_workers: int = 4, ingest_mode: str = "two_call", reuse_sources: bool = True, freshness_days: int = 180, resume_state: Optional[dict] = None, checkpoint: Optional[Callable[[dict], None]] = None):
+    # 4. Web Search (Conditional)
+    episode_ids = []
+    fact_ids = []
+    
+    # Sources already stored by an interrupted run of this session: {url: {episode_id, fact_ids}}
+    resume_state = resume_state or {}
+    done = dict(resume_state.get("done", {}))
+
+    if "urls" in resume_state:
+        sorted_urls = resume_state["urls"]
+        _emit(on_event, f"Resuming ingestion: {len(done)} of {len(sorted_urls)} sources already stored.")
+    else:
+        # Check API Key before searching
+        if not os.environ.get("SERPAPI_API_KEY"):
+             raise ValueError("SERPAPI_API_KEY is required for web search but is not set.")
+
+        # Only search for needed questions (all of them, concurrently)
+        search_queue = list(web_needed_for)
+        _emit(on_event, f"Searching for {len(search_queue)} missing items...")
+        for q in search_queue:
+            _emit(on_event, f"Searching: {q}")
+        results_per_question = _search_all(search_queue, search_workers)
+
+        sorted_urls = allocate_sources(results_per_question, max_sources)
+        _emit(on_event, f"Found {len(sorted_urls)} sources.")
+        if checkpoint:
+            checkpoint({"urls": sorted_urls, "done": done})
+
+    if ingest_mode not in INGEST_MODES:
+        _emit(on_event, f"Warning: unknown ingest_mode '{ingest_mode}', using two_call.")
+        ingest_mode = "two_call"
+
+    # Source index: URLs ingested before (under any topic) within freshness_days
+    # are cloned into this session instead of being fetched and summarized again
+    known = memory_truth.get_sources(sorted_urls) if reuse_sources else {}
+
+    # 5. Fetch -> Summarize/Extract -> Store pipeline
+    # Fetch and LLM stages run on bounded worker pools; each fetched page goes
+    # straight to an LLM worker. This thread is the single writer and stores
+    # sources in URL order, so episode ids follow sorted_urls.
+    session = runtime.get_pool().http_session()
+    with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as fetch_pool, \
+         ThreadPoolExecutor(max_workers=max(1, llm_workers)) as llm_pool:
+
+        def fetch_then_summarize(url, source):
+            with tracing.span("fetch", url=url):
+                page_data = web_fetch.fetch_page(url, session=session)
+            if not page_data.get('text'):
+                return page_data, None, None
+            page_hash = memory_truth.content_hash(page_data['text'])
+            if source is not None and source.get('content_hash') == page_hash:
+                # Unchanged since it was last ingested: no LLM calls needed
+                return page_data, None, page_hash
+            return page_data, llm_pool.submit(tracing.bind(_summarize_source), openai_client, topic, url, page_data, ingest_mode), page_hash
+
+        pending = []
+        for url in sorted_urls:
+            if url in done:
+                pending.append((url, None, None, None))
+                continue
+            source = known[url] if url in known else None
+            if source is not None:
+                age = _source_age_days(source.get('fetched_at'))
+                reused = _reused_digest(source['episode_id']) if age is not None and age <= freshness_days else None
+                if reused is not None:
+                    _emit(on_event, f"Reusing {url}: ingested as episode {source['episode_id']} {age} days ago.")
+                    pending.append((url, None, source, reused))
+                    continue
+            _emit(on_event, f"Fetching: {url}")
+            pending.append((url, fetch_pool.submit(tracing.bind(fetch_then_summarize), url, source), source, None))
+
+        def store(url, page_data, digest, **source_kwargs):
+            # One malformed digest is reported and skipped, not fatal to the run
+            try:
+                ep_id, source_fact_ids = _store_source(vm, topic, session_id, url, page_data, digest, on_event=on_event, **source_kwargs)
+            except Exception as e:
+                _emit(on_event, f"Skipping {url}: ingestion failed ({e}).")
+                return
+            episode_ids.append(ep_id)
+            fact_ids.extend(source_fact_ids)
+            done[url] = {"episode_id": ep_id, "fact_ids": source_fact_ids}
+            if checkpoint:
+                checkpoint({"urls": sorted_urls, "done": done})
+
+        for url, fetch_future, source, reused in pending:
+            if url in done:
+                episode_ids.append(done[url]["episode_id"])
+                fact_ids.extend(done[url]["fact_ids"])
+                continue
+            if reused is not None:
+                page_data, digest = reused
+                store(url, page_data, digest, content_hash=source.get('content_hash'), fetched_at=source.get('fetched_at'))
+                continue
+
+            try:
+                page_data, digest_future, page_hash = fetch_future.result()
+            except Exception as e:
+                _emit(on_event, f"Skipping {url}: fetch failed ({e}).")
+                continue
+            if page_hash is None:
+                _emit(on_event, f"Skipping {url}: No text content.")
+                continue
+
+            if digest_future is None:
+                reused = _reused_digest(source['episode_id'])
+                if reused is not None:
+                    _emit(on_event, f"Content unchanged for {url}: reusing episode {source['episode_id']}.")
+                    digest = reused[1]
+                else:
+                    digest = _summarize_source(openai_client, topic, url, page_data, ingest_mode)
+            else:
+                digest = digest_future.result()
+            if digest["summary_error"] is not None:
+                _emit(on_event, f"Summarization failed for {url}: {digest['summary_error']}")
+            if ingest_mode == "fused" and digest["mode"] == "two_call":
+                _emit(on_event, f"Fused ingestion response unusable for {url}; used two-call path.")
+
+            store(url, page_data, digest, content_hash=page_hash)
     
     return sorted_urls, episode_ids, fact_ids
 
-def _persist_web_coverage_and_update_statuses(topic, web_needed_for, new_episode_ids, new_fact_ids, subquestion_statuses, on_event: Optional[Callable[[str], None]] = None):
+@tracing.traced()
+def _persist_web_coverage_and_update_statuses(topic, web_needed_for, new_episode_ids, new_fact_ids, subquestion_statuses, on_event: Optional[Callable[[str], None]] = None, vm=None, checkpoint: Optional[Callable[[], None]] = None):
     # PERSISTENCE: Save coverage for questions answered by Web
     # Assumes the new research covers the questions asked
+    coverage_rows = []
     if new_episode_ids:
         for q in web_needed_for:
             _emit(on_event, f"Saving coverage for web-answered question: {q}")
-            memory_truth.add_coverage(
-                topic,
-                q,
-                new_episode_ids,
-                new_fact_ids,
-                normalized_subquestion=normalize_question(q)
-            )
-            
+            coverage_rows.append({
+                "topic": topic,
+                "subquestion": q,
+                "episode_ids": new_episode_ids,
+                "fact_ids": new_fact_ids,
+                "normalized_subquestion": normalize_question(q)
+            })
             # TRACE CONSISTENCY: Update status to satisfied
             # Find existing status entry or create new one
             found_status = False
@@ -643,7 +1010,10 @@ def _persist_web_coverage_and_update_statuses(topic, web_needed_for, new_episode
                     "status": "satisfied",
                     "rationale": f"Answered via web in this session (episodes: {new_episode_ids})"
                 })
+    # The checkpoint sees the updated statuses and commits with the coverage
+    _save_coverage(vm, coverage_rows, on_event=on_event, checkpoint=checkpoint)
 
+@tracing.traced()
 def _attach_compressed_summaries(openai_client, trace, topic, on_event: Optional[Callable[[str], None]] = None):
     # 7. Summary Compression
     try:
@@ -651,7 +1021,8 @@ def _attach_compressed_summaries(openai_client, trace, topic, on_event: Optional
             openai_client,
             topic,
             trace["subquestion_statuses"],
-            on_event=on_event
+            on_event=on_event,
+            max_workers=trace.get("execution_policy", {}).get("summary_workers", 4)
         )
     except Exception as e:
          _emit(on_event, f"Summary compression failed: {e}")
@@ -671,6 +1042,58 @@ def run_research(topic: str, max_sources: int = 5, execution_policy_override: Op
     Returns:
         dict: Execution trace including skill, subquestions, sources, and IDs.
     """
+    return _traced_run(lambda: _run_research(topic, max_sources, execution_policy_override, on_event), topic=topic)
+
+def resume(session_id: str, on_event: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Continue an interrupted research run from its last completed stage.
+
+    Subquestions, the decision gate result, the searched URLs and every
+    source already stored are taken from the session's checkpoints instead
+    of being generated, fetched or summarized again.
+
+    Args:
+        session_id: Session ID of the run to resume.
+        on_event: Optional callback for streaming logs.
+    Returns:
+        dict: Execution trace (the stored one if the run had already completed).
+    """
+    checkpoints = memory_truth.get_checkpoints(session_id)
+    if "start" not in checkpoints:
+        raise ValueError(f"No checkpoints found for session {session_id}.")
+    if "completed" in checkpoints:
+        _emit(on_event, f"Session {session_id} already completed.")
+        return checkpoints["completed"]
+
+    start = checkpoints["start"]
+    _emit(on_event, f"Resuming session {session_id} (checkpoints: {', '.join(sorted(checkpoints))})")
+    return _traced_run(lambda: _run_research(
+        start["topic"], start["max_sources"], start.get("execution_policy_override"), on_event,
+        session_id=session_id, checkpoints=checkpoints
+    ), topic=start["topic"], resumed=True)
+
+def _traced_run(run, **attrs) -> dict:
+    """Run the orchestrator under a root span; attach nested timings and token usage, then checkpoint the completed trace and persist the usage."""
+    with tracing.span("run_research", **attrs) as root:
+        trace = run()
+    trace["timings"] = root.to_dict()
+    trace["usage"] = usage.summarize(trace["timings"])
+    try:
+        tracing.export_jsonl(trace["timings"], session_id=trace.get("session_id"), topic=trace.get("topic"))
+    except Exception as e:
+        print(f"Warning: failed to export timings: {e}")
+    if trace.get("session_id"):
+        # The completed checkpoint holds the full trace (timings and usage included) for resume()
+        try:
+            with memory_truth.transaction():
+                memory_truth.save_checkpoint(trace["session_id"], "completed", trace)
+                memory_truth.add_session_usage(trace["session_id"], trace.get("topic"), trace["usage"]["total"], trace["usage"]["by_stage"])
+        except Exception as e:
+            print(f"Warning: failed to checkpoint the completed run or record its usage: {e}")
+    return trace
+
+def _run_research(topic, max_sources, execution_policy_override, on_event, session_id=None, checkpoints=None) -> dict:
+    checkpoints = checkpoints or {}
     _emit(on_event, f"--- Starting Research on: {topic} ---")
     
     # Init Trace
@@ -693,30 +1116,52 @@ def run_research(topic: str, max_sources: int = 5, execution_policy_override: Op
     }
 
     # 1. Runtime
-    vm, openai_client, session_id = _init_runtime(max_sources, on_event=on_event)
+    vm, openai_client, session_id = _init_runtime(max_sources, on_event=on_event, session_id=session_id)
     trace["session_id"] = session_id
+
+    def checkpoint(stage, data):
+        # Best effort: a failed checkpoint only costs resumability
+        try:
+            memory_truth.save_checkpoint(session_id, stage, data)
+        except Exception as e:
+            _emit(on_event, f"Warning: failed to checkpoint '{stage}': {e}")
+
+    if "start" not in checkpoints:
+        checkpoint("start", {"topic": topic, "max_sources": max_sources, "execution_policy_override": execution_policy_override})
     
-    # 2. Context
-    context = _retrieve_context(vm, topic, on_event=on_event)
-    
-    # 3. Policy & Skill
-    selected_skill, active_policy, max_sources = _select_skill_and_policy(
-        context, 
-        max_sources, 
-        execution_policy_override=execution_policy_override, 
-        on_event=on_event
-    )
+    # 2-4. Context, Policy & Skill, Subquestions
+    # Subquestion generation only needs the topic, so it overlaps with context retrieval
+    if "subquestions" in checkpoints:
+        generate_subquestions = lambda: checkpoints["subquestions"]
+    else:
+        generate_subquestions = lambda: _generate_subquestions(openai_client, topic, on_event=on_event)
+    stages = stage_graph.run_stages([
+        stage_graph.Stage("context", lambda: _retrieve_context(vm, topic, on_event=on_event)),
+        stage_graph.Stage("plan", lambda context: _select_skill_and_policy(
+            context,
+            max_sources,
+            execution_policy_override=execution_policy_override,
+            on_event=on_event
+        ), deps=["context"]),
+        stage_graph.Stage("subquestions", generate_subquestions),
+    ])
+    context = stages["context"]
+    selected_skill, active_policy, max_sources = stages["plan"]
     trace["selected_skill"] = selected_skill
     trace["execution_policy"] = active_policy
-    
-    # 4. Subquestions
-    trace["subquestions"] = _generate_subquestions(openai_client, topic, on_event=on_event)
+    trace["subquestions"] = stages["subquestions"]
+    if "subquestions" not in checkpoints:
+        checkpoint("subquestions", trace["subquestions"])
     
     # 5. Flatten IDs
     flat_ep_ids, flat_sem_ids = _flatten_router_ids(context)
 
     # 6. Decision Gate
-    decision = _decision_gate(openai_client, topic, trace["subquestions"], flat_ep_ids, flat_sem_ids, active_policy, on_event=on_event)
+    if "decision" in checkpoints:
+        decision = checkpoints["decision"]
+        _emit(on_event, "Decision gate restored from checkpoint.")
+    else:
+        decision = _decision_gate(openai_client, topic, trace["subquestions"], flat_ep_ids, flat_sem_ids, active_policy, on_event=on_event, vm=vm)
     trace["decision_gate_used"] = True
     trace["needs_web"] = decision.get("needs_web", True)
     trace["web_needed_for"] = decision.get("web_needed_for", [])
@@ -732,7 +1177,12 @@ def run_research(topic: str, max_sources: int = 5, execution_policy_override: Op
     }
 
     # 7. Persist Memory Coverage
-    _persist_memory_coverage(topic, trace["subquestion_statuses"], flat_ep_ids, flat_sem_ids, on_event=on_event)
+    if "decision" not in checkpoints:
+        # Coverage and the decision checkpoint commit together
+        _persist_memory_coverage(
+            topic, trace["subquestion_statuses"], flat_ep_ids, flat_sem_ids, on_event=on_event, vm=vm,
+            checkpoint=lambda: checkpoint("decision", decision)
+        )
     
     # 8. Check if Web Needed
     if not trace["needs_web"]:
@@ -747,18 +1197,41 @@ def run_research(topic: str, max_sources: int = 5, execution_policy_override: Op
     trace["reused_memory"] = False
     trace["web_calls_skipped"] = False
     
-    # 9. Web Search
-    sources_used, new_ep_ids, new_fact_ids = _web_search_and_ingest(
-        openai_client, vm, topic, session_id, trace["web_needed_for"], max_sources, on_event=on_event
-    )
-    trace["sources_used"] = sources_used
-    trace["episode_ids"] = new_ep_ids
-    trace["fact_ids"] = new_fact_ids
-    
-    # 10. Persist Web Coverage
-    _persist_web_coverage_and_update_statuses(
-        topic, trace["web_needed_for"], new_ep_ids, new_fact_ids, trace["subquestion_statuses"], on_event=on_event
-    )
+    if "web" in checkpoints:
+        web = checkpoints["web"]
+        trace["sources_used"] = web["sources_used"]
+        trace["episode_ids"] = web["episode_ids"]
+        trace["fact_ids"] = web["fact_ids"]
+        trace["subquestion_statuses"] = web["subquestion_statuses"]
+        _emit(on_event, "Web ingestion restored from checkpoint.")
+    else:
+        # 9. Web Search
+        sources_used, new_ep_ids, new_fact_ids = _web_search_and_ingest(
+            openai_client, vm, topic, session_id, trace["web_needed_for"], max_sources, on_event=on_event,
+            search_workers=active_policy.get("search_workers", 4),
+            fetch_workers=active_policy.get("fetch_workers", 4),
+            llm_workers=active_policy.get("llm_workers", 4),
+            ingest_mode=active_policy.get("ingest_mode", "two_call"),
+            reuse_sources=active_policy.get("reuse_sources", True),
+            freshness_days=active_policy.get("freshness_days", 180),
+            resume_state=checkpoints.get("ingest"),
+            checkpoint=lambda data: checkpoint("ingest", data)
+        )
+        trace["sources_used"] = sources_used
+        trace["episode_ids"] = new_ep_ids
+        trace["fact_ids"] = new_fact_ids
+        
+        # 10. Persist Web Coverage
+        # Coverage and the web checkpoint commit together
+        _persist_web_coverage_and_update_statuses(
+            topic, trace["web_needed_for"], new_ep_ids, new_fact_ids, trace["subquestion_statuses"], on_event=on_event, vm=vm,
+            checkpoint=lambda: checkpoint("web", {
+                "sources_used": sources_used,
+                "episode_ids": new_ep_ids,
+                "fact_ids": new_fact_ids,
+                "subquestion_statuses": trace["subquestion_statuses"]
+            })
+        )
     
     # 11. Final Summary Compression
     _attach_compressed_summaries(openai_client, trace, topic, on_event=on_event)
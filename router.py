@@ -1,3 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+import memory_truth
+import tracing
+
+# Reciprocal-rank fusion constant (standard value from Cormack et al.)
+RRF_K = 60
+
+# Long-lived workers so the lexical lookups reuse their thread-local SQLite
+# connections instead of opening new ones on every request.
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="router")
+
 def _normalize_results(results: dict) -> dict:
     """
     Normalize ChromaDB results.
@@ -18,16 +29,84 @@ def _normalize_results(results: dict) -> dict:
         'distances': results['distances'][0] if results.get('distances') else []
     }
 
-def retrieve_router(vm, user_request: str, k_epi=10, k_sem=10, k_skill=3) -> dict:
+def _where_fields(where: dict) -> dict:
+    """Flatten a build_where() filter back into {field: value} for the lexical path."""
+    if not where:
+        return {}
+    clauses = where.get('$and', [where])
+    fields = {}
+    for clause in clauses:
+        for key, value in clause.items():
+            if not key.startswith('$') and not isinstance(value, dict):
+                fields[key] = value
+    return fields
+
+def _fuse(dense: dict, lexical_ids: list, k: int) -> dict:
+    """
+    Reciprocal-rank fusion of normalized Chroma results with lexical IDs.
+    Dense documents/metadatas/distances are kept where known; lexical-only
+    hits get None in those slots.
+    """
+    scores = {}
+    for rank, doc_id in enumerate(dense['ids']):
+        scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+    for rank, doc_id in enumerate(lexical_ids):
+        scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+    # Stable sort keeps dense order on ties
+    fused_ids = sorted(scores, key=lambda d: -scores[d])[:k]
+
+    def column(name):
+        values = dense.get(name) or []
+        lookup = {doc_id: values[i] for i, doc_id in enumerate(dense['ids']) if i < len(values)}
+        return [lookup.get(doc_id) for doc_id in fused_ids]
+
+    return {
+        'ids': fused_ids,
+        'documents': column('documents'),
+        'metadatas': column('metadatas'),
+        'distances': column('distances')
+    }
+
+def retrieve_router(vm, user_request: str, k_epi=10, k_sem=10, k_skill=3, where: dict = None, hybrid: bool = False) -> dict:
     """
     Query all memory collections and return normalized results.
+
+    The request is embedded once and the vector is fanned out to the three
+    collections in parallel. `where` (see memory_vector.build_where) is pushed
+    down into the episodic and semantic queries; skills are not topic-scoped.
+
+    With hybrid=True, episodes and facts are also searched lexically (SQLite
+    FTS5/BM25) and fused with the dense results by reciprocal rank.
     """
-    episodic_raw = vm.query_episodic(user_request, k=k_epi)
-    semantic_raw = vm.query_semantic(user_request, k=k_sem)
-    procedural_raw = vm.query_procedural(user_request, k=k_skill)
+    # Lexical lookups are local and cheap; start them while the request is embedded
+    if hybrid:
+        fields = _where_fields(where)
+        # SQLite matches topics case-insensitively, so the lowercased topic_key works as is
+        lexical_filter = {"topic": fields.get("topic_key", fields.get("topic")), "session_id": fields.get("session_id")}
+        lexical_epi_future = _executor.submit(tracing.bind(memory_truth.search_episodes_fts), user_request, k_epi, **lexical_filter)
+        lexical_sem_future = _executor.submit(tracing.bind(memory_truth.search_facts_fts), user_request, k_sem, **lexical_filter)
+
+    embedding = vm.embed(user_request)
+    episodic_future = _executor.submit(tracing.bind(vm.query_episodic), user_request, k=k_epi, query_embedding=embedding, where=where)
+    semantic_future = _executor.submit(tracing.bind(vm.query_semantic), user_request, k=k_sem, query_embedding=embedding, where=where)
+    procedural_future = _executor.submit(tracing.bind(vm.query_procedural), user_request, k=k_skill, query_embedding=embedding)
+
+    episodic = _normalize_results(episodic_future.result())
+    semantic = _normalize_results(semantic_future.result())
+    procedural = _normalize_results(procedural_future.result())
+
+    if hybrid:
+        try:
+            lexical_epi = [f"episode:{i}" for i in lexical_epi_future.result()]
+            lexical_sem = [f"fact:{i}" for i in lexical_sem_future.result()]
+            episodic = _fuse(episodic, lexical_epi, k_epi)
+            semantic = _fuse(semantic, lexical_sem, k_sem)
+        except Exception as e:
+            print(f"Warning: lexical retrieval failed, using dense results only: {e}")
 
     return {
-        'episodic': _normalize_results(episodic_raw),
-        'semantic': _normalize_results(semantic_raw),
-        'procedural': _normalize_results(procedural_raw)
+        'episodic': episodic,
+        'semantic': semantic,
+        'procedural': procedural
     }
@@ -0,0 +1,97 @@
+import atexit
+import threading
+import requests
+import memory_truth
+
+class ResourcePool:
+    """
+    Process-wide, lazily-initialized shared resources.
+
+    Each resource is created once per factory and reused by every caller
+    (CLI, run_research, generate_report, the FastAPI backend). Instances are
+    keyed by the factory itself, so a caller that substitutes a different
+    constructor (e.g. a test double) gets its own instance instead of a
+    stale shared one.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances = {}
+        self._once = set()
+        self._http_session = None
+
+    def get(self, factory):
+        """Return the shared instance built by factory(), creating it on first use."""
+        instance = self._instances.get(factory)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if factory not in self._instances:
+                self._instances[factory] = factory()
+            return self._instances[factory]
+
+    def call_once(self, fn):
+        """
+        Run fn() the first time it is requested in this process (e.g. schema setup).
+        Keyed per memory_truth.DB_PATH, so pointing it at another database
+        runs setup again for that file.
+        """
+        key = (fn, memory_truth.DB_PATH)
+        if key in self._once:
+            return
+        with self._lock:
+            if key not in self._once:
+                fn()
+                self._once.add(key)
+
+    def http_session(self) -> requests.Session:
+        """Shared requests session so page fetches reuse keep-alive connections."""
+        with self._lock:
+            if self._http_session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._http_session = session
+            return self._http_session
+
+    def shutdown(self):
+        """Close every shared resource. The next get() recreates them."""
+        with self._lock:
+            instances = list(self._instances.values())
+            self._instances.clear()
+            self._once.clear()
+            session, self._http_session = self._http_session, None
+
+        for instance in instances:
+            _close(instance)
+        if session is not None:
+            session.close()
+
+def _close(resource):
+    """Best-effort close of a pooled resource and the clients it owns."""
+    for attr in ("embedding_cache", "client"):
+        inner = getattr(resource, attr, None)
+        if inner is not None and hasattr(inner, "close"):
+            try:
+                inner.close()
+            except Exception as e:
+                print(f"Warning: failed to close {attr}: {e}")
+    if hasattr(resource, "close"):
+        try:
+            resource.close()
+        except Exception as e:
+            print(f"Warning: failed to close resource: {e}")
+
+_pool = ResourcePool()
+
+def get_pool() -> ResourcePool:
+    """The process-wide resource pool."""
+    return _pool
+
+def shutdown():
+    """Explicit shutdown hook (also registered with atexit)."""
+    _pool.shutdown()
+    memory_truth.close_connections()
+
+atexit.register(shutdown)
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, List, Optional
+import tracing
+
+class Stage:
+    """
+    One node of a stage graph.
+
+    fn is called with the results of its dependencies as keyword arguments,
+    named after the stages they come from.
+    """
+
+    def __init__(self, name: str, fn: Callable, deps: Optional[Iterable[str]] = None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps or ())
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={list(self.deps)})"
+
+def _check_graph(stages: List[Stage]):
+    """Reject duplicate names, unknown dependencies and cycles."""
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+
+    by_name = {s.name: s for s in stages}
+    for stage in stages:
+        missing = [d for d in stage.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+    # Kahn's algorithm: every stage must become ready at some point
+    remaining = {s.name: set(s.deps) for s in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Stage graph has a cycle among: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+def run_stages(stages: List[Stage], max_workers: int = 4) -> dict:
+    """
+    Run a dependency graph of stages, starting each one as soon as its inputs are done.
+
+    Independent stages run concurrently on up to max_workers threads.
+    Returns {stage name: result}. The first stage to raise stops scheduling
+    and its exception is re-raised once in-flight stages have finished.
+    """
+    stages = list(stages)
+    _check_graph(stages)
+    if not stages:
+        return {}
+
+    results = {}
+    pending = {s.name: s for s in stages}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(stages))), thread_name_prefix="stage") as pool:
+        while pending or running:
+            # 1. Submit every stage whose dependencies have all completed
+            for name, stage in list(pending.items()):
+                if all(d in results for d in stage.deps):
+                    kwargs = {d: results[d] for d in stage.deps}
+                    running[pool.submit(tracing.bind(stage.fn), **kwargs)] = name
+                    del pending[name]
+
+            # 2. Wait for the next stage to finish
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                results[name] = future.result()
+
+    return results
@@ -0,0 +1,27 @@
+import os
+import tempfile
+import unittest
+import memory_truth
+
+class TempDBTestCase(unittest.TestCase):
+    """
+    Base class for tests that need a real SQLite database: each test gets a
+    fresh memory_truth.DB_PATH in a temporary directory, restored afterwards.
+    Set init_schema = False to start from an empty file.
+    """
+
+    init_schema = True
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_db_path = memory_truth.DB_PATH
+        memory_truth.DB_PATH = os.path.join(self.tmp.name, 'memory.db')
+        if self.init_schema:
+            memory_truth.init_db()
+
+    def tearDown(self):
+        memory_truth.close_connections(memory_truth.DB_PATH)
+        memory_truth.DB_PATH = self.original_db_path
+        self.tmp.cleanup()
+        super().tearDown()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import batch_runner
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, lines):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def test_load_jobs(self):
+        path = self._write("topics.jsonl", [
+            '"Remote work"',
+            '',
+            '{"topic": " HBM supply ", "max_sources": 2, "policy": {"allow_web": false}}',
+        ])
+        jobs = batch_runner.load_jobs(path)
+        self.assertEqual(jobs, [
+            {"line": 1, "topic": "Remote work", "max_sources": 5, "policy": None},
+            {"line": 3, "topic": "HBM supply", "max_sources": 2, "policy": {"allow_web": False}},
+        ])
+
+        bad = self._write("bad.jsonl", ['{"topic": "ok"}', '{"max_sources": 3}'])
+        with self.assertRaisesRegex(ValueError, "bad.jsonl:2"):
+            batch_runner.load_jobs(bad)
+
+    def test_run_batch_writes_traces_and_stats(self):
+        jobs = [{"line": i + 1, "topic": f"T{i}", "max_sources": 3, "policy": {"allow_web": False}} for i in range(3)]
+        barrier = threading.Barrier(3, timeout=2)
+        calls = []
+
+        def run(topic, max_sources, execution_policy_override):
+            # Only passes if all three topics are in flight at once
+            barrier.wait()
+            calls.append((topic, max_sources, execution_policy_override))
+            if topic == "T1":
+                raise RuntimeError("quota")
+            return {"topic": topic, "session_id": f"s-{topic}"}
+
+        out = os.path.join(self.tmp.name, "traces.jsonl")
+        stats = batch_runner.run_batch(jobs, out, workers=3, run=run)
+
+        self.assertEqual(len(calls), 3)
+        self.assertIn(("T0", 3, {"allow_web": False}), calls)
+        with open(out, encoding='utf-8') as f:
+            lines = {r["topic"]: r for r in map(json.loads, f)}
+        self.assertEqual(lines["T0"]["trace"]["session_id"], "s-T0")
+        self.assertEqual(lines["T1"]["status"], "error")
+        self.assertEqual(lines["T1"]["error"], "RuntimeError: quota")
+
+        self.assertEqual((stats["total"], stats["succeeded"], stats["failed"]), (3, 2, 1))
+        self.assertEqual([r["topic"] for r in stats["per_topic"]], ["T0", "T1", "T2"])
+        self.assertGreater(stats["topics_per_min"], 0)
+
+    def test_percentile(self):
+        values = [1.0, 2.0, 3.0, 4.0, 10.0]
+        self.assertEqual(batch_runner._percentile(values, 50), 3.0)
+        self.assertEqual(batch_runner._percentile(values, 95), 10.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock
+import memory_truth
+import research_agent
+from temp_db import TempDBTestCase
+
+class TestCoverageMatcher(TempDBTestCase):
+
+    def _add(self, topic, q):
+        return memory_truth.add_coverage(topic, q, [], [], normalized_subquestion=research_agent.normalize_question(q))
+
+    def test_exact_and_fuzzy_matches(self):
+        exact = self._add("Chips", "What is the H100 price?")
+        trends = self._add("Chips", "What are the key trends?")
+        self._add("Other", "What are the latest trends?")
+
+        matches = research_agent.match_coverage(
+            "chips",
+            ["what is the h100 price?", "What are the latest trends?", "Who makes DRAM?"],
+            0.5
+        )
+        self.assertEqual(matches["what is the h100 price?"][0]['id'], exact)
+        self.assertEqual(matches["What are the latest trends?"][0]['id'], trends)
+        self.assertEqual(matches["What are the latest trends?"][1], 1.0)
+        self.assertNotIn("Who makes DRAM?", matches)
+
+    def test_scores_match_jaccard_scan(self):
+        questions = ["GPU supply chain risks", "GPU memory bandwidth", "supply chain for HBM memory", "export rules"]
+        for q in questions:
+            self._add("T", q)
+        query = "HBM memory supply risks"
+
+        cov, score = research_agent.match_coverage("T", [query], 0.0)[query]
+
+        norm = research_agent.normalize_question(query)
+        best = max(questions, key=lambda q: research_agent.calculate_jaccard_similarity(norm, research_agent.normalize_question(q)))
+        self.assertEqual(cov['subquestion'], best)
+        self.assertAlmostEqual(score, research_agent.calculate_jaccard_similarity(norm, research_agent.normalize_question(best)))
+
+    def test_legacy_rows_are_indexed_on_first_match(self):
+        conn = memory_truth.connect()
+        conn.execute("INSERT INTO subquestion_coverage (topic, subquestion) VALUES ('T', 'What are the key trends?')")
+        self.assertEqual(len(memory_truth.get_unindexed_coverage("T")), 1)
+
+        matches = research_agent.match_coverage("T", ["latest trends"], 0.5)
+
+        self.assertEqual(matches["latest trends"][0]['subquestion'], 'What are the key trends?')
+        self.assertEqual(memory_truth.get_unindexed_coverage("T"), [])
+
+    def test_semantic_match_embeds_missing_coverage(self):
+        c1 = self._add("T", "How has remote work changed productivity?")
+        c2 = self._add("T", "Which companies went fully remote?")
+        memory_truth.mark_coverage_embedded([c1], "coverage_memory")
+        vm = MagicMock()
+        vm.coverage.name = "coverage_memory"
+        vm.query_coverage.return_value = [[(c1, 0.91)], [(c2, 0.62)]]
+
+        matches = research_agent.semantic_match_coverage(
+            vm, "T", ["Effect of working from home on output", "Which firms are remote-first?"], 0.85
+        )
+
+        self.assertEqual(list(matches), ["Effect of working from home on output"])
+        cov, sim = matches["Effect of working from home on output"]
+        self.assertEqual(cov['id'], c1)
+        self.assertAlmostEqual(sim, 0.91)
+        # Only the coverage row that was not embedded yet is upserted
+        ids, texts, metas = vm.upsert_coverage.call_args[0]
+        self.assertEqual(ids, [c2])
+        self.assertEqual(metas[0]['topic_key'], "t")
+
+        # Once marked, the next run upserts nothing
+        vm.upsert_coverage.reset_mock()
+        research_agent.semantic_match_coverage(vm, "T", ["Which firms are remote-first?"], 0.85)
+        vm.upsert_coverage.assert_not_called()
+        self.assertEqual(memory_truth.get_unembedded_coverage("t", "coverage_memory"), [])
+        # Another embedder's collection still needs every row
+        self.assertEqual(len(memory_truth.get_unembedded_coverage("T", "coverage_memory__local")), 2)
+
+if __name__ == '__main__':
+    unittest.main()
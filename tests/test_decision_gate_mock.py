@@ -34,6 +34,10 @@ class TestDecisionGate(unittest.TestCase):
         mock_truth.get_facts_by_ids.return_value = [
             {'subject': 'S', 'predicate': 'P', 'object': 'O', 'confidence': 0.9}
         ]
+        # No stored coverage, so the gate verifies against memory
+        mock_truth.get_coverage_batch.return_value = {}
+        mock_truth.get_unindexed_coverage.return_value = []
+        mock_truth.get_coverage_token_matches.return_value = []
         
         # 3. Setup Mock LLM Responses
         mock_client = mock_openai.return_value
@@ -0,0 +1,66 @@
+
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+import embedders
+import memory_vector
+
+class TestHashingEmbedder(unittest.TestCase):
+
+    def test_deterministic_normalized_vectors(self):
+        emb = embedders.HashingEmbedder(dim=64)
+        v1, v2 = emb.embed_many(["Quantum computing trends", "Quantum computing trends"])
+        self.assertEqual(len(v1), 64)
+        self.assertEqual(v1, v2)
+        self.assertAlmostEqual(float(np.linalg.norm(v1)), 1.0, places=6)
+
+    def test_similar_texts_score_higher(self):
+        emb = embedders.HashingEmbedder()
+        base, near, far = emb.embed_many([
+            "remote work productivity since 2020",
+            "productivity of remote work after 2020",
+            "battery chemistry for electric vehicles"
+        ])
+        self.assertGreater(np.dot(base, near), np.dot(base, far))
+
+    def test_empty_text(self):
+        emb = embedders.HashingEmbedder(dim=8)
+        self.assertEqual(emb.embed_one(""), [0.0] * 8)
+
+class TestEmbedderSelection(unittest.TestCase):
+
+    @patch('memory_vector.OpenAI')
+    @patch('memory_vector.chromadb.PersistentClient')
+    def test_local_embedder_from_env(self, mock_chroma, mock_openai):
+        with patch.dict(os.environ, {"RESEARCH_AGENT_EMBEDDER": "local"}):
+            vm = memory_vector.VectorMemory()
+
+        # No OpenAI client and separate collections for the local embedder
+        mock_openai.assert_not_called()
+        self.assertIsNone(vm.client)
+        self.assertIsNone(vm.embedding_cache)
+        names = [c[1]['name'] for c in mock_chroma.return_value.get_or_create_collection.call_args_list]
+        self.assertEqual(names, [
+            "episodic_memory__local-hash-384",
+            "semantic_memory__local-hash-384",
+            "procedural_memory__local-hash-384",
+            "coverage_memory__local-hash-384"
+        ])
+        self.assertEqual(len(vm.embed("offline")), 384)
+
+    @patch('memory_vector.OpenAI')
+    @patch('memory_vector.chromadb.PersistentClient')
+    def test_openai_embedder_keeps_collection_names(self, mock_chroma, mock_openai):
+        vm = memory_vector.VectorMemory(use_embedding_cache=False, embedder="openai")
+        names = [c[1]['name'] for c in mock_chroma.return_value.get_or_create_collection.call_args_list]
+        self.assertEqual(names, ["episodic_memory", "semantic_memory", "procedural_memory", "coverage_memory"])
+        self.assertIs(vm.client, mock_openai.return_value)
+
+    @patch('memory_vector.chromadb.PersistentClient')
+    def test_unknown_embedder(self, mock_chroma):
+        with self.assertRaises(ValueError):
+            memory_vector.VectorMemory(embedder="nope")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+
+import os
+import tempfile
+import unittest
+import embedding_cache
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'embedding_cache.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_put_roundtrip(self):
+        cache = embedding_cache.EmbeddingCache(path=self.path)
+        self.assertIsNone(cache.get("model-a", "hello"))
+        cache.put("model-a", "hello", [0.5, -0.25, 1.0])
+        self.assertEqual(cache.get("model-a", "hello"), [0.5, -0.25, 1.0])
+
+        # Keyed by model as well as text
+        self.assertIsNone(cache.get("model-b", "hello"))
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["entries"], 1)
+        cache.close()
+
+    def test_persists_across_instances(self):
+        cache = embedding_cache.EmbeddingCache(path=self.path)
+        cache.put("m", "topic", [0.125])
+        cache.close()
+
+        reopened = embedding_cache.EmbeddingCache(path=self.path)
+        self.assertEqual(reopened.get("m", "topic"), [0.125])
+        self.assertEqual(reopened.stats()["entries"], 1)
+        reopened.close()
+
+    def test_lru_eviction(self):
+        cache = embedding_cache.EmbeddingCache(path=self.path, max_entries=2)
+        cache.put("m", "a", [1.0])
+        cache.put("m", "b", [2.0])
+        # Touch "a" so "b" becomes least recently used
+        cache.get("m", "a")
+        cache.put("m", "c", [3.0])
+
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.get("m", "a"), [1.0])
+        self.assertIsNone(cache.get("m", "b"))
+        self.assertEqual(cache.get("m", "c"), [3.0])
+        cache.close()
+
+    def test_batch_lookup_updates_recency_once(self):
+        cache = embedding_cache.EmbeddingCache(path=self.path)
+        cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+        self.assertEqual(cache._conn.execute('PRAGMA journal_mode').fetchone()[0], "wal")
+
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+        self.assertEqual(cache.get_many("m", ["a", "x", "b", "a"]), [[1.0], None, [2.0], [1.0]])
+        cache._conn.set_trace_callback(None)
+
+        self.assertEqual(sum(1 for sql in statements if sql.startswith("COMMIT")), 1)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(cache.get_many("m", []), [])
+        cache.close()
+
+    def test_eviction_counts_entries_from_other_instances(self):
+        cache = embedding_cache.EmbeddingCache(path=self.path, max_entries=3)
+        other = embedding_cache.EmbeddingCache(path=self.path, max_entries=3)
+        cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+        other.put_many("m", ["c", "d"], [[3.0], [4.0]])
+        cache.put("m", "e", [5.0])
+
+        self.assertEqual(cache.stats()["entries"], 3)
+        self.assertEqual(other.stats()["entries"], 3)
+        self.assertEqual(cache.get_many("m", ["a", "b", "c"]), [None, None, [3.0]])
+        cache.close()
+        other.close()
+
+    def test_opt_out_flag(self):
+        os.environ["RESEARCH_AGENT_EMBEDDING_CACHE"] = "0"
+        try:
+            self.assertFalse(embedding_cache.cache_enabled())
+        finally:
+            del os.environ["RESEARCH_AGENT_EMBEDDING_CACHE"]
+        self.assertTrue(embedding_cache.cache_enabled())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import evidence_packer
+
+class TestEvidencePacker(unittest.TestCase):
+
+    def test_count_and_truncate(self):
+        self.assertEqual(evidence_packer.count_tokens(""), 0)
+        text = "memory bandwidth " * 200
+        cut = evidence_packer.truncate_to_tokens(text, 50)
+        self.assertLessEqual(evidence_packer.count_tokens(cut), 50)
+        self.assertTrue(text.startswith(cut))
+        self.assertEqual(evidence_packer.truncate_to_tokens("short", 50), "short")
+
+    def test_length_fallback_without_tiktoken(self):
+        with patch.object(evidence_packer, 'tiktoken', None), patch.object(evidence_packer, '_encoding', None):
+            self.assertEqual(evidence_packer.count_tokens("x" * 10), 3)
+            self.assertEqual(evidence_packer.truncate_to_tokens("x" * 10, 2), "x" * 8)
+
+    def test_rank_prefers_relevant_then_fresh(self):
+        now = datetime(2026, 6, 1)
+        items = [
+            {'id': 1, 'created_at': (now - timedelta(days=900)).isoformat()},
+            {'id': 2, 'created_at': (now - timedelta(days=1)).isoformat()},
+            {'id': 3, 'created_at': (now - timedelta(days=1)).isoformat()},
+        ]
+        ranked = evidence_packer.rank_evidence(items, now=now)
+        # The stale top hit drops below the fresh second one but stays ahead of the third
+        self.assertEqual([i['id'] for i in ranked], [2, 1, 3])
+
+    def test_pack_fills_budget(self):
+        items = [{'id': i, 'text': "word " * 400} for i in range(5)] + [{'id': 9, 'text': "tiny"}]
+        render = lambda item: item['text']
+
+        packed = evidence_packer.pack(items, 600, render, rank=False)
+
+        self.assertLessEqual(packed.tokens, 600)
+        # The first item fits, the second is truncated into the rest of the budget
+        self.assertEqual([i['id'] for i in packed.items][:2], [0, 1])
+        self.assertLess(len(packed.texts[1]), len(items[1]['text']))
+
+        capped = evidence_packer.pack(items, 5000, render, max_item_tokens=10, rank=False)
+        self.assertEqual(len(capped.items), 6)
+        self.assertTrue(all(evidence_packer.count_tokens(t) <= 10 for t in capped.texts))
+
+    def test_budget_overrides(self):
+        with patch.dict(os.environ, {"RESEARCH_AGENT_TOKEN_BUDGETS": "report=8000, memory_eval=bad"}):
+            self.assertEqual(evidence_packer.budget_for("report"), 8000)
+            self.assertEqual(evidence_packer.budget_for("memory_eval"), evidence_packer.DEFAULT_BUDGETS["memory_eval"])
+
+if __name__ == '__main__':
+    unittest.main()
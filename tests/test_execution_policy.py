@@ -43,8 +43,8 @@ class TestExecutionPolicy(unittest.TestCase):
         mock_client.chat.completions.create.return_value = r1
 
         # Mock coverage to return None (so it is uncovered)
-        mock_truth.get_coverage.return_value = None
-        mock_truth.get_coverage_by_topic.return_value = []
+        mock_truth.get_coverage_batch.return_value = {}
+        mock_truth.get_coverage_token_matches.return_value = []
         
         # Mock evaluation to say "missing" (so needs_web WOULD be True)
         # Using return value for evaluate_... call? 
@@ -103,7 +103,7 @@ class TestExecutionPolicy(unittest.TestCase):
         # Even if coverage exists, it should be ignored!
         # Mock coverage (if called) to return something.
         # But we expect it NOT to be called or at least ignored.
-        mock_truth.get_coverage.side_effect = Exception("Should not call get_coverage!")
+        mock_truth.get_coverage_batch.side_effect = Exception("Should not call get_coverage_batch!")
         
         # Mock Evaluation response
         r2 = MagicMock()
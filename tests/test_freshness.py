@@ -44,13 +44,8 @@ class TestFreshnessPolicy(unittest.TestCase):
             'topic': 'Topic'
         }
 
-        # Setup get_coverage behavior
-        def get_coverage_side_effect(topic, q):
-            if q == 'Q_Fresh': return c1
-            if q == 'Q_Stale': return c2
-            return None
-        mock_truth.get_coverage.side_effect = get_coverage_side_effect
-        mock_truth.get_coverage_by_topic.return_value = [c1, c2]
+        # Setup exact coverage lookup (one batched call)
+        mock_truth.get_coverage_batch.return_value = {'Q_Fresh': c1, 'Q_Stale': c2}
         
         # Mock LLM Subquestions
         mock_client = mock_openai.return_value
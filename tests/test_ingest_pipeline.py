@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import memory_truth
+import research_agent
+from temp_db import TempDBTestCase
+
+def _echo_openai_client():
+    client = MagicMock()
+
+    def create(**kwargs):
+        content = kwargs['messages'][0]['content']
+        resp = MagicMock()
+        if "Extract 5-12 key semantic facts" in content:
+            resp.choices[0].message.content = json.dumps({"facts": [{"subject": content[-12:], "predicate": "p", "object": "o"}]})
+        else:
+            # Echo the page text so summaries can be traced back to their URL
+            resp.choices[0].message.content = "summary of " + content.split("Text:\n")[1]
+        return resp
+
+    client.chat.completions.create.side_effect = create
+    return client
+
+class TestIngestPipeline(unittest.TestCase):
+
+    def _openai_client(self):
+        return _echo_openai_client()
+
+    @patch('research_agent.memory_truth')
+    @patch('research_agent.web_fetch.fetch_page')
+    @patch('research_agent.web_search.search_web')
+    def test_sources_run_concurrently_and_store_in_order(self, mock_search, mock_fetch, mock_truth):
+        urls = [f"http://site{i}.com" for i in range(4)]
+        mock_search.return_value = [{'link': u} for u in urls]
+
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fetch(url, session=None):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            # Earlier URLs finish last
+            time.sleep(0.05 * (4 - urls.index(url)))
+            with lock:
+                active["now"] -= 1
+            return {'text': url, 'title': url}
+        mock_fetch.side_effect = fetch
+
+        stored = []
+
+        def add_episodes(rows):
+            stored.append(rows[0]['notes'])
+            return [{**rows[0], 'id': len(stored)}]
+        mock_truth.add_episodes_bulk.side_effect = add_episodes
+        mock_truth.add_facts_bulk.side_effect = lambda rows: [{**r, 'id': 100 + r['source_episode_id']} for r in rows]
+
+        vm = MagicMock()
+        with patch.dict(os.environ, {"SERPAPI_API_KEY": "test-key"}):
+            sources, episode_ids, fact_ids = research_agent._web_search_and_ingest(
+                self._openai_client(), vm, "Topic", "s1", ["Q1"], 4, fetch_workers=4, llm_workers=2
+            )
+
+        self.assertEqual(sources, urls)
+        self.assertEqual(episode_ids, [1, 2, 3, 4])
+        self.assertEqual(stored, [f"summary of {u}" for u in urls])
+        self.assertEqual(fact_ids, [101, 102, 103, 104])
+        self.assertGreater(active["peak"], 1)
+
+    @patch('research_agent.memory_truth')
+    @patch('research_agent.web_fetch.fetch_page')
+    @patch('research_agent.web_search.search_web')
+    def test_failed_and_empty_sources_are_skipped(self, mock_search, mock_fetch, mock_truth):
+        mock_search.return_value = [{'link': 'http://empty.com'}, {'link': 'http://boom.com'}, {'link': 'http://ok.com'}]
+
+        def fetch(url, session=None):
+            if url == 'http://boom.com':
+                raise RuntimeError("connection reset")
+            return {'text': None if url == 'http://empty.com' else 'body', 'title': 'T'}
+        mock_fetch.side_effect = fetch
+        mock_truth.add_episodes_bulk.side_effect = lambda rows: [{**rows[0], 'id': 7}]
+        mock_truth.add_facts_bulk.return_value = []
+
+        events = []
+        with patch.dict(os.environ, {"SERPAPI_API_KEY": "test-key"}):
+            _, episode_ids, _ = research_agent._web_search_and_ingest(
+                self._openai_client(), MagicMock(), "Topic", "s1", ["Q1"], 5, on_event=events.append
+            )
+
+        self.assertEqual(episode_ids, [7])
+        self.assertIn("Skipping http://empty.com: No text content.", events)
+        self.assertTrue(any(e.startswith("Skipping http://boom.com: fetch failed") for e in events))
+
+    @patch('research_agent.memory_truth')
+    @patch('research_agent.web_fetch.fetch_page')
+    @patch('research_agent.web_search.search_web')
+    def test_failed_store_skips_only_that_source(self, mock_search, mock_fetch, mock_truth):
+        mock_search.return_value = [{'link': 'http://bad.com'}, {'link': 'http://ok.com'}]
+        mock_fetch.side_effect = lambda url, session=None: {'text': url, 'title': 'T'}
+
+        def add_episodes(rows):
+            if rows[0]['url'] == 'http://bad.com':
+                raise ValueError("malformed digest")
+            return [{**rows[0], 'id': 8}]
+        mock_truth.add_episodes_bulk.side_effect = add_episodes
+        mock_truth.add_facts_bulk.return_value = []
+
+        events = []
+        with patch.dict(os.environ, {"SERPAPI_API_KEY": "test-key"}):
+            _, episode_ids, _ = research_agent._web_search_and_ingest(
+                self._openai_client(), MagicMock(), "Topic", "s1", ["Q1"], 5, on_event=events.append
+            )
+
+        self.assertEqual(episode_ids, [8])
+        self.assertIn("Skipping http://bad.com: ingestion failed (malformed digest).", events)
+
+    def test_allocate_sources_round_robin(self):
+        results = [
+            [{'link': 'a1'}, {'link': 'a2'}, {'link': 'a3'}],
+            [{'link': 'b1'}, {'link': 'a1'}],
+            [],
+            [{'link': 'c1'}, {'link': None}, {'link': 'c3'}],
+        ]
+        self.assertEqual(research_agent.allocate_sources(results, 4), ['a1', 'b1', 'c1', 'a2'])
+        self.assertEqual(research_agent.allocate_sources(results, 10), ['a1', 'b1', 'c1', 'a2', 'a3', 'c3'])
+        self.assertEqual(research_agent.allocate_sources(results, 0), [])
+
+    @patch('research_agent.web_search.search_web')
+    def test_searches_run_concurrently(self, mock_search):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def search(q, num_results):
+            # Only passes if all three searches are in flight at once
+            barrier.wait()
+            if q == "Q2":
+                raise RuntimeError("quota")
+            return [{'link': f"http://{q}.com"}]
+        mock_search.side_effect = search
+
+        results = research_agent._search_all(["Q1", "Q2", "Q3"], search_workers=3)
+        self.assertEqual(results, [[{'link': "http://Q1.com"}], [], [{'link': "http://Q3.com"}]])
+
+    def test_fused_mode_uses_one_call(self):
+        client = MagicMock()
+        resp = MagicMock()
+        resp.choices[0].message.content = json.dumps({
+            "summary": "H100 ships in 2023.",
+            "facts": [{"subject": "H100", "predicate": "ships in", "object": "2023"}, "junk"]
+        })
+        client.chat.completions.create.return_value = resp
+
+        digest = research_agent._summarize_source(client, "Chips", "http://x.com", {'text': 'page'}, "fused")
+
+        client.chat.completions.create.assert_called_once()
+        self.assertEqual(digest["mode"], "fused")
+        self.assertEqual(digest["summary"], "H100 ships in 2023.")
+        self.assertEqual(digest["facts"], [{"subject": "H100", "predicate": "ships in", "object": "2023"}])
+
+    def test_fused_mode_falls_back_to_two_calls(self):
+        bad, summary, facts = MagicMock(), MagicMock(), MagicMock()
+        bad.choices[0].message.content = json.dumps({"facts": []})  # no summary
+        summary.choices[0].message.content = "Summary"
+        facts.choices[0].message.content = json.dumps({"facts": [{"subject": "s", "predicate": "p", "object": "o"}]})
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [bad, summary, facts]
+
+        digest = research_agent._summarize_source(client, "Chips", "http://x.com", {'text': 'page'}, "fused")
+
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+        self.assertEqual(digest["mode"], "two_call")
+        self.assertEqual(digest["summary"], "Summary")
+        self.assertEqual(len(digest["facts"]), 1)
+
+    def test_two_call_mode_drops_non_dict_facts(self):
+        summary, facts = MagicMock(), MagicMock()
+        summary.choices[0].message.content = "Summary"
+        facts.choices[0].message.content = json.dumps({"facts": ["just a string", {"subject": "s", "predicate": "p", "object": "o"}]})
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [summary, facts]
+
+        digest = research_agent._summarize_source(client, "Chips", "http://x.com", {'text': 'page'})
+
+        self.assertEqual(digest["facts"], [{"subject": "s", "predicate": "p", "object": "o"}])
+        with patch('research_agent.memory_truth') as mock_truth:
+            mock_truth.add_episodes_bulk.return_value = [{'id': 3, 'topic': 'Chips', 'notes': 'Summary'}]
+            mock_truth.add_facts_bulk.side_effect = lambda rows: [{**r, 'id': 30 + i} for i, r in enumerate(rows)]
+            ep_id, fact_ids = research_agent._store_source(
+                MagicMock(), "Chips", "s1", "http://x.com", {'text': 'page'},
+                {**digest, "facts": ["just a string"] + digest["facts"]}
+            )
+        self.assertEqual((ep_id, fact_ids), (3, [30]))
+
+class TestSourceReuse(TempDBTestCase):
+
+    def _ingest(self, client, urls, **kwargs):
+        with patch('research_agent.web_search.search_web', return_value=[{'link': u} for u in urls]), \
+             patch.dict(os.environ, {"SERPAPI_API_KEY": "test-key"}):
+            return research_agent._web_search_and_ingest(client, MagicMock(), "New Topic", "s2", ["Q1"], len(urls), **kwargs)
+
+    def _seed(self, url, fetched_at, text="page text"):
+        ep_id = memory_truth.add_episode("Old Topic", "Stored summary.", url=url, title="Stored", session_id="s1")
+        memory_truth.add_fact("Old Topic", "H100", "costs", "$30k", confidence=0.9, source_episode_id=ep_id, source_url=url)
+        memory_truth.record_source(url, ep_id, memory_truth.content_hash(text), fetched_at=fetched_at)
+        return ep_id
+
+    @patch('research_agent.web_fetch.fetch_page')
+    def test_fresh_source_is_cloned_without_fetch_or_llm(self, mock_fetch):
+        old_ep = self._seed("http://known.com/", datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
+        client = MagicMock()
+
+        _, episode_ids, fact_ids = self._ingest(client, ["http://known.com"])
+
+        mock_fetch.assert_not_called()
+        client.chat.completions.create.assert_not_called()
+        ep = memory_truth.get_episode(episode_ids[0])
+        self.assertNotEqual(ep['id'], old_ep)
+        self.assertEqual((ep['topic'], ep['session_id'], ep['notes']), ("New Topic", "s2", "Stored summary."))
+        fact = memory_truth.get_facts_by_ids(fact_ids)[0]
+        self.assertEqual((fact['object'], fact['topic'], fact['source_episode_id']), ("$30k", "New Topic", ep['id']))
+        self.assertEqual(memory_truth.get_sources(["http://known.com"])["http://known.com"]['episode_id'], ep['id'])
+
+    @patch('research_agent.web_fetch.fetch_page')
+    def test_stale_source_is_refetched_and_reused_if_unchanged(self, mock_fetch):
+        self._seed("http://same.com", "2020-01-01 00:00:00", text="page text")
+        self._seed("http://changed.com", "2020-01-01 00:00:00", text="old text")
+        mock_fetch.side_effect = lambda url, session=None: {'text': 'page text', 'title': 'T'}
+        client = _echo_openai_client()
+
+        _, episode_ids, _ = self._ingest(client, ["http://same.com", "http://changed.com"])
+
+        self.assertEqual(mock_fetch.call_count, 2)
+        # Only the changed page is summarized and fact-extracted
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+        notes = [memory_truth.get_episode(i)['notes'] for i in episode_ids]
+        self.assertEqual(notes, ["Stored summary.", "summary of page text"])
+
+        entry = memory_truth.get_sources(["http://same.com"])["http://same.com"]
+        self.assertLess(research_agent._source_age_days(entry['fetched_at']), 1)
+
+    @patch('research_agent.web_fetch.fetch_page')
+    def test_reuse_can_be_disabled(self, mock_fetch):
+        self._seed("http://known.com", datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
+        mock_fetch.return_value = {'text': 'page text', 'title': 'T'}
+
+        self._ingest(_echo_openai_client(), ["http://known.com"], reuse_sources=False)
+
+        mock_fetch.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import llm_cache
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = llm_cache.LLMCache(path=os.path.join(self.tmp.name, 'llm_cache.db'), max_entries=2)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def _client(self, *contents):
+        client = MagicMock()
+        responses = []
+        for content in contents:
+            resp = MagicMock()
+            resp.choices[0].message.content = content
+            resp.choices[0].finish_reason = "stop"
+            responses.append(resp)
+        client.chat.completions.create.side_effect = responses
+        return client
+
+    def _params(self, prompt):
+        return {"model": "gpt-4o", "messages": [{"role": "user", "content": prompt}], "response_format": {"type": "json_object"}}
+
+    def test_repeat_call_is_served_from_cache(self):
+        client = self._client('{"facts": []}')
+
+        first = llm_cache.cached_chat(client, "extract_facts", cache=self.cache, **self._params("summary"))
+        second = llm_cache.cached_chat(client, "extract_facts", cache=self.cache, **self._params("summary"))
+
+        client.chat.completions.create.assert_called_once()
+        self.assertEqual(second.choices[0].message.content, first.choices[0].message.content)
+        self.assertTrue(second.cached)
+        stats = self.cache.stats()
+        self.assertEqual(stats["call_sites"]["extract_facts"], {"hits": 1, "misses": 1})
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_parameters_are_part_of_the_key(self):
+        params = self._params("summary")
+        self.cache.put("extract_facts", params, "cached")
+        self.assertIsNone(self.cache.get("extract_facts", {**params, "temperature": 0.3}))
+        self.assertIsNone(self.cache.get("extract_facts", {**params, "model": "gpt-4o-mini"}))
+        self.assertIsNotNone(self.cache.get("extract_facts", dict(params)))
+
+    def test_ttl_and_lru_eviction(self):
+        self.cache.put("report", self._params("a"), "A")
+        self.cache.put("report", self._params("b"), "B")
+        self.cache.get("report", self._params("a"))
+        self.cache.put("report", self._params("c"), "C")
+
+        # "b" was the least recently used entry
+        self.assertIsNone(self.cache.get("report", self._params("b")))
+        self.assertEqual(self.cache.stats()["entries"], 2)
+
+        self.cache.ttl = 0
+        with patch('llm_cache.time.time', return_value=llm_cache.time.time() + 1):
+            self.assertIsNone(self.cache.get("report", self._params("a")))
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_call_sites_are_opt_in(self):
+        with patch.dict(os.environ, {"RESEARCH_AGENT_LLM_CACHE": ""}):
+            self.assertFalse(llm_cache.cache_enabled("extract_facts"))
+        with patch.dict(os.environ, {"RESEARCH_AGENT_LLM_CACHE": "all"}):
+            self.assertTrue(llm_cache.cache_enabled("report"))
+        with patch.dict(os.environ, {"RESEARCH_AGENT_LLM_CACHE": "extract_facts, summarize_source"}):
+            self.assertTrue(llm_cache.cache_enabled("summarize_source"))
+            self.assertFalse(llm_cache.cache_enabled("subquestions"))
+
+            client = self._client("one", "two")
+            with patch('llm_cache.get_cache') as mock_get_cache:
+                llm_cache.cached_chat(client, "subquestions", **self._params("topic"))
+                mock_get_cache.assert_not_called()
+
+    def test_failed_completions_are_not_stored(self):
+        client = self._client("")
+        llm_cache.cached_chat(client, "summarize_source", cache=self.cache, **self._params("page"))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
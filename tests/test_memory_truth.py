@@ -3,7 +3,8 @@ import os
 import memory_truth
 
 def test_memory_truth():
-    # Helper to clean up
+    # Helper to clean up (pooled handles must not outlive the file)
+    memory_truth.close_connections(memory_truth.DB_PATH)
     if os.path.exists(memory_truth.DB_PATH):
         os.remove(memory_truth.DB_PATH)
 
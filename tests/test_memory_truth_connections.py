@@ -0,0 +1,44 @@
+import threading
+import unittest
+import memory_truth
+from temp_db import TempDBTestCase
+
+class TestMemoryTruthConnections(TempDBTestCase):
+
+    def test_connection_is_reused_with_wal(self):
+        conn = memory_truth.connect()
+        self.assertIs(memory_truth.connect(), conn)
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        # synchronous=NORMAL is 1
+        self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 1)
+
+    def test_threads_get_their_own_connection(self):
+        main_conn = memory_truth.connect()
+        seen = []
+        worker = threading.Thread(target=lambda: seen.append(memory_truth.connect()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(seen[0], main_conn)
+
+    def test_transaction_groups_and_rolls_back(self):
+        with memory_truth.transaction():
+            ep_id = memory_truth.add_episode("T", "kept")
+            memory_truth.add_fact("T", "a", "b", "c", source_episode_id=ep_id)
+
+        with self.assertRaises(RuntimeError):
+            with memory_truth.transaction():
+                memory_truth.add_episode("T", "discarded")
+                raise RuntimeError("boom")
+
+        notes = [ep['notes'] for ep in memory_truth.get_episodes_by_topic("T")]
+        self.assertEqual(notes, ["kept"])
+        self.assertEqual(len(memory_truth.get_facts_by_ids([1])), 1)
+
+    def test_close_connections_reopens_lazily(self):
+        conn = memory_truth.connect()
+        memory_truth.close_connections()
+        self.assertTrue(conn.closed)
+        self.assertIsNot(memory_truth.connect(), conn)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ class TestMemoryTruthHelpers(unittest.TestCase):
         memory_truth.init_db()
 
     def tearDown(self):
+        memory_truth.close_connections(memory_truth.DB_PATH)
         if os.path.exists(memory_truth.DB_PATH):
             os.remove(memory_truth.DB_PATH)
         memory_truth.DB_PATH = self.original_db_path
@@ -59,6 +60,112 @@ class TestMemoryTruthHelpers(unittest.TestCase):
         self.assertEqual(facts[0]['id'], id2)
         self.assertEqual(facts[1]['id'], id1)
 
+    def test_full_text_search(self):
+        ep1 = memory_truth.add_episode(topic="Chips", notes="The Nvidia H100 ships in 2023", title="GPU news", session_id="s1")
+        ep2 = memory_truth.add_episode(topic="Chips", notes="Memory prices fell sharply", title="DRAM", session_id="s2")
+        ep3 = memory_truth.add_episode(topic="Other", notes="H100 rental costs", title="Cloud")
+        f1 = memory_truth.add_fact(topic="Chips", subject="H100", predicate="released in", object_="2023")
+
+        # Exact entity match, scoped by topic (case-insensitive)
+        self.assertEqual(memory_truth.search_episodes_fts("H100 release", topic="chips"), [ep1])
+        self.assertEqual(set(memory_truth.search_episodes_fts("H100")), {ep1, ep3})
+        self.assertEqual(memory_truth.search_episodes_fts("memory", topic="Chips", session_id="s2"), [ep2])
+        self.assertEqual(memory_truth.search_facts_fts("H100 2023", topic="Chips"), [f1])
+
+        # Punctuation / FTS syntax in the query is neutralised
+        self.assertEqual(set(memory_truth.search_episodes_fts('"H100" AND (NEAR')), {ep1, ep3})
+        self.assertEqual(memory_truth.search_episodes_fts("!!!"), [])
+
+    def test_bulk_inserts_return_rows(self):
+        episodes = memory_truth.add_episodes_bulk([
+            {"topic": "Bulk", "notes": "first", "session_id": "s1"},
+            {"topic": "Bulk", "notes": "second", "title": "Two"},
+        ])
+        self.assertEqual([ep['notes'] for ep in episodes], ["first", "second"])
+        self.assertEqual(episodes[0]['outcome'], 'unknown')
+        self.assertTrue(episodes[0]['created_at'])
+        self.assertEqual(memory_truth.get_episode(episodes[1]['id'])['title'], "Two")
+
+        # More rows than fit in one statement
+        rows = [{"topic": "Bulk", "subject": f"S{i}", "predicate": "is", "object": str(i), "source_episode_id": episodes[0]['id']} for i in range(300)]
+        facts = memory_truth.add_facts_bulk(rows)
+        self.assertEqual([f['subject'] for f in facts], [f"S{i}" for i in range(300)])
+        self.assertEqual(facts[0]['confidence'], 0.7)
+        self.assertEqual(len(memory_truth.get_facts_by_ids([f['id'] for f in facts])), 300)
+
+        coverage = memory_truth.add_coverage_bulk([{"topic": "Bulk", "subquestion": "Q", "episode_ids": [episodes[0]['id']], "fact_ids": []}])
+        self.assertEqual(memory_truth.get_coverage("Bulk", "Q")['id'], coverage[0]['id'])
+
+        self.assertEqual(memory_truth.add_facts_bulk([]), [])
+        with self.assertRaises(ValueError):
+            memory_truth.add_facts_bulk([{"topic": "Bulk", "subject": "S"}])
+
+    def test_coverage_with_evidence(self):
+        ep1 = memory_truth.add_episode(topic="Cov", notes="first source")
+        ep2 = memory_truth.add_episode(topic="Cov", notes="second source")
+        f1 = memory_truth.add_fact(topic="Cov", subject="S", predicate="P", object_="O", source_episode_id=ep1)
+
+        memory_truth.add_coverage("Cov", "What is X?", [ep1], [], normalized_subquestion="what x")
+        newest = memory_truth.add_coverage("Cov", "What is X?", [ep2, ep1], [f1], normalized_subquestion="what x")
+        memory_truth.add_coverage_bulk([{"topic": "Cov", "subquestion": "Why Y?", "episode_ids": [ep2], "fact_ids": []}])
+
+        hydrated = memory_truth.get_coverage_with_evidence("cov", ["what is x?", "Why Y?", "Unknown"])
+        self.assertEqual(set(hydrated), {"what is x?", "Why Y?"})
+        cov = hydrated["what is x?"]
+        self.assertEqual(cov['id'], newest)
+        self.assertEqual([e['id'] for e in cov['episodes']], [ep2, ep1])
+        self.assertEqual(cov['episodes'][1]['notes'], "first source")
+        self.assertEqual([f['subject'] for f in cov['facts']], ["S"])
+        self.assertEqual([e['id'] for e in hydrated["Why Y?"]['episodes']], [ep2])
+
+        # Reverse lookups
+        self.assertEqual([c['subquestion'] for c in memory_truth.get_coverage_by_episode(ep2)], ["Why Y?", "What is X?"])
+        self.assertEqual([c['id'] for c in memory_truth.get_coverage_by_fact(f1)], [newest])
+
+    def test_coverage_with_evidence_matches_non_ascii(self):
+        ep = memory_truth.add_episode(topic="T", notes="source")
+        f = memory_truth.add_fact(topic="T", subject="S", predicate="P", object_="O", source_episode_id=ep)
+        cov_id = memory_truth.add_coverage("T", "Économie de la France?", [ep], [f])
+
+        # Same (ASCII-only) case folding as get_coverage()
+        questions = ["Économie de la France?", "Économie DE LA FRANCE?", "économie de la france?"]
+        expected = [q for q in questions if memory_truth.get_coverage("T", q)]
+        self.assertEqual(expected, questions[:2])
+        hydrated = memory_truth.get_coverage_with_evidence("T", questions)
+        self.assertEqual(sorted(hydrated), sorted(expected))
+        self.assertEqual(hydrated["Économie DE LA FRANCE?"]['id'], cov_id)
+        self.assertEqual([e['id'] for e in hydrated["Économie de la France?"]['episodes']], [ep])
+
+    def test_coverage_batch_matches_non_ascii(self):
+        cov_id = memory_truth.add_coverage("T", "Économie de la France?", [1], [2])
+
+        questions = ["Économie de la France?", "Économie DE LA FRANCE?", "économie de la france?"]
+        batch = memory_truth.get_coverage_batch("T", questions)
+        self.assertEqual(sorted(batch), sorted(q for q in questions if memory_truth.get_coverage("T", q)))
+        self.assertEqual(batch["Économie de la France?"]['id'], cov_id)
+        self.assertNotIn('wanted_q', batch["Économie DE LA FRANCE?"])
+
+    def test_source_index(self):
+        self.assertEqual(
+            memory_truth.canonical_url("HTTPS://Example.com:443/a/b/?utm_source=x&id=7#top"),
+            "https://example.com/a/b?id=7"
+        )
+        ep1 = memory_truth.add_episode(topic="A", notes="first", url="https://example.com/a")
+        ep2 = memory_truth.add_episode(topic="B", notes="second", url="https://example.com/a/")
+        f1 = memory_truth.add_fact(topic="B", subject="S", predicate="P", object_="O", source_episode_id=ep2)
+
+        memory_truth.record_source("https://example.com/a", ep1, "h1")
+        memory_truth.record_source("https://EXAMPLE.com/a/", ep2, None, fetched_at="2026-01-01 00:00:00")
+
+        sources = memory_truth.get_sources(["https://example.com/a?utm_medium=mail", "https://other.com", None])
+        self.assertEqual(list(sources), ["https://example.com/a?utm_medium=mail"])
+        entry = sources["https://example.com/a?utm_medium=mail"]
+        self.assertEqual(entry['episode_id'], ep2)
+        # A clone without a new fetch keeps the known hash and the original fetch time
+        self.assertEqual(entry['content_hash'], "h1")
+        self.assertEqual(entry['fetched_at'], "2026-01-01 00:00:00")
+        self.assertEqual([f['id'] for f in memory_truth.get_facts_by_episode(ep2)], [f1])
+
     print("ALL TESTS PASSED")
 
 if __name__ == '__main__':
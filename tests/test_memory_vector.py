@@ -1,6 +1,9 @@
 
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+import chromadb
 import memory_vector
 
 class TestVectorMemory(unittest.TestCase):
@@ -20,7 +23,7 @@ class TestVectorMemory(unittest.TestCase):
 
         # Initialize
         print("Initializing VectorMemory...")
-        vm = memory_vector.VectorMemory()
+        vm = memory_vector.VectorMemory(use_embedding_cache=False)
         
         # Test Embed
         print("Testing embed...")
@@ -49,5 +52,123 @@ class TestVectorMemory(unittest.TestCase):
         
         print("ALL TESTS PASSED")
 
+    @patch('memory_vector.OpenAI')
+    @patch('memory_vector.chromadb.PersistentClient')
+    def test_embed_uses_cache(self, mock_chroma, mock_openai):
+        mock_embedding_response = MagicMock()
+        mock_embedding_response.data = [MagicMock(embedding=[0.5, 0.25])]
+        mock_openai_instance = mock_openai.return_value
+        mock_openai_instance.embeddings.create.return_value = mock_embedding_response
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch('embedding_cache.CACHE_PATH', os.path.join(tmp, 'cache.db')):
+                vm = memory_vector.VectorMemory(use_embedding_cache=True)
+                self.assertEqual(vm.embed("repeated topic"), [0.5, 0.25])
+                self.assertEqual(vm.embed("repeated topic"), [0.5, 0.25])
+                vm.embedding_cache.close()
+
+        # Second call is served from the cache
+        mock_openai_instance.embeddings.create.assert_called_once()
+        self.assertEqual(vm.embedding_cache.hits, 1)
+        self.assertEqual(vm.embedding_cache.misses, 1)
+
+    @patch('memory_vector.OpenAI')
+    @patch('memory_vector.chromadb.PersistentClient')
+    def test_bulk_upsert_batches_embeddings(self, mock_chroma, mock_openai):
+        def embeddings_side_effect(input, model):
+            resp = MagicMock()
+            resp.data = [MagicMock(embedding=[float(len(t))]) for t in input]
+            return resp
+
+        mock_openai_instance = mock_openai.return_value
+        mock_openai_instance.embeddings.create.side_effect = embeddings_side_effect
+        mock_collection = MagicMock()
+        mock_chroma.return_value.get_or_create_collection.return_value = mock_collection
+
+        vm = memory_vector.VectorMemory(use_embedding_cache=False)
+
+        # Duplicates are embedded once, results keep input order
+        vecs = vm.embed_many(["a", "bbb", "a"])
+        self.assertEqual(vecs, [[1.0], [3.0], [1.0]])
+        self.assertEqual(mock_openai_instance.embeddings.create.call_args[1]['input'], ["a", "bbb"])
+
+        mock_openai_instance.embeddings.create.reset_mock()
+        vm.upsert_facts([1, 2, 3], ["f1", "fact2", "f3"], [{"topic": "T"}] * 3)
+        mock_openai_instance.embeddings.create.assert_called_once()
+        mock_collection.upsert.assert_called_once()
+        call_args = mock_collection.upsert.call_args[1]
+        self.assertEqual(call_args['ids'], ["fact:1", "fact:2", "fact:3"])
+        self.assertEqual(call_args['embeddings'], [[2.0], [5.0], [2.0]])
+
+        # Batches respect the per-request input limit
+        mock_openai_instance.embeddings.create.reset_mock()
+        with patch('memory_vector.EMBEDDING_BATCH_MAX_INPUTS', 2):
+            vm.embed_many(["x1", "x2", "x3", "x4", "x5"])
+        self.assertEqual(mock_openai_instance.embeddings.create.call_count, 3)
+
+        # Empty input makes no calls
+        mock_collection.upsert.reset_mock()
+        vm.upsert_episodes([], [], [])
+        mock_collection.upsert.assert_not_called()
+
+    @patch('memory_vector.OpenAI')
+    @patch('memory_vector.chromadb.PersistentClient')
+    def test_filtered_queries(self, mock_chroma, mock_openai):
+        mock_collection = MagicMock()
+        mock_chroma.return_value.get_or_create_collection.return_value = mock_collection
+        vm = memory_vector.VectorMemory(use_embedding_cache=False)
+
+        self.assertIsNone(memory_vector.build_where())
+        self.assertEqual(memory_vector.build_where(topic="T"), {"topic_key": "t"})
+        where = memory_vector.build_where(topic="T", session_id="s1")
+        self.assertEqual(where, {"$and": [{"topic_key": "t"}, {"session_id": "s1"}]})
+
+        vm.query_semantic("q", k=4, query_embedding=[0.1], where=where)
+        kwargs = mock_collection.query.call_args[1]
+        self.assertEqual(kwargs['where'], where)
+        self.assertEqual(kwargs['n_results'], 4)
+
+        # No filter -> no where clause sent to Chroma
+        vm.query_episodic("q", query_embedding=[0.1])
+        self.assertNotIn('where', mock_collection.query.call_args[1])
+
+    def test_coverage_collection_cosine_matching(self):
+        real_client = chromadb.PersistentClient
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch('memory_vector.chromadb.PersistentClient', side_effect=lambda path, settings: real_client(path=tmp, settings=settings)):
+            vm = memory_vector.VectorMemory(embedder="local")
+            self.assertEqual(vm.query_coverage(["anything"]), [[]])
+
+            vm.upsert_coverage(
+                [1, 2],
+                ["remote work productivity since 2020", "battery chemistry for electric vehicles"],
+                [{"topic": "Work", "topic_key": "work"}] * 2
+            )
+            self.assertEqual(vm.coverage.count(), 2)
+
+            hits = vm.query_coverage(["productivity of remote work after 2020", "EV battery chemistry"], topic="WORK", k=2)
+            self.assertEqual([cid for cid, _ in hits[0]], [1, 2])
+            self.assertGreater(hits[0][0][1], hits[0][1][1])
+            self.assertEqual(hits[1][0][0], 2)
+            self.assertEqual(vm.query_coverage(["remote work"], topic="Other"), [[]])
+
+    def test_topic_filter_ignores_case_and_backfills_old_vectors(self):
+        real_client = chromadb.PersistentClient
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch('memory_vector.chromadb.PersistentClient', side_effect=lambda path, settings: real_client(path=tmp, settings=settings)):
+            vm = memory_vector.VectorMemory(embedder="local")
+            vm.upsert_episodes([1], ["remote work productivity"], [{"topic": "Remote Work", "session_id": "s1"}])
+            # A vector written before topic_key existed
+            vm.episodic.upsert(ids=["episode:2"], embeddings=vm.embed_many(["remote work tools"]), metadatas=[{"topic": "Remote Work"}])
+            vm.episodic.modify(metadata={memory_vector.TOPIC_KEY_BACKFILLED: False})
+
+            vm = memory_vector.VectorMemory(embedder="local")
+            self.assertTrue(vm.episodic.metadata[memory_vector.TOPIC_KEY_BACKFILLED])
+            for topic in ("Remote Work", "remote work"):
+                hits = vm.query_episodic("remote work", k=5, where=memory_vector.build_where(topic=topic))
+                self.assertEqual(sorted(hits["ids"][0]), ["episode:1", "episode:2"])
+            hits = vm.query_episodic("remote work", k=5, where=memory_vector.build_where(topic="REMOTE WORK", session_id="s1"))
+            self.assertEqual(hits["ids"][0], ["episode:1"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -48,6 +48,10 @@ class TestReportWriter(unittest.TestCase):
         print("Generated Report Snippet:")
         print(report)
 
+        # Retrieval is filtered to the session inside Chroma (a session covers one topic)
+        where = mock_router.call_args[1]['where']
+        self.assertEqual(where, {"session_id": "session-123"})
+
         # 3. Validations
         
         # 1. Markdown
@@ -63,10 +63,8 @@ class TestResearchAgent(unittest.TestCase):
         }
 
         # 5. Setup Mock DB/Vector
-        mock_truth.add_episode.return_value = 101
-        mock_truth.add_fact.return_value = 202
-        mock_truth.get_episode.return_value = {'topic': 'test', 'title': 'title', 'notes': 'notes'}
-        mock_truth.get_fact.return_value = {'topic': 'test', 'subject': 's', 'predicate': 'p', 'object': 'o'}
+        mock_truth.add_episodes_bulk.return_value = [{'id': 101, 'topic': 'test', 'title': 'title', 'notes': 'notes'}]
+        mock_truth.add_facts_bulk.return_value = [{'id': 202, 'topic': 'test', 'subject': 's', 'predicate': 'p', 'object': 'o'}]
         
         mock_vm = mock_vm_cls.return_value
 
@@ -87,13 +85,13 @@ class TestResearchAgent(unittest.TestCase):
         
         # Check Episodes added (1 per source used)
         self.assertTrue(len(trace['episode_ids']) > 0)
-        mock_truth.add_episode.assert_called()
+        mock_truth.add_episodes_bulk.assert_called()
         mock_vm.upsert_episode.assert_called()
 
         # Check Facts added
         self.assertTrue(len(trace['fact_ids']) > 0)
-        mock_truth.add_fact.assert_called()
-        mock_vm.upsert_fact.assert_called()
+        mock_truth.add_facts_bulk.assert_called()
+        mock_vm.upsert_facts.assert_called()
 
         print("ALL TESTS PASSED")
 
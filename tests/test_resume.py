@@ -0,0 +1,125 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+import memory_truth
+import research_agent
+from temp_db import TempDBTestCase
+
+class _ProcessKilled(BaseException):
+    """Simulated hard crash; per-source error handling must not swallow it."""
+
+class TestResume(TempDBTestCase):
+
+    def _client(self):
+        client = MagicMock()
+
+        def create(**kwargs):
+            resp = MagicMock()
+            resp.choices[0].message.content = '{"facts": []}' if "facts" in kwargs['messages'][0]['content'] else "A summary."
+            return resp
+        client.chat.completions.create.side_effect = create
+        return client
+
+    def test_resume_continues_after_crash(self):
+        client = self._client()
+        urls = ["http://a.com", "http://b.com"]
+        decision = {
+            "needs_web": True,
+            "web_needed_for": ["Q1"],
+            "subquestion_statuses": [{"question": "Q1", "status": "missing", "rationale": "none"}]
+        }
+        real_store = research_agent._store_source
+        crash = {"armed": True}
+
+        def store(vm, topic, session_id, url, *args, **kwargs):
+            if url == "http://b.com" and crash["armed"]:
+                crash["armed"] = False
+                raise _ProcessKilled()
+            return real_store(vm, topic, session_id, url, *args, **kwargs)
+
+        init = lambda max_sources, on_event=None, session_id=None: (MagicMock(), client, session_id or "sess-1")
+        empty_context = {'procedural': {'ids': []}, 'episodic': {'ids': []}, 'semantic': {'ids': []}}
+
+        with patch('research_agent._init_runtime', side_effect=init), \
+             patch('research_agent._retrieve_context', return_value=empty_context), \
+             patch('research_agent.memory_builders.load_skills', return_value=[]), \
+             patch('research_agent._generate_subquestions', return_value=["Q1"]) as mock_subqs, \
+             patch('research_agent._decision_gate', return_value=decision) as mock_gate, \
+             patch('research_agent._attach_compressed_summaries'), \
+             patch('research_agent._store_source', side_effect=store), \
+             patch('research_agent.web_search.search_web', return_value=[{'link': u} for u in urls]) as mock_search, \
+             patch('research_agent.web_fetch.fetch_page', side_effect=lambda url, session=None: {'text': url, 'title': 'T'}) as mock_fetch, \
+             patch.dict(os.environ, {"SERPAPI_API_KEY": "test-key"}):
+
+            with self.assertRaises(_ProcessKilled):
+                research_agent.run_research("Topic", max_sources=2)
+
+            checkpoints = memory_truth.get_checkpoints("sess-1")
+            self.assertEqual(checkpoints["subquestions"], ["Q1"])
+            self.assertEqual(list(checkpoints["ingest"]["done"]), ["http://a.com"])
+            self.assertNotIn("completed", checkpoints)
+            mock_fetch.reset_mock()
+
+            trace = research_agent.resume("sess-1")
+
+            # Nothing that already finished runs twice
+            mock_subqs.assert_called_once()
+            mock_gate.assert_called_once()
+            mock_search.assert_called_once()
+            self.assertEqual([c.args[0] for c in mock_fetch.call_args_list], ["http://b.com"])
+
+            self.assertEqual(trace["session_id"], "sess-1")
+            self.assertEqual(trace["sources_used"], urls)
+            self.assertEqual(len(trace["episode_ids"]), 2)
+            self.assertEqual(trace["subquestion_statuses"][0]["status"], "satisfied")
+            self.assertEqual(len(memory_truth.get_episodes_by_topic_and_session("Topic", "sess-1")), 2)
+
+            # A completed session returns its stored trace, timings and usage included
+            stored = research_agent.resume("sess-1")
+            self.assertEqual(stored["episode_ids"], trace["episode_ids"])
+            self.assertEqual(stored["timings"]["name"], "run_research")
+            self.assertEqual(stored["usage"], trace["usage"])
+            mock_subqs.assert_called_once()
+
+    def test_crash_before_decision_checkpoint_keeps_coverage_once(self):
+        decision = {
+            "needs_web": False,
+            "web_needed_for": [],
+            "subquestion_statuses": [{"question": "Q1", "status": "satisfied", "rationale": "memory has it"}]
+        }
+        real_save = memory_truth.save_checkpoint
+        crash = {"armed": True}
+
+        def save_checkpoint(session_id, stage, data):
+            if stage == "decision" and crash["armed"]:
+                crash["armed"] = False
+                raise _ProcessKilled()
+            return real_save(session_id, stage, data)
+
+        init = lambda max_sources, on_event=None, session_id=None: (MagicMock(), self._client(), session_id or "sess-2")
+        context = {'procedural': {'ids': []}, 'episodic': {'ids': [['episode:1']]}, 'semantic': {'ids': []}}
+
+        with patch('research_agent._init_runtime', side_effect=init), \
+             patch('research_agent._retrieve_context', return_value=context), \
+             patch('research_agent.memory_builders.load_skills', return_value=[]), \
+             patch('research_agent._generate_subquestions', return_value=["Q1"]), \
+             patch('research_agent._decision_gate', return_value=decision) as mock_gate, \
+             patch('research_agent._attach_compressed_summaries'), \
+             patch('research_agent.memory_truth.save_checkpoint', side_effect=save_checkpoint):
+
+            with self.assertRaises(_ProcessKilled):
+                research_agent.run_research("Topic", max_sources=2)
+            # Coverage rolled back with the checkpoint it was saved with
+            self.assertEqual(memory_truth.get_coverage_by_topic("Topic"), [])
+
+            research_agent.resume("sess-2")
+
+        self.assertEqual(mock_gate.call_count, 2)
+        self.assertEqual([c['subquestion'] for c in memory_truth.get_coverage_by_topic("Topic")], ["Q1"])
+
+    def test_resume_unknown_session(self):
+        with self.assertRaises(ValueError):
+            research_agent.resume("missing")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import router
 
 class TestRouter(unittest.TestCase):
@@ -44,7 +44,49 @@ class TestRouter(unittest.TestCase):
         self.assertEqual(results['procedural']['ids'], ['skill1'])
         self.assertEqual(results['procedural']['documents'], [])
 
+        # Request is embedded once and the vector reused for every collection
+        mock_vm.embed.assert_called_once_with("test query")
+        embedding = mock_vm.embed.return_value
+        for query_fn in (mock_vm.query_episodic, mock_vm.query_semantic, mock_vm.query_procedural):
+            self.assertIs(query_fn.call_args[1]['query_embedding'], embedding)
+
         print("ALL TESTS PASSED")
 
+    @patch('router.memory_truth')
+    def test_hybrid_fusion(self, mock_truth):
+        mock_vm = MagicMock()
+        mock_vm.query_episodic.return_value = {
+            'ids': [['episode:1', 'episode:2']],
+            'documents': [['d1', 'd2']],
+            'metadatas': [[{'topic': 'T'}, {'topic': 'T'}]],
+            'distances': [[0.1, 0.2]]
+        }
+        mock_vm.query_semantic.return_value = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        mock_vm.query_procedural.return_value = {'ids': [['skill1']]}
+
+        # Lexical ranks episode 2 first and finds episode 3 which dense missed
+        mock_truth.search_episodes_fts.return_value = [2, 3]
+        mock_truth.search_facts_fts.return_value = [7]
+
+        results = router.retrieve_router(mock_vm, "Product X 2024", k_epi=3, where={"topic": "T"}, hybrid=True)
+
+        self.assertEqual(results['episodic']['ids'], ['episode:2', 'episode:1', 'episode:3'])
+        self.assertEqual(results['episodic']['documents'], ['d2', 'd1', None])
+        self.assertEqual(results['episodic']['distances'], [0.2, 0.1, None])
+        self.assertEqual(results['semantic']['ids'], ['fact:7'])
+
+        # Lexical path honours the same topic filter
+        mock_truth.search_episodes_fts.assert_called_once_with("Product X 2024", 3, topic="T", session_id=None)
+
+    @patch('router.memory_truth')
+    def test_dense_only_by_default(self, mock_truth):
+        mock_vm = MagicMock()
+        mock_vm.query_episodic.return_value = {'ids': [['episode:1']]}
+        mock_vm.query_semantic.return_value = {'ids': []}
+        mock_vm.query_procedural.return_value = {'ids': []}
+        results = router.retrieve_router(mock_vm, "q")
+        self.assertEqual(results['episodic']['ids'], ['episode:1'])
+        mock_truth.search_episodes_fts.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+import runtime
+
+class TestResourcePool(unittest.TestCase):
+
+    def test_get_reuses_instance_per_factory(self):
+        pool = runtime.ResourcePool()
+        factory_a = MagicMock(side_effect=lambda: object())
+        factory_b = MagicMock(side_effect=lambda: object())
+
+        a1 = pool.get(factory_a)
+        a2 = pool.get(factory_a)
+        b1 = pool.get(factory_b)
+
+        self.assertIs(a1, a2)
+        self.assertIsNot(a1, b1)
+        factory_a.assert_called_once()
+
+    def test_concurrent_get_creates_once(self):
+        pool = runtime.ResourcePool()
+        calls = []
+
+        def slow_factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(pool.get(slow_factory))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(id(r) for r in results)), 1)
+
+    def test_call_once(self):
+        pool = runtime.ResourcePool()
+        init_db = MagicMock()
+        pool.call_once(init_db)
+        pool.call_once(init_db)
+        init_db.assert_called_once()
+
+    def test_call_once_per_database_path(self):
+        pool = runtime.ResourcePool()
+        init_db = MagicMock()
+        original = runtime.memory_truth.DB_PATH
+        try:
+            pool.call_once(init_db)
+            runtime.memory_truth.DB_PATH = original + ".other"
+            pool.call_once(init_db)
+            pool.call_once(init_db)
+        finally:
+            runtime.memory_truth.DB_PATH = original
+        pool.call_once(init_db)
+        self.assertEqual(init_db.call_count, 2)
+
+    def test_shutdown_closes_and_resets(self):
+        pool = runtime.ResourcePool()
+        resource = MagicMock()
+        factory = MagicMock(return_value=resource)
+        pool.get(factory)
+        session = pool.http_session()
+
+        pool.shutdown()
+        resource.close.assert_called_once()
+        resource.client.close.assert_called_once()
+        resource.embedding_cache.close.assert_called_once()
+
+        # Recreated lazily after shutdown
+        pool.get(factory)
+        self.assertEqual(factory.call_count, 2)
+        self.assertIsNot(pool.http_session(), session)
+        pool.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
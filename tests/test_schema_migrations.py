@@ -0,0 +1,91 @@
+import sqlite3
+import unittest
+from unittest.mock import MagicMock, patch
+import memory_truth
+from temp_db import TempDBTestCase
+
+class TestSchemaMigrations(TempDBTestCase):
+
+    init_schema = False
+
+    def _user_version(self):
+        conn = sqlite3.connect(memory_truth.DB_PATH)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        conn.close()
+        return version
+
+    def test_upgrades_legacy_database(self):
+        # Pre-migration layout: no session_id, no coverage table, user_version 0
+        conn = sqlite3.connect(memory_truth.DB_PATH)
+        conn.execute("CREATE TABLE episodes (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TEXT DEFAULT (datetime('now')), topic TEXT NOT NULL, url TEXT, title TEXT, notes TEXT NOT NULL, outcome TEXT DEFAULT 'unknown', tags TEXT DEFAULT '')")
+        conn.execute("INSERT INTO episodes (topic, notes) VALUES ('Legacy', 'old widget notes')")
+        conn.commit()
+        conn.close()
+
+        memory_truth.init_db()
+
+        self.assertEqual(self._user_version(), memory_truth.SCHEMA_VERSION)
+        ep_id = memory_truth.add_episode("Legacy", "new notes", session_id="s1")
+        self.assertEqual(memory_truth.get_episode(ep_id)['session_id'], "s1")
+        # Rows that existed before the full-text index are searchable
+        self.assertEqual(memory_truth.search_episodes_fts("widget"), [1])
+
+    def test_backfills_coverage_evidence(self):
+        # Database at version 3: coverage evidence only in the JSON columns
+        with patch.object(memory_truth, 'MIGRATIONS', memory_truth.MIGRATIONS[:3]), \
+             patch.object(memory_truth, 'SCHEMA_VERSION', 3):
+            memory_truth.init_db()
+        conn = memory_truth.connect()
+        conn.execute("INSERT INTO episodes (topic, notes) VALUES ('T', 'n1')")
+        conn.execute("INSERT INTO subquestion_coverage (topic, subquestion, episode_ids, fact_ids) VALUES ('T', 'Q', '[1, 99]', 'not json')")
+
+        memory_truth.init_db()
+
+        self.assertEqual(self._user_version(), memory_truth.SCHEMA_VERSION)
+        cov = memory_truth.get_coverage_with_evidence("T", ["Q"])["Q"]
+        # Dangling ids are kept in the junction table but not hydrated
+        self.assertEqual([e['id'] for e in cov['episodes']], [1])
+        self.assertEqual(cov['facts'], [])
+        self.assertEqual(len(memory_truth.get_coverage_by_episode(99)), 1)
+
+    def test_backfills_source_index(self):
+        with patch.object(memory_truth, 'MIGRATIONS', memory_truth.MIGRATIONS[:5]), \
+             patch.object(memory_truth, 'SCHEMA_VERSION', 5):
+            memory_truth.init_db()
+        conn = memory_truth.connect()
+        conn.execute("INSERT INTO episodes (topic, notes, url) VALUES ('T', 'old', 'http://a.com/x/')")
+        conn.execute("INSERT INTO episodes (topic, notes, url) VALUES ('U', 'new', 'http://A.com/x')")
+        conn.execute("INSERT INTO episodes (topic, notes) VALUES ('T', 'no url')")
+
+        memory_truth.init_db()
+
+        sources = memory_truth.get_sources(["http://a.com/x"])
+        self.assertEqual(sources["http://a.com/x"]['episode_id'], 2)
+        self.assertIsNone(sources["http://a.com/x"]['content_hash'])
+
+    def test_noop_when_current(self):
+        memory_truth.init_db()
+        fakes = [MagicMock(__name__=f"m{i}") for i in range(memory_truth.SCHEMA_VERSION)]
+        with patch.object(memory_truth, 'MIGRATIONS', fakes):
+            memory_truth.init_db()
+        for fake in fakes:
+            fake.assert_not_called()
+
+    def test_topic_lookups_use_indexes(self):
+        memory_truth.init_db()
+        conn = sqlite3.connect(memory_truth.DB_PATH)
+        plans = {
+            'idx_episodes_topic_session': "SELECT * FROM episodes WHERE lower(topic) = lower(?) AND session_id = ?",
+            'idx_facts_topic_session': "SELECT * FROM facts WHERE lower(topic) = lower(?) AND session_id = ?",
+            'idx_coverage_topic_subquestion': "SELECT * FROM subquestion_coverage WHERE lower(topic) = lower(?) AND lower(subquestion) = lower(?)",
+        }
+        for index, sql in plans.items():
+            plan = " ".join(str(row[-1]) for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ("t", "s")))
+            self.assertIn(index, plan)
+        plan = " ".join(str(row[-1]) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM episodes WHERE lower(topic) = lower(?) ORDER BY id DESC", ("t",)))
+        self.assertIn("USING INDEX", plan)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
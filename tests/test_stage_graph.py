@@ -0,0 +1,77 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+import research_agent
+import stage_graph
+from stage_graph import Stage
+
+class TestStageGraph(unittest.TestCase):
+
+    def test_dependencies_receive_results(self):
+        results = stage_graph.run_stages([
+            Stage("total", lambda a, b: a + b, deps=["a", "b"]),
+            Stage("a", lambda: 2),
+            Stage("b", lambda: 3),
+        ])
+        self.assertEqual(results, {"a": 2, "b": 3, "total": 5})
+
+    def test_independent_stages_overlap(self):
+        barrier = threading.Barrier(2, timeout=2)
+        # Only passes if both stages are in flight at once
+        results = stage_graph.run_stages([
+            Stage("left", lambda: barrier.wait() is not None),
+            Stage("right", lambda: barrier.wait() is not None),
+        ])
+        self.assertEqual(results, {"left": True, "right": True})
+
+    def test_invalid_graphs_are_rejected(self):
+        with self.assertRaises(ValueError):
+            stage_graph.run_stages([Stage("a", lambda b: b, deps=["b"])])
+        with self.assertRaises(ValueError):
+            stage_graph.run_stages([
+                Stage("a", lambda b: b, deps=["b"]),
+                Stage("b", lambda a: a, deps=["a"]),
+            ])
+        with self.assertRaises(ValueError):
+            stage_graph.run_stages([Stage("a", lambda: 1), Stage("a", lambda: 2)])
+
+    def test_failure_stops_dependents(self):
+        downstream = MagicMock()
+
+        def boom():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            stage_graph.run_stages([
+                Stage("a", boom),
+                Stage("b", downstream, deps=["a"]),
+            ])
+        downstream.assert_not_called()
+
+    @patch('research_agent._generate_subquestions')
+    @patch('research_agent._retrieve_context')
+    @patch('research_agent._init_runtime')
+    def test_run_research_overlaps_context_and_subquestions(self, mock_init, mock_context, mock_subqs):
+        mock_init.return_value = (MagicMock(), MagicMock(), "s1")
+        barrier = threading.Barrier(2, timeout=2)
+
+        def context(vm, topic, on_event=None):
+            barrier.wait()
+            return {'procedural': {'ids': []}, 'episodic': {'ids': []}, 'semantic': {'ids': []}}
+
+        def subquestions(client, topic, on_event=None):
+            barrier.wait()
+            return []
+
+        mock_context.side_effect = context
+        mock_subqs.side_effect = subquestions
+
+        with patch('research_agent.memory_builders.load_skills', return_value=[]), \
+             patch('research_agent.memory_truth'):
+            trace = research_agent.run_research("Topic")
+
+        self.assertEqual(trace["subquestions"], [])
+        self.assertIn("execution_policy", trace)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,8 @@ import unittest
 from unittest.mock import MagicMock, patch
 import json
 import os
+import threading
+import time
 import research_agent
 
 class TestSummaryCompression(unittest.TestCase):
@@ -36,8 +38,7 @@ class TestSummaryCompression(unittest.TestCase):
             'episode_ids': '[1]',
             'fact_ids': '[]'
         }
-        mock_truth.get_coverage.return_value = c1
-        mock_truth.get_coverage_by_topic.return_value = [c1]
+        mock_truth.get_coverage_batch.return_value = {'Q1': c1}
         
         # 3. Summary Compression Response (Just the text)
         r_sum = MagicMock()
@@ -46,9 +47,10 @@ class TestSummaryCompression(unittest.TestCase):
         mock_client = mock_openai.return_value
         mock_client.chat.completions.create.side_effect = [r1, r_sum]
         
-        # Mock Episodes/Facts for summary
-        mock_truth.get_episodes_by_ids.return_value = [{'id': 1, 'created_at': '2025-01-01', 'notes': 'Deep thought.'}]
-        mock_truth.get_facts_by_ids.return_value = []
+        # Mock hydrated coverage (episodes/facts) for summary
+        mock_truth.get_coverage_with_evidence.return_value = {
+            'Q1': {**c1, 'episodes': [{'id': 1, 'created_at': '2025-01-01', 'notes': 'Deep thought.'}], 'facts': []}
+        }
 
         # 2. Run
         with patch.dict(os.environ, {"SERPAPI_API_KEY": "test-key"}):
@@ -59,7 +61,50 @@ class TestSummaryCompression(unittest.TestCase):
         self.assertEqual(len(trace["compressed_summaries"]), 1)
         # Check dictionary structure
         self.assertEqual(trace["compressed_summaries"]["Q1"]["summary"], "The answer is 42.")
+        self.assertEqual(trace["compressed_summaries"]["Q1"]["episode_ids"], [1])
+        mock_truth.get_coverage_with_evidence.assert_called_once_with("Topic", ["Q1"])
         print("PASS: Summary compression executed.")
 
+    @patch('research_agent.memory_truth')
+    def test_summaries_run_concurrently_and_stream(self, mock_truth):
+        questions = ["Q1", "Q2", "Q3"]
+        mock_truth.get_coverage_with_evidence.return_value = {
+            q: {'id': i, 'episodes': [{'id': i, 'created_at': '2026-10-01', 'notes': q}], 'facts': []}
+            for i, q in enumerate(questions, 1)
+        }
+        statuses = [{"question": q, "status": "satisfied"} for q in questions]
+
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def create(**kwargs):
+            content = kwargs['messages'][0]['content']
+            q = content.split("Question: ")[1].split("\n")[0]
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            # Earlier questions finish last
+            time.sleep(0.05 * (3 - questions.index(q)))
+            with lock:
+                active["now"] -= 1
+            if q == "Q2":
+                raise RuntimeError("rate limited")
+            resp = MagicMock()
+            resp.choices[0].message.content = f"About {q}"
+            return resp
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = create
+        events = []
+
+        results = research_agent.compress_summaries(client, "Topic", statuses, on_event=events.append, max_workers=3)
+
+        self.assertEqual(list(results), ["Q1", "Q3"])
+        self.assertEqual(results["Q3"], {"summary": "About Q3", "episode_ids": [3], "fact_ids": []})
+        self.assertGreater(active["peak"], 1)
+        ready = [e for e in events if e.startswith("Summary ready")]
+        self.assertEqual(ready, ["Summary ready for 'Q3': About Q3", "Summary ready for 'Q1': About Q1"])
+        self.assertIn("Summary failed for Q2: rate limited", events)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+import research_agent
+import tracing
+
+class TestTracing(unittest.TestCase):
+
+    def test_spans_nest_across_threads(self):
+        with tracing.span("root", topic="T") as root:
+            with tracing.span("stage"):
+                def work(i):
+                    with tracing.span("fetch", i=i):
+                        pass
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    list(pool.map(tracing.bind(work), range(3)))
+            with self.assertRaises(RuntimeError):
+                with tracing.span("llm"):
+                    raise RuntimeError("timeout")
+        self.assertIsNone(tracing.current())
+
+        timings = root.to_dict()
+        self.assertEqual(timings["attrs"], {"topic": "T"})
+        stage, llm = timings["children"]
+        self.assertEqual([c["name"] for c in stage["children"]], ["fetch"] * 3)
+        self.assertEqual(llm["error"], "RuntimeError: timeout")
+        self.assertGreaterEqual(timings["duration_ms"], stage["duration_ms"])
+
+        summary = {row["name"]: row for row in tracing.summarize(timings)}
+        self.assertEqual(summary["fetch"]["count"], 3)
+        self.assertNotIn("root", summary)
+
+    def test_unbound_threads_start_new_roots(self):
+        seen = []
+        with tracing.span("root"):
+            worker = threading.Thread(target=lambda: seen.append(tracing.current()))
+            worker.start()
+            worker.join()
+        self.assertEqual(seen, [None])
+
+    def test_export_jsonl(self):
+        with tracing.span("root") as root:
+            with tracing.span("child"):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces", "spans.jsonl")
+            self.assertIsNone(tracing.export_jsonl(root.to_dict()))
+            with patch.dict(os.environ, {tracing.TRACE_FILE_ENV: path}):
+                tracing.export_jsonl(root.to_dict(), session_id="s1")
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual([r["path"] for r in rows], ["root", "root/child"])
+        self.assertEqual({r["session_id"] for r in rows}, {"s1"})
+
+    @patch('research_agent.memory_truth')
+    @patch('research_agent.memory_builders.load_skills', return_value=[])
+    @patch('research_agent._generate_subquestions', return_value=[])
+    @patch('research_agent._retrieve_context')
+    @patch('research_agent._init_runtime')
+    def test_run_research_records_timings(self, mock_init, mock_context, mock_subqs, mock_skills, mock_truth):
+        mock_init.return_value = (MagicMock(), MagicMock(), "s1")
+        mock_context.return_value = {'procedural': {'ids': []}, 'episodic': {'ids': []}, 'semantic': {'ids': []}}
+
+        trace = research_agent.run_research("Topic")
+
+        timings = trace["timings"]
+        self.assertEqual(timings["name"], "run_research")
+        stages = [c["name"] for c in timings["children"]]
+        for stage in ("select_skill_and_policy", "decision_gate", "attach_compressed_summaries"):
+            self.assertIn(stage, stages)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import embedders
+import llm_cache
+import memory_truth
+import tracing
+import usage
+from temp_db import TempDBTestCase
+
+def _chat_response(prompt, completion):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok"), finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion)
+    )
+
+class TestUsage(unittest.TestCase):
+
+    def test_cost_uses_longest_model_prefix(self):
+        self.assertAlmostEqual(usage.cost("gpt-4o-mini-2024-07-18", 1_000_000, 1_000_000), 0.75)
+        self.assertAlmostEqual(usage.cost("gpt-4o", 1_000_000, 0), 2.50)
+        self.assertEqual(usage.cost("unknown-model", 1000, 1000), 0.0)
+        with patch.dict(os.environ, {"RESEARCH_AGENT_PRICES": '{"unknown-model": [1.0, 2.0]}'}):
+            self.assertAlmostEqual(usage.cost("unknown-model", 1_000_000, 1_000_000), 3.0)
+
+    def test_counts_chat_and_embedding_tokens_per_stage(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = _chat_response(1000, 200)
+        client.embeddings.create.return_value = SimpleNamespace(
+            data=[SimpleNamespace(embedding=[0.1])], usage=SimpleNamespace(prompt_tokens=50, total_tokens=50)
+        )
+        embedder = embedders.OpenAIEmbedder(client)
+
+        with patch.dict(os.environ, {"RESEARCH_AGENT_LLM_CACHE": ""}):
+            with tracing.span("run_research") as root:
+                with tracing.span("plan"):
+                    llm_cache.cached_chat(client, "subquestions", model="gpt-4o-mini", messages=[])
+                    llm_cache.cached_chat(client, "subquestions", model="gpt-4o-mini", messages=[])
+                with tracing.span("ingest"):
+                    embedder.embed_many(["text"])
+                with tracing.span("decide"):
+                    pass
+
+        summary = usage.summarize(root.to_dict())
+        self.assertEqual(set(summary["by_stage"]), {"plan", "ingest"})
+        plan = summary["by_stage"]["plan"]
+        self.assertEqual((plan["llm_calls"], plan["prompt_tokens"], plan["completion_tokens"]), (2, 2000, 400))
+        self.assertEqual(summary["by_stage"]["ingest"]["embedding_tokens"], 50)
+        self.assertEqual(summary["total"]["llm_calls"], 2)
+        self.assertAlmostEqual(summary["total"]["cost_usd"], (2000 * 0.15 + 400 * 0.60 + 50 * 0.02) / 1_000_000)
+
+    def test_cache_hits_count_without_tokens(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = _chat_response(100, 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = llm_cache.LLMCache(os.path.join(tmp, "cache.db"))
+            with tracing.span("run_research") as root:
+                for _ in range(2):
+                    llm_cache.cached_chat(client, "report", cache=cache, model="gpt-4o", messages=[])
+            cache.close()
+        total = usage.totals(root.to_dict())
+        self.assertEqual((total["llm_calls"], total["cached_llm_calls"], total["prompt_tokens"]), (1, 1, 100))
+
+    def test_recording_outside_a_span_is_a_noop(self):
+        usage.record_chat("gpt-4o", _chat_response(10, 10))
+        usage.record_chat("gpt-4o", SimpleNamespace(usage=None))
+        self.assertIsNone(tracing.current())
+
+class TestSessionUsage(TempDBTestCase):
+
+    def test_runs_accumulate_per_session(self):
+        first = dict.fromkeys(usage.USAGE_FIELDS, 0)
+        first.update(llm_calls=3, prompt_tokens=900, cost_usd=0.01)
+        second = dict(first, llm_calls=1, prompt_tokens=100, cost_usd=0.002)
+
+        memory_truth.add_session_usage("s1", "Topic", first, {"plan": first})
+        memory_truth.add_session_usage("s1", None, second, {"plan": second, "generate_report": second})
+
+        row = memory_truth.get_session_usage("s1")
+        self.assertEqual((row["topic"], row["runs"], row["llm_calls"], row["prompt_tokens"]), ("Topic", 2, 4, 1000))
+        self.assertAlmostEqual(row["cost_usd"], 0.012)
+        self.assertEqual(row["by_stage"]["plan"]["prompt_tokens"], 1000)
+        self.assertEqual(row["by_stage"]["generate_report"]["llm_calls"], 1)
+        self.assertIsNone(memory_truth.get_session_usage("missing"))
+
+if __name__ == '__main__':
+    unittest.main()
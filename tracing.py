@@ -0,0 +1,160 @@
+import os
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Optional
+
+# Append finished traces here when set (one JSON line per span)
+TRACE_FILE_ENV = "RESEARCH_AGENT_TRACE_FILE"
+
+_current: ContextVar = ContextVar("tracing_current_span", default=None)
+
+class Span:
+    """One timed operation. Child spans nest under the span that was active when they started."""
+
+    def __init__(self, name: str, parent: "Span" = None, attrs: dict = None):
+        self.name = name
+        self.parent = parent
+        self.attrs = dict(attrs or {})
+        self.children = []
+        self.counters = {}
+        self.error = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+        self._lock = threading.Lock()
+        if parent is not None:
+            with parent._lock:
+                parent.children.append(self)
+
+    def set(self, **attrs):
+        """Attach attributes after the span started (e.g. a result size or cache hit)."""
+        self.attrs.update(attrs)
+
+    def add(self, **counters):
+        """Accumulate numeric counters on this span (e.g. token usage); children may add from other threads."""
+        with self._lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def finish(self):
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self, origin: float = None) -> dict:
+        """Nested timings; start_ms is relative to the outermost span serialized."""
+        origin = self._start if origin is None else origin
+        with self._lock:
+            children = sorted(self.children, key=lambda c: c._start)
+            counters = dict(self.counters)
+        data = {
+            "name": self.name,
+            "start_ms": round((self._start - origin) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "attrs": self.attrs,
+            "children": [child.to_dict(origin) for child in children]
+        }
+        if counters:
+            data["counters"] = counters
+        if self.error:
+            data["error"] = self.error
+        return data
+
+def current() -> Optional[Span]:
+    """The active span in this thread / context, if any."""
+    return _current.get()
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block as a child of the active span (or as a new root)."""
+    s = Span(name, _current.get(), attrs)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.finish()
+        _current.reset(token)
+
+def traced(name: str = None):
+    """Decorator form of span() for stage helpers."""
+    def decorator(fn):
+        span_name = name or fn.__name__.lstrip("_")
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def bind(fn: Callable) -> Callable:
+    """
+    Carry the active span into a worker thread.
+    Context variables do not cross ThreadPoolExecutor boundaries on their own.
+    """
+    parent = _current.get()
+    if parent is None:
+        return fn
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+def flatten(timings: dict, depth: int = 0, path: str = "") -> list[dict]:
+    """Depth-first rows of a to_dict() tree: name, path, depth, start_ms, duration_ms, attrs, counters."""
+    full_path = f"{path}/{timings['name']}" if path else timings["name"]
+    rows = [{
+        "name": timings["name"],
+        "path": full_path,
+        "depth": depth,
+        "start_ms": timings["start_ms"],
+        "duration_ms": timings["duration_ms"],
+        "attrs": timings.get("attrs", {}),
+        "counters": timings.get("counters", {}),
+        "error": timings.get("error")
+    }]
+    for child in timings.get("children", []):
+        rows.extend(flatten(child, depth + 1, full_path))
+    return rows
+
+def summarize(timings: dict) -> list[dict]:
+    """
+    Aggregate spans by name under the root: count, total and max duration,
+    slowest first. Concurrent spans overlap, so totals can exceed wall time.
+    """
+    totals = {}
+    for row in flatten(timings)[1:]:
+        entry = totals.setdefault(row["name"], {"name": row["name"], "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        duration = row["duration_ms"] or 0.0
+        entry["count"] += 1
+        entry["total_ms"] = round(entry["total_ms"] + duration, 3)
+        entry["max_ms"] = max(entry["max_ms"], duration)
+    return sorted(totals.values(), key=lambda e: e["total_ms"], reverse=True)
+
+def export_jsonl(timings: dict, path: str = None, **fields) -> Optional[str]:
+    """
+    Append one JSON line per span to path (default: $RESEARCH_AGENT_TRACE_FILE).
+    Extra fields (e.g. session_id) are added to every line. Returns the path written, if any.
+    """
+    path = path or os.environ.get(TRACE_FILE_ENV)
+    if not path:
+        return None
+    exported_at = datetime.now(timezone.utc).isoformat()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for row in flatten(timings):
+            f.write(json.dumps({**fields, "exported_at": exported_at, **row}, default=str) + "\n")
+    return path
@@ -0,0 +1,89 @@
+import os
+import json
+import tracing
+
+# USD per 1M tokens: (prompt / input, completion / output). Longest matching prefix wins.
+# Override with RESEARCH_AGENT_PRICES='{"gpt-4o": [2.5, 10.0]}'
+DEFAULT_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+USAGE_FIELDS = (
+    "llm_calls",
+    "cached_llm_calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "embedding_calls",
+    "embedding_tokens",
+    "cost_usd",
+)
+
+def prices() -> dict:
+    table = dict(DEFAULT_PRICES)
+    override = os.environ.get("RESEARCH_AGENT_PRICES")
+    if override:
+        try:
+            table.update({model: tuple(rates) for model, rates in json.loads(override).items()})
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Warning: ignoring invalid RESEARCH_AGENT_PRICES: {e}")
+    return table
+
+def cost(model: str, prompt_tokens: int, completion_tokens: int = 0) -> float:
+    """USD cost of one call; 0.0 for models without a known price."""
+    table = prices()
+    matches = [name for name in table if model and model.startswith(name)]
+    if not matches:
+        return 0.0
+    prompt_rate, completion_rate = table[max(matches, key=len)]
+    return (prompt_tokens * prompt_rate + completion_tokens * completion_rate) / 1_000_000
+
+def _tokens(usage, field: str) -> int:
+    value = getattr(usage, field, None)
+    return value if isinstance(value, int) and not isinstance(value, bool) else 0
+
+def _record(**counters):
+    """Add usage counters to the active span (no-op outside a traced run)."""
+    span = tracing.current()
+    if span is not None:
+        span.add(**counters)
+
+def record_chat(model: str, response):
+    """Record a chat completion's token usage (response.usage) on the active span."""
+    usage = getattr(response, "usage", None)
+    prompt = _tokens(usage, "prompt_tokens")
+    completion = _tokens(usage, "completion_tokens")
+    _record(llm_calls=1, prompt_tokens=prompt, completion_tokens=completion, cost_usd=cost(model, prompt, completion))
+
+def record_cached_chat():
+    _record(cached_llm_calls=1)
+
+def record_embeddings(model: str, response):
+    """Record an embeddings request's token usage on the active span."""
+    usage = getattr(response, "usage", None)
+    tokens = _tokens(usage, "total_tokens") or _tokens(usage, "prompt_tokens")
+    _record(embedding_calls=1, embedding_tokens=tokens, cost_usd=cost(model, tokens))
+
+def totals(timings: dict) -> dict:
+    """Usage summed over a span tree (to_dict() form)."""
+    result = dict.fromkeys(USAGE_FIELDS, 0)
+    for row in tracing.flatten(timings):
+        for field in USAGE_FIELDS:
+            result[field] += row["counters"].get(field, 0)
+    result["cost_usd"] = round(result["cost_usd"], 6)
+    return result
+
+def summarize(timings: dict) -> dict:
+    """Session totals plus totals per stage (the root span's direct children) that used any tokens."""
+    by_stage = {}
+    for child in timings.get("children", []):
+        stage = totals(child)
+        if not any(stage.values()):
+            continue
+        merged = by_stage.setdefault(child["name"], dict.fromkeys(USAGE_FIELDS, 0))
+        for field in USAGE_FIELDS:
+            merged[field] += stage[field]
+        merged["cost_usd"] = round(merged["cost_usd"], 6)
+    return {"total": totals(timings), "by_stage": by_stage}
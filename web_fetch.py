@@ -1,13 +1,14 @@
 import requests
 from bs4 import BeautifulSoup
 
-def fetch_page(url: str, timeout: int = 15) -> dict:
+def fetch_page(url: str, timeout: int = 15, session=None) -> dict:
     """
     Fetch a URL and extract its main text content.
     
     Args:
         url: The URL to fetch.
         timeout: Request timeout in seconds.
+        session: Optional requests.Session to reuse pooled connections.
         
     Returns:
         dict: Contains url, title, text, status_code, content_type.
@@ -18,7 +19,8 @@ def fetch_page(url: str, timeout: int = 15) -> dict:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=timeout)
+        http = session if session is not None else requests
+        response = http.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
     except requests.RequestException:
         # Simple error handling for connection/http errors